@@ -0,0 +1,320 @@
+"""
+Feature Graph - Regression Models
+=================================
+The derived columns and design matrices of the week 3 notebook as a
+graph of named nodes, each with explicit inputs, instead of cells that
+add columns to df (and df_log, df_ord) in a fixed order.
+
+  - A source is a column of the survey file.
+  - A node is computed from its inputs (sources or other nodes) when it
+    is first asked for, and remembered. income, education and age come
+    from one recode of the one-hot blocks; Support_binary and
+    Support_ordinal from support_info; each *_c column is its base
+    column centered on the sample mean.
+  - The sample is the rows the notebook keeps after dropping missing age
+    (df.dropna(subset=['age'])); centering uses the sample rows only.
+  - design(features, response) gives the model inputs: the sample rows
+    where the response and every feature are present, as
+    df[features].dropna() with df.loc[X.index, response], with a 'const'
+    column unless constant=False. recenter=True centers the *_c features
+    within those rows instead, as the notebook does for df_ord's
+    fairness_c.
+
+Every node records the versions of its inputs. update() replaces a source
+column and bumps its version; the next get() recomputes only the nodes
+downstream of it, and a node whose new value equals the old one keeps its
+version, so the nodes after it are not recomputed either. `computations`
+counts how often each node was computed.
+
+Usage:
+    sys.path.insert(0, os.path.join(os.pardir, 'demo3226week2'))   # recoding.py
+    from feature_graph import week3_graph
+    graph = week3_graph(pd.read_csv('GCAP3226_week3.csv'))
+    X_ord1, y_ord = graph.design(['fairness_c'], 'Support_ordinal', constant=False,
+                                 recenter=True)
+    X_multi, y_multi = graph.design(FEATURES, 'support_info')
+    graph.update('fairness', corrected_fairness)   # only fairness_c and its designs rerun
+
+    python feature_graph.py [--input GCAP3226_week3.csv]   # every model's inputs, no Jupyter
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# recoding.py and onehot_crosstab.py live with the week 2 modules; callers
+# put this folder on sys.path (see add_week2_path) before week3_graph()
+WEEK2_DIR = os.path.join(os.path.dirname(HERE), 'demo3226week2')
+
+# Columns centered by the notebook (each becomes <column>_c)
+CENTERED_COLUMNS = ['fairness', 'government_consideration', 'policy_helpfulness',
+                    'waste_severity', 'recycling_effort', 'age', 'income', 'education',
+                    'recycle_frequency', 'household_size', 'total_score']
+
+# Predictors of the multiple, logistic and ordinal forward selections
+FEATURES = ['fairness_c', 'government_consideration_c', 'policy_helpfulness_c',
+            'waste_severity_c', 'recycling_effort_c', 'LocalResidentcode',
+            'DailyWasteBags_More than 1 bag', 'DailyWasteBags_Exactly 1 bag',
+            'HousingType_Other', 'HousingType_Private housing',
+            'HousingType_Subsidized housing', 'age_c', 'income_c', 'education_c',
+            'recycle_frequency_c', 'household_size_c', 'total_score_c']
+
+# The notebook's models: (features, response, design options)
+MODELS = {
+    'linear_fairness': (['fairness_c'], 'support_info', {}),
+    'linear_distance': (['Distance_artificial'], 'support_info', {}),
+    'linear_multiple': (FEATURES, 'support_info', {}),
+    'logistic_fairness': (['fairness_c'], 'Support_binary', {}),
+    'logistic_multiple': (FEATURES, 'Support_binary', {}),
+    'ordinal_fairness': (['fairness_c'], 'Support_ordinal', {'constant': False,
+                                                            'recenter': True}),
+    'ordinal_multiple': (FEATURES, 'Support_ordinal', {'constant': False}),
+}
+
+Node = namedtuple('Node', ['name', 'inputs', 'compute'])
+Design = namedtuple('Design', ['X', 'y'])
+
+
+class FeatureGraph:
+    """Lazily computed, memoized columns derived from a survey frame."""
+
+    def __init__(self, df, sample=None):
+        self.index = df.index
+        self._sources = {col: df[col] for col in df.columns}
+        self._source_versions = dict.fromkeys(self._sources, 0)
+        self._nodes = {}
+        # name -> (input versions, value, version)
+        self._memo = {}
+        self._designs = {}
+        self._centered = {}
+        self.sample = sample
+        self.computations = Counter()
+
+    # ============================================================
+    # Declaring nodes
+    # ============================================================
+    def _check_inputs(self, inputs):
+        unknown = [name for name in inputs if name not in self]
+        if unknown:
+            raise KeyError(f"Unknown inputs {unknown}; declare them first")
+
+    def add(self, name, inputs, compute):
+        """Node `name` = compute(*input Series), a Series indexed like the frame."""
+        if name in self:
+            raise ValueError(f"{name!r} is already a column or node")
+        self._check_inputs(inputs)
+        self._nodes[name] = Node(name, list(inputs), compute)
+        return self
+
+    def add_frame(self, name, outputs, inputs, compute):
+        """Node `name` = compute(DataFrame of inputs), a DataFrame whose
+        `outputs` columns become nodes of their own (e.g. one recode that
+        decodes several one-hot blocks)."""
+        self.add(name, inputs, lambda *columns: compute(pd.concat(columns, axis=1)))
+        for output in outputs:
+            self.add(output, [name], lambda frame, output=output: frame[output])
+        return self
+
+    def center(self, column, name=None):
+        """Node `<column>_c`: `column` minus its mean over the sample rows."""
+        name = name or f'{column}_c'
+        inputs = [column] + ([self.sample] if self.sample else [])
+
+        def centered(values, sample=None):
+            kept = values if sample is None else values[sample]
+            return values - kept.mean()
+
+        self.add(name, inputs, centered)
+        self._centered[name] = column
+        return self
+
+    # ============================================================
+    # Values
+    # ============================================================
+    def __contains__(self, name):
+        return name in self._sources or name in self._nodes
+
+    def _refresh(self, name):
+        """Bring `name` up to date; returns its version."""
+        if name in self._sources:
+            return self._source_versions[name]
+        if name not in self._nodes:
+            raise KeyError(f"No column or node named {name!r}")
+        node = self._nodes[name]
+        stamp = tuple(self._refresh(dep) for dep in node.inputs)
+        memo = self._memo.get(name)
+        if memo is not None and memo[0] == stamp:
+            return memo[2]
+
+        value = node.compute(*[self._value(dep) for dep in node.inputs])
+        self.computations[name] += 1
+        if memo is not None and _same(memo[1], value):
+            # Unchanged result: downstream nodes stay valid
+            version = memo[2]
+        else:
+            version = memo[2] + 1 if memo is not None else 0
+        self._memo[name] = (stamp, value, version)
+        return version
+
+    def _value(self, name):
+        if name in self._sources:
+            return self._sources[name]
+        return self._memo[name][1]
+
+    def get(self, name):
+        """The values of a column or node (computed if needed)."""
+        self._refresh(name)
+        return self._value(name)
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def sample_mask(self):
+        """Boolean Series of the sample rows (all rows without a sample node)."""
+        if self.sample is None:
+            return pd.Series(True, index=self.index)
+        return self.get(self.sample).astype(bool)
+
+    def frame(self, columns):
+        """DataFrame of `columns` over the sample rows (missing values kept)."""
+        mask = self.sample_mask()
+        return pd.DataFrame({col: self.get(col)[mask] for col in columns})
+
+    def design(self, features, response, constant=True, recenter=False):
+        """Design(X, y) of a model on the sample rows with every value present.
+
+        constant=True adds a 'const' column first, as sm.add_constant().
+        recenter=True centers the *_c features within these rows.
+        """
+        features = list(features)
+        deps = features + [response] + ([self.sample] if self.sample else [])
+        if recenter:
+            deps += [self._centered[f] for f in features if f in self._centered]
+        key = (tuple(features), response, constant, recenter)
+        stamp = tuple(self._refresh(dep) for dep in deps)
+        memo = self._designs.get(key)
+        if memo is not None and memo[0] == stamp:
+            return memo[1]
+
+        X = self.frame(features)
+        y = self.frame([response])[response]
+        rows = X.notna().all(axis=1) & y.notna()
+        X, y = X[rows].copy(), y[rows]
+        if recenter:
+            for f in features:
+                if f in self._centered:
+                    base = self.get(self._centered[f])[X.index]
+                    X[f] = base - base.mean()
+        if constant:
+            X.insert(0, 'const', 1.0)
+        result = Design(X, y)
+        self.computations['design'] += 1
+        self._designs[key] = (stamp, result)
+        return result
+
+    # ============================================================
+    # Changing the data
+    # ============================================================
+    def update(self, column, values):
+        """Replace (or add) a source column; dependent nodes rerun on next use.
+
+        Values equal to the current ones change nothing.
+        """
+        if column in self._nodes:
+            raise ValueError(f"{column!r} is derived; update its inputs instead")
+        values = pd.Series(np.asarray(values), index=self.index, name=column)
+        if column in self._sources and _same(self._sources[column], values):
+            return
+        self._sources[column] = values
+        self._source_versions[column] = self._source_versions.get(column, -1) + 1
+
+    def downstream(self, name):
+        """Every node that depends on `name`, directly or not."""
+        found = []
+        for node in self._nodes.values():
+            if name in node.inputs:
+                found.append(node.name)
+                found += [n for n in self.downstream(node.name) if n not in found]
+        return found
+
+
+def _same(old, new):
+    if isinstance(old, (pd.Series, pd.DataFrame)) and type(old) is type(new):
+        return old.equals(new)
+    return False
+
+
+# ============================================================
+# The week 3 notebook
+# ============================================================
+def support_binary(support_info):
+    """1-2 -> 0 (oppose), 4-5 -> 1 (support); 3 (neutral) is missing."""
+    return support_info.map({1: 0.0, 2: 0.0, 4: 1.0, 5: 1.0}).astype(np.float64)
+
+
+def support_ordinal(support_info):
+    """1-2 -> 1 (oppose), 3 -> 2 (neutral), 4-5 -> 3 (support)."""
+    return support_info.map({1: 1.0, 2: 1.0, 3: 2.0, 4: 3.0, 5: 3.0}).astype(np.float64)
+
+
+def week3_graph(df):
+    """FeatureGraph of the regression notebook's derived columns for `df`
+    (the survey as read from GCAP3226_week3.csv).
+
+    Needs the week 2 modules importable (see add_week2_path).
+    """
+    from onehot_crosstab import onehot_columns
+    from recoding import WEEK3_RECODES, recode_onehot
+
+    graph = FeatureGraph(df)
+    onehot = [col for prefix, _ in WEEK3_RECODES.values()
+              for col in onehot_columns(df.columns, prefix)]
+    graph.add_frame('recoded', list(WEEK3_RECODES), onehot,
+                    lambda block: recode_onehot(block, WEEK3_RECODES, missing='nan'))
+    graph.add('has_age', ['age'], lambda age: age.notna())
+    graph.sample = 'has_age'
+    graph.add('Support_binary', ['support_info'], support_binary)
+    graph.add('Support_ordinal', ['support_info'], support_ordinal)
+    for column in CENTERED_COLUMNS:
+        graph.center(column)
+    return graph
+
+
+def add_week2_path():
+    """Put WEEK2_DIR on sys.path (for the command line; not done on import)."""
+    if WEEK2_DIR not in sys.path:
+        sys.path.insert(0, WEEK2_DIR)
+
+
+def main():
+    add_week2_path()
+    parser = argparse.ArgumentParser(description="Build the week 3 models' inputs")
+    parser.add_argument('--input', default=os.path.relpath(os.path.join(HERE, 'GCAP3226_week3.csv')),
+                        help="survey file (default: 'GCAP3226_week3.csv' next to this script)")
+    parser.add_argument('models', nargs='*', metavar='model',
+                        help=f"models to prepare (default: all of {', '.join(MODELS)})")
+    args = parser.parse_args()
+    unknown = [name for name in args.models if name not in MODELS]
+    if unknown:
+        parser.error(f"unknown models {unknown}; choose from {', '.join(MODELS)}")
+
+    graph = week3_graph(pd.read_csv(args.input))
+    print(f"Sample: {int(graph.sample_mask().sum())} of {len(graph.index)} rows with an age")
+    for name in args.models or MODELS:
+        features, response, options = MODELS[name]
+        start = time.perf_counter()
+        X, y = graph.design(features, response, **options)
+        print(f"  {name}: {X.shape[0]} rows x {X.shape[1]} columns, response {response} "
+              f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    print("\nNodes computed:", ', '.join(f"{name} x{n}" for name, n in graph.computations.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+"""
+Forward Selection - Regression Models
+=====================================
+Forward selection for the week 3 regression notebook. At each step the
+remaining candidate with the lowest p-value is added, until no candidate
+has p < significance_level. The selected features, the printed progress
+and the returned statsmodels results are the same as refitting every
+candidate model with sm.OLS / sm.Logit, but each step is much cheaper:
+
+  - OLS: the Gram matrix [1 X]'[1 X] is computed once. Its Cholesky
+    factor for the selected columns grows by one row per step (a
+    rank-one update), and the t-test of every candidate follows from
+    that factor in a few vectorized operations. No candidate model is
+    ever fitted.
+  - Logit: each candidate is fitted by Newton's method, starting from
+    the current model's coefficients plus 0 for the candidate, so it
+    converges in a few iterations. Candidates can be fitted in parallel
+    threads (n_jobs).
+  - Ordinal (ordered logit): the same, with the Newton solver of
+    ordinal_logit.py; each candidate starts from the current slopes and
+    thresholds plus 0 for the candidate.
+
+Usage:
+    from forward_selection import (forward_selection, logistic_forward_selection,
+                                   ordinal_forward_selection)
+    selected_features, final_model = forward_selection(X_multi, y_multi)
+    selected_features_log, final_model_log = logistic_forward_selection(
+        X_log_full, y_log_full, n_jobs=4)
+    selected_features_ord, final_model_ord = ordinal_forward_selection(X_ord_full, y_ord)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import statsmodels.api as sm
+from scipy import stats
+
+from ordinal_logit import fit_ordinal
+
+# A candidate whose residual sum of squares (after regressing it on the
+# selected columns) is below this fraction of its own sum of squares is
+# collinear with the model and is skipped
+ALIAS_TOLERANCE = 1e-10
+
+# Candidates whose p-values agree to this relative tolerance are tied
+# (e.g. two levels of the same one-hot block span the same model); ties
+# go to the earlier column, as in the refit-every-candidate loop
+TIE_TOLERANCE = 1e-9
+
+NEWTON_MAXITER = 35
+NEWTON_TOL = 1e-10
+
+
+def best_candidate(pvalues):
+    """Index of the lowest p-value (earliest among ties), or None if all NaN."""
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    if np.isnan(pvalues).all():
+        return None
+    lowest = np.nanmin(pvalues)
+    return int(np.flatnonzero(pvalues <= lowest * (1 + TIE_TOLERANCE))[0])
+
+
+# ============================================================
+# OLS: partial t-tests from a growing Cholesky factor
+# ============================================================
+class OLSCandidateScorer:
+    """t-test p-values of every candidate column, given the selected ones.
+
+    Z = [1 X] and y are reduced once to their cross-products. With L the
+    Cholesky factor of Z_S'Z_S for the selected columns S, the rows
+    B = L^-1 Z_S'Z and c = L^-1 Z_S'y give, for each candidate j,
+
+        r_j'r_j = Z_j'Z_j - |B_j|^2    (x_j after regressing out S)
+        r_j'e   = Z_j'y  - B_j'c        (e = residuals of y on S)
+
+    which is all the t-test for adding x_j needs.
+    """
+
+    def __init__(self, X, y):
+        Z = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=np.float64)])
+        y = np.asarray(y, dtype=np.float64)
+        self.n = len(y)
+        self.gram = Z.T @ Z
+        self.zy = Z.T @ y
+        self.yy = y @ y
+        self.sst = ((y - y.mean()) ** 2).sum()
+        # Start from the constant-only model
+        self.selected = []
+        self.B = np.empty((0, self.gram.shape[0]))
+        self.c = np.empty(0)
+        self._add_column(0)
+
+    @property
+    def sse(self):
+        """Residual sum of squares of the current model."""
+        return self.yy - self.c @ self.c
+
+    @property
+    def rsquared(self):
+        return 1 - self.sse / self.sst
+
+    def _add_column(self, col):
+        """Extend the Cholesky rows B and c by column `col` (rank-one update)."""
+        b = self.B[:, col]
+        d = np.sqrt(self.gram[col, col] - b @ b)
+        new_row = (self.gram[col] - b @ self.B) / d
+        self.B = np.vstack([self.B, new_row])
+        self.c = np.append(self.c, (self.zy[col] - b @ self.c) / d)
+        self.selected.append(col)
+
+    def add(self, feature):
+        """Add candidate `feature` (0-based column of X) to the model."""
+        self._add_column(feature + 1)
+
+    def pvalues(self):
+        """p-value of each column of X if it were added next (NaN if selected)."""
+        rr = np.diag(self.gram) - (self.B ** 2).sum(axis=0)
+        re = self.zy - self.B.T @ self.c
+        df_resid = self.n - len(self.selected) - 1
+        aliased = rr <= ALIAS_TOLERANCE * np.diag(self.gram)
+        aliased[self.selected] = True
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coef = re / rr
+            sse = self.sse - re * coef
+            t = coef / np.sqrt(sse / df_resid / rr)
+        pvalues = 2 * stats.t.sf(np.abs(t), df_resid)
+        pvalues[aliased] = np.nan
+        return pvalues[1:]
+
+
+def forward_selection(X, y, significance_level=0.05):
+    """Forward selection for OLS by partial t-test p-values.
+
+    Returns (selected_features, final_model), where final_model is the
+    statsmodels OLS results of the selected features (None if none).
+    """
+    features = X.columns.tolist()
+    scorer = OLSCandidateScorer(X, y)
+    selected_features = []
+
+    print('Forward Selection Progress:\n')
+
+    while len(selected_features) < len(features):
+        pvalues = scorer.pvalues()
+        best = best_candidate(pvalues)
+        if best is None:
+            break
+        best_pvalue = pvalues[best]
+
+        # If best feature meets significance criterion, add it
+        if best_pvalue < significance_level:
+            scorer.add(best)
+            selected_features.append(features[best])
+
+            print(f'Step {len(selected_features)}:')
+            print(f'Added feature: {features[best]}')
+            print(f'P-value: {best_pvalue:.4f}')
+            print(f'Current R-squared: {scorer.rsquared:.4f}\n')
+        else:
+            break
+
+    # Fit final model
+    if selected_features:
+        X_with_const = sm.add_constant(X[selected_features])
+        final_model = sm.OLS(y, X_with_const).fit()
+
+        print('Final Model Summary:')
+        print('Selected features:', ', '.join(selected_features))
+        print('\nCoefficient Statistics:')
+        print(final_model.summary().tables[1])
+        print(f'\nFinal R-squared: {final_model.rsquared:.4f}')
+        print(f'Adjusted R-squared: {final_model.rsquared_adj:.4f}')
+
+        return selected_features, final_model
+    else:
+        print('No features were selected.')
+        return [], None
+
+
+# ============================================================
+# Logit: warm-started Newton fits
+# ============================================================
+def _log_likelihood(Z, y, params):
+    eta = Z @ params
+    return (y * eta - np.logaddexp(0, eta)).sum()
+
+
+def fit_logit(Z, y, start=None, maxiter=NEWTON_MAXITER, tol=NEWTON_TOL):
+    """Maximum-likelihood logistic regression by Newton's method.
+
+    Returns (params, covariance, log-likelihood); the covariance is None
+    when the Hessian is singular (aliased columns or separation).
+    """
+    params = np.zeros(Z.shape[1]) if start is None else np.array(start, dtype=np.float64)
+    for _ in range(maxiter):
+        prob = 1 / (1 + np.exp(-(Z @ params)))
+        gradient = Z.T @ (y - prob)
+        hessian = (Z * (prob * (1 - prob))[:, None]).T @ Z
+        try:
+            step = np.linalg.solve(hessian, gradient)
+        except np.linalg.LinAlgError:
+            return params, None, _log_likelihood(Z, y, params)
+        params = params + step
+        if np.abs(step).max() < tol:
+            break
+    prob = 1 / (1 + np.exp(-(Z @ params)))
+    hessian = (Z * (prob * (1 - prob))[:, None]).T @ Z
+    try:
+        covariance = np.linalg.inv(hessian)
+    except np.linalg.LinAlgError:
+        covariance = None
+    return params, covariance, _log_likelihood(Z, y, params)
+
+
+def _logit_candidate_pvalue(Z, y, columns, start):
+    """Wald p-value of the last column in `columns`, warm-started at `start`."""
+    params, covariance, _ = fit_logit(Z[:, columns], y, start)
+    if covariance is None or not covariance[-1, -1] > 0:
+        return np.nan
+    z = params[-1] / np.sqrt(covariance[-1, -1])
+    return 2 * stats.norm.sf(abs(z))
+
+
+def logistic_forward_selection(X, y, significance_level=0.05, n_jobs=None):
+    """Forward selection for Logit by Wald p-values.
+
+    Each candidate model is fitted from the previous step's coefficients.
+    n_jobs > 1 fits the candidates of a step in that many threads.
+    Returns (selected_features, final_model), where final_model is the
+    statsmodels Logit results of the selected features (None if none).
+    """
+    features = X.columns.tolist()
+    Z = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=np.float64)])
+    y_values = np.asarray(y, dtype=np.float64)
+    selected_features = []
+    columns = [0]
+    params, _, llf = fit_logit(Z[:, columns], y_values)
+    llnull = llf
+
+    print('Forward Selection Progress:\n')
+
+    pool = ThreadPoolExecutor(max_workers=n_jobs) if n_jobs and n_jobs > 1 else None
+    try:
+        remaining = list(range(len(features)))
+        while remaining:
+            start = np.append(params, 0.0)
+            jobs = [(Z, y_values, columns + [j + 1], start) for j in remaining]
+            if pool is None:
+                pvalues = [_logit_candidate_pvalue(*job) for job in jobs]
+            else:
+                pvalues = list(pool.map(lambda job: _logit_candidate_pvalue(*job), jobs))
+            index = best_candidate(pvalues)
+            if index is None:
+                break
+            best, best_pvalue = remaining[index], pvalues[index]
+
+            # If best feature meets significance criterion, add it
+            if best_pvalue < significance_level:
+                selected_features.append(features[best])
+                remaining.remove(best)
+                columns = columns + [best + 1]
+                params, _, llf = fit_logit(Z[:, columns], y_values, start=np.append(params, 0.0))
+
+                print(f'Step {len(selected_features)}:')
+                print(f'Added feature: {features[best]}')
+                print(f'P-value: {best_pvalue:.4f}')
+                print(f'Current Pseudo R-squared: {1 - llf / llnull:.4f}\n')
+            else:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Fit final model
+    if selected_features:
+        X_with_const = sm.add_constant(X[selected_features])
+        final_model = sm.Logit(y, X_with_const).fit(method='newton')
+
+        print('Final Model Summary:')
+        print('Selected features:', ', '.join(selected_features))
+        print('\nCoefficient Statistics:')
+        print(final_model.summary().tables[1])
+        print(f'\nPseudo R-squared: {final_model.prsquared:.4f}')
+        print(f'Log-Likelihood: {final_model.llf:.2f}')
+        print(f'LLR p-value: {final_model.llr_pvalue:.4f}')
+
+        return selected_features, final_model
+    else:
+        print('No features were selected.')
+        return [], None
+
+
+# ============================================================
+# Ordinal: warm-started ordered logit fits
+# ============================================================
+def _ordinal_candidate_pvalue(X, y, columns, start):
+    """Wald p-value of the last column in `columns`, warm-started at `start`."""
+    result = fit_ordinal(X[:, columns], y, start=start)
+    bse = result.bse.iloc[len(columns) - 1]
+    if not bse > 0:
+        return np.nan
+    return result.pvalues.iloc[len(columns) - 1]
+
+
+def ordinal_forward_selection(X, y, significance_level=0.05, n_jobs=None):
+    """Forward selection for an ordered logit (OrderedModel, distr='logit').
+
+    Each candidate model is fitted from the previous step's slopes and
+    thresholds. n_jobs > 1 fits the candidates of a step in that many
+    threads. Returns (selected_features, final_model), where final_model
+    is the statsmodels OrderedModel results of the selected features
+    (None if none).
+    """
+    from statsmodels.miscmodels.ordinal_model import OrderedModel
+
+    features = X.columns.tolist()
+    X_values = np.asarray(X, dtype=np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+    selected_features = []
+    columns = []
+    # Null model: no slopes, only the thresholds
+    result = fit_ordinal(X_values[:, columns], y_values)
+    params = result.params.to_numpy()
+
+    print('Forward Selection Progress:\n')
+
+    pool = ThreadPoolExecutor(max_workers=n_jobs) if n_jobs and n_jobs > 1 else None
+    try:
+        remaining = list(range(len(features)))
+        while remaining:
+            # Slopes come first, so the new slope goes before the thresholds
+            start = np.insert(params, len(columns), 0.0)
+            jobs = [(X_values, y_values, columns + [j], start) for j in remaining]
+            if pool is None:
+                pvalues = [_ordinal_candidate_pvalue(*job) for job in jobs]
+            else:
+                pvalues = list(pool.map(lambda job: _ordinal_candidate_pvalue(*job), jobs))
+            index = best_candidate(pvalues)
+            if index is None:
+                break
+            best, best_pvalue = remaining[index], pvalues[index]
+
+            # If best feature meets significance criterion, add it
+            if best_pvalue < significance_level:
+                selected_features.append(features[best])
+                remaining.remove(best)
+                columns = columns + [best]
+                result = fit_ordinal(X_values[:, columns], y_values, start=start)
+                params = result.params.to_numpy()
+
+                print(f'Step {len(selected_features)}:')
+                print(f'Added feature: {features[best]}')
+                print(f'P-value: {best_pvalue:.4f}')
+                print(f'Current Pseudo R-squared: {result.prsquared:.4f}\n')
+            else:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Fit final model, starting BFGS at the Newton solution
+    if selected_features:
+        final_model = OrderedModel(y, X[selected_features], distr='logit').fit(
+            method='bfgs', start_params=params, disp=False)
+
+        print('Final Model Summary:')
+        print('Selected features:', ', '.join(selected_features))
+        print('\nCoefficient Statistics:')
+        print(final_model.summary().tables[1])
+        print(f'\nPseudo R-squared: {final_model.prsquared:.4f}')
+        print(f'Log-Likelihood: {final_model.llf:.2f}')
+        print(f'LLR p-value: {final_model.llr_pvalue:.4f}')
+
+        return selected_features, final_model
+    else:
+        print('No features were selected.')
+        return [], None
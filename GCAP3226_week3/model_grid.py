@@ -0,0 +1,178 @@
+"""
+Model Grid - Regression Models
+==============================
+Fits every simple (one-predictor) regression of a list of responses on a
+list of predictors in one call, and returns a single tidy coefficient
+table instead of one hand-written cell per model.
+
+  - OLS responses: all predictors at once in closed form. Per-predictor
+    sums (n, sum x, sum y, sum x^2, sum xy, sum y^2) over the rows where
+    both values are present come from a few matrix products.
+  - Logit and ordinal (OrderedModel, logit link) responses: one fit per
+    predictor, in a pool of worker processes. Only the two columns of
+    each model are sent to a worker. Ordinal models are fitted by Newton's
+    method with analytic derivatives (see ordinal_logit.py).
+
+Each model uses the rows where its response and predictor are both
+present, as X.dropna() does in the notebook, and the estimates match
+sm.OLS, sm.Logit and OrderedModel(...).fit(method='bfgs').
+
+Usage:
+    from model_grid import fit_model_grid
+    table = fit_model_grid(df, ['support_info', 'Support_binary', 'Support_ordinal'],
+                           ['fairness_c', 'Distance_artificial'])
+    table[table['term'] != 'const']
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from forward_selection import fit_logit
+from ordinal_logit import fit_ordinal
+
+# Model used for each response of the notebook; other responses are
+# passed as {response: kind}
+RESPONSE_KINDS = {
+    'support_info': 'ols',
+    'Support_binary': 'logit',
+    'Support_ordinal': 'ordinal',
+}
+MODEL_KINDS = ('ols', 'logit', 'ordinal')
+
+TABLE_COLUMNS = ['response', 'model', 'predictor', 'term', 'coef', 'std_err', 'stat',
+                 'p_value', 'ci_low', 'ci_high', 'nobs', 'rsquared']
+
+
+def _rows(response, kind, predictor, terms, coef, bse, stat, pvalues, q, nobs, rsquared):
+    """Tidy table rows of one fitted model."""
+    return [{'response': response, 'model': kind, 'predictor': predictor, 'term': term,
+             'coef': c, 'std_err': s, 'stat': t, 'p_value': p,
+             'ci_low': c - q * s, 'ci_high': c + q * s, 'nobs': nobs, 'rsquared': rsquared}
+            for term, c, s, t, p in zip(terms, coef, bse, stat, pvalues)]
+
+
+# ============================================================
+# OLS: closed form for all predictors at once
+# ============================================================
+def fit_ols_grid(df, response, predictors, alpha=0.05):
+    """Simple OLS of `response` on each predictor; returns tidy rows.
+
+    R-squared is the squared correlation over each model's own rows.
+    """
+    y = df[response].to_numpy(dtype=np.float64)
+    X = df[predictors].to_numpy(dtype=np.float64)
+    # valid[i, j]: row i has both y and predictor j
+    valid = ~np.isnan(X) & ~np.isnan(y)[:, None]
+    W = valid.astype(np.float64)
+    Xz = np.where(valid, X, 0.0)
+    yz = np.where(np.isnan(y), 0.0, y)
+
+    n = W.sum(axis=0)
+    sx, sxx = Xz.sum(axis=0), (Xz ** 2).sum(axis=0)
+    sy, syy = yz @ W, (yz ** 2) @ W
+    sxy = yz @ Xz
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx_c = sxx - sx ** 2 / n
+        syy_c = syy - sy ** 2 / n
+        sxy_c = sxy - sx * sy / n
+        slope = sxy_c / sxx_c
+        intercept = (sy - slope * sx) / n
+        df_resid = n - 2
+        scale = (syy_c - slope * sxy_c) / df_resid
+        se_slope = np.sqrt(scale / sxx_c)
+        se_intercept = np.sqrt(scale * (1 / n + (sx / n) ** 2 / sxx_c))
+        rsquared = sxy_c ** 2 / (sxx_c * syy_c)
+
+    rows = []
+    for j, predictor in enumerate(predictors):
+        coef = np.array([intercept[j], slope[j]])
+        bse = np.array([se_intercept[j], se_slope[j]])
+        tvalues = coef / bse
+        pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid[j])
+        q = stats.t.ppf(1 - alpha / 2, df_resid[j])
+        rows += _rows(response, 'ols', predictor, ['const', predictor], coef, bse,
+                      tvalues, pvalues, q, int(n[j]), rsquared[j])
+    return rows
+
+
+# ============================================================
+# Logit and ordinal: one fit per predictor, in worker processes
+# ============================================================
+def _fit_logit_model(y, x, predictor):
+    Z = np.column_stack([np.ones(len(x)), x])
+    params, covariance, llf = fit_logit(Z, y)
+    llnull = fit_logit(Z[:, :1], y)[2]
+    bse = (np.sqrt(np.diag(covariance)) if covariance is not None
+           else np.full(2, np.nan))
+    return ['const', predictor], params, bse, 1 - llf / llnull
+
+
+def _fit_ordinal_model(y, x, predictor):
+    result = fit_ordinal(pd.DataFrame({predictor: x}), y)
+    return list(result.params.index), result.params.to_numpy(), result.bse.to_numpy(), \
+        result.prsquared
+
+
+def _fit_single(kind, y, x, predictor):
+    if kind == 'logit':
+        return _fit_logit_model(y, x, predictor)
+    return _fit_ordinal_model(y, x, predictor)
+
+
+def fit_model_grid(df, responses, predictors, kinds=None, processes=None, alpha=0.05):
+    """Fit every simple regression of `responses` x `predictors`.
+
+    kinds maps a response to 'ols', 'logit' or 'ordinal' (default:
+    RESPONSE_KINDS). processes=None uses one worker per CPU core for the
+    logit/ordinal fits; processes=1 fits them in this process.
+
+    Returns a DataFrame with one row per (response, predictor, term):
+    coefficient, standard error, t or z statistic, p-value, confidence
+    interval, number of observations and R-squared (McFadden's pseudo
+    R-squared for logit and ordinal models).
+    """
+    kinds = dict(RESPONSE_KINDS, **(kinds or {}))
+    for response in responses:
+        if kinds.get(response) not in MODEL_KINDS:
+            raise ValueError(f"No model kind for response {response!r}; pass "
+                             f"kinds={{{response!r}: one of {MODEL_KINDS}}}")
+
+    model_rows = {}
+    jobs = []
+    for response in responses:
+        if kinds[response] == 'ols':
+            for row in fit_ols_grid(df, response, predictors, alpha):
+                model_rows.setdefault((response, row['predictor']), []).append(row)
+            continue
+        for predictor in predictors:
+            pair = df[[response, predictor]].dropna()
+            jobs.append((response, predictor, pair[response].to_numpy(dtype=np.float64),
+                         pair[predictor].to_numpy(dtype=np.float64)))
+
+    if processes == 1 or len(jobs) <= 1:
+        fits = [_fit_single(kinds[response], y, x, predictor)
+                for response, predictor, y, x in jobs]
+    else:
+        workers = min(processes or os.cpu_count() or 1, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_fit_single, kinds[response], y, x, predictor)
+                       for response, predictor, y, x in jobs]
+            fits = [future.result() for future in futures]
+
+    # Logit and ordinal models use z-statistics, as statsmodels does
+    q = stats.norm.ppf(1 - alpha / 2)
+    for (response, predictor, y, _), (terms, coef, bse, rsquared) in zip(jobs, fits):
+        zvalues = coef / bse
+        pvalues = 2 * stats.norm.sf(np.abs(zvalues))
+        model_rows[response, predictor] = _rows(response, kinds[response], predictor, terms,
+                                                coef, bse, zvalues, pvalues, q, len(y),
+                                                rsquared)
+
+    rows = [row for response in responses for predictor in predictors
+            for row in model_rows[response, predictor]]
+    return pd.DataFrame(rows, columns=TABLE_COLUMNS)
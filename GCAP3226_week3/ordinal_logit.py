@@ -0,0 +1,236 @@
+"""
+Ordinal Logit - Regression Models
+=================================
+Proportional-odds (ordered logit) regression for Support_ordinal, fitted
+by Newton's method with the analytic gradient and Hessian instead of
+OrderedModel(...).fit(method='bfgs') and its numerical derivatives.
+
+The model is the one of statsmodels' OrderedModel with distr='logit':
+
+    P(y <= level j) = F(cut_j - x'beta),   F = logistic function
+
+and results use its parametrization and names, so they can be compared
+directly: the slopes, then the first cut point, then the log of each
+increase between cut points ('1.0/2.0', '2.0/3.0', ...). Newton steps are
+taken in (beta, cut points), where the log-likelihood is concave; the
+covariance is carried over to OrderedModel's parameters with the
+Jacobian of that change of variables.
+
+When the predictors are discrete (Likert items such as fairness_c), many
+respondents share the same predictors and response. Those rows are fitted
+once with a count (aggregate='auto' does this when it at least halves the
+rows), which gives exactly the same estimates.
+
+A fit can start from the parameters of a smaller model plus 0 for the new
+column (start=...), as ordinal forward selection does, so it converges in
+a few iterations.
+
+Usage:
+    from ordinal_logit import fit_ordinal
+    result = fit_ordinal(df_ord[['fairness_c']], df_ord['Support_ordinal'])
+    result.params, result.bse, result.pvalues, result.prsquared
+"""
+
+import warnings
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+NEWTON_MAXITER = 50
+NEWTON_TOL = 1e-10
+
+# Aggregate by covariate pattern when it keeps at most this share of rows
+AGGREGATE_RATIO = 0.5
+
+
+class OrdinalResult(namedtuple('OrdinalResult', ['params', 'bse', 'cov_params', 'llf', 'llnull',
+                                                 'nobs', 'levels', 'iterations', 'converged'])):
+    """A fitted ordered logit, with OrderedModel's result attribute names."""
+    __slots__ = ()
+
+    @property
+    def tvalues(self):
+        """z statistics of the parameters."""
+        return self.params / self.bse
+
+    @property
+    def pvalues(self):
+        """Two-sided p-values of the z statistics."""
+        return pd.Series(2 * stats.norm.sf(np.abs(self.tvalues)), index=self.params.index)
+
+    @property
+    def prsquared(self):
+        """McFadden's pseudo R-squared."""
+        return 1 - self.llf / self.llnull
+
+
+def aggregate_patterns(X, codes, weights=None):
+    """Unique (predictor row, response code) pairs and how often each occurs.
+
+    Returns (X, codes, counts) with one row per distinct pair; with
+    frequency `weights`, each count is the sum of the pair's weights.
+    """
+    rows = np.column_stack([X, codes])
+    # One integer key per row (mixed radix over each column's distinct
+    # values): a 1-D unique is much faster than np.unique(rows, axis=0)
+    key = np.zeros(len(rows), dtype=np.int64)
+    radix = 1
+    for col in rows.T:
+        values, inverse = np.unique(col, return_inverse=True)
+        radix *= len(values)
+        if radix >= 2 ** 62:
+            unique, pattern = np.unique(rows, axis=0, return_inverse=True)
+            break
+        key = key * len(values) + inverse
+    else:
+        _, first, pattern = np.unique(key, return_index=True, return_inverse=True)
+        unique = rows[first]
+    counts = np.bincount(pattern.ravel(), weights=weights, minlength=len(unique))
+    return unique[:, :-1], unique[:, -1].astype(np.int64), counts.astype(np.float64)
+
+
+def cuts_to_params(cuts):
+    """Cut points -> OrderedModel threshold parameters (first cut, log increments)."""
+    return np.concatenate([cuts[:1], np.log(np.diff(cuts))])
+
+
+def params_to_cuts(params):
+    """OrderedModel threshold parameters -> cut points."""
+    return np.cumsum(np.concatenate([params[:1], np.exp(params[1:])]))
+
+
+def _log_likelihood_terms(X, codes, weights, beta, cuts):
+    """Per-row pieces shared by the log-likelihood and its derivatives."""
+    eta = X @ beta
+    # Cut points below and above each row's response; +-inf at the ends
+    bounds = np.concatenate([[-np.inf], cuts, [np.inf]])
+    upper = bounds[codes + 1] - eta
+    lower = bounds[codes] - eta
+    F_upper, F_lower = special.expit(upper), special.expit(lower)
+    prob = np.maximum(F_upper - F_lower, np.finfo(np.float64).tiny)
+    return upper, lower, F_upper, F_lower, prob
+
+
+def log_likelihood(X, codes, weights, beta, cuts):
+    *_, prob = _log_likelihood_terms(X, codes, weights, beta, cuts)
+    return float(weights @ np.log(prob))
+
+
+def _derivatives(X, codes, weights, beta, cuts):
+    """Log-likelihood, gradient and Hessian in (beta, cut points)."""
+    n_rows, k = X.shape
+    n_cuts = len(cuts)
+    upper, lower, F_upper, F_lower, prob = _log_likelihood_terms(X, codes, weights, beta, cuts)
+    f_upper, f_lower = F_upper * (1 - F_upper), F_lower * (1 - F_lower)
+    df_upper, df_lower = f_upper * (1 - 2 * F_upper), f_lower * (1 - 2 * F_lower)
+
+    # prob = F(theta'A) - F(theta'B) with A = (-x, e_upper cut), B = (-x, e_lower cut);
+    # a missing cut (first or last level) has F = 1 or 0 and no derivative
+    A = np.zeros((n_rows, k + n_cuts))
+    B = np.zeros((n_rows, k + n_cuts))
+    A[:, :k] = B[:, :k] = -X
+    rows = np.arange(n_rows)
+    has_upper, has_lower = codes < n_cuts, codes > 0
+    A[rows[has_upper], k + codes[has_upper]] = 1.0
+    B[rows[has_lower], k + codes[has_lower] - 1] = 1.0
+
+    # d log p = (f_u A - f_l B) / p;  d2 log p = (f'_u AA' - f'_l BB') / p - d log p d log p'
+    score = (A * f_upper[:, None] - B * f_lower[:, None]) / prob[:, None]
+    gradient = weights @ score
+    hessian = ((A * (weights * df_upper / prob)[:, None]).T @ A
+               - (B * (weights * df_lower / prob)[:, None]).T @ B
+               - (score * weights[:, None]).T @ score)
+    return float(weights @ np.log(prob)), gradient, hessian
+
+
+def _threshold_jacobian(cuts):
+    """d(cut points) / d(OrderedModel threshold parameters)."""
+    n_cuts = len(cuts)
+    increments = np.concatenate([[1.0], np.diff(cuts)])
+    return np.tril(np.ones((n_cuts, n_cuts))) * increments[None, :]
+
+
+def fit_ordinal(X, y, start=None, weights=None, aggregate='auto',
+                maxiter=NEWTON_MAXITER, tol=NEWTON_TOL):
+    """Ordered logit of y on X (no constant), as OrderedModel(y, X, distr='logit').
+
+    `start` is a parameter vector in OrderedModel's order (slopes, then
+    thresholds), e.g. a smaller model's params with 0 for a new column.
+    `weights` are frequency weights (counts per row). aggregate=True fits
+    unique (predictors, response) rows with their summed weights; 'auto'
+    does so when it at least halves the rows. Returns an OrdinalResult;
+    a ConvergenceWarning is issued when Newton's method did not converge.
+    """
+    names = (list(X.columns) if isinstance(X, pd.DataFrame)
+             else [f'x{i + 1}' for i in range(np.shape(X)[1])])
+    X = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+    levels, codes = np.unique(np.asarray(y, dtype=np.float64), return_inverse=True)
+    codes = codes.astype(np.int64)
+    weights = np.ones(len(codes)) if weights is None else np.asarray(weights, dtype=np.float64)
+    if len(levels) < 2:
+        raise ValueError("The response needs at least two levels")
+    k, n_cuts = X.shape[1], len(levels) - 1
+
+    if aggregate is True or aggregate == 'auto':
+        Xa, codes_a, counts = aggregate_patterns(X, codes, weights)
+        if aggregate is True or len(counts) <= AGGREGATE_RATIO * len(codes):
+            X, codes, weights = Xa, codes_a, counts
+
+    # Null model: cut points at the logits of the cumulative proportions
+    level_counts = np.bincount(codes, weights=weights, minlength=n_cuts + 1)
+    cumulative = np.cumsum(level_counts)[:-1] / level_counts.sum()
+    llnull = float(level_counts[level_counts > 0] @ np.log(level_counts[level_counts > 0]
+                                                            / level_counts.sum()))
+    if start is None:
+        beta, cuts = np.zeros(k), np.log(cumulative / (1 - cumulative))
+    else:
+        start = np.asarray(start, dtype=np.float64)
+        beta, cuts = start[:k].copy(), params_to_cuts(start[k:])
+
+    llf, gradient, hessian = _derivatives(X, codes, weights, beta, cuts)
+    converged = False
+    iteration = 0
+    for iteration in range(1, maxiter + 1):
+        try:
+            step = np.linalg.solve(hessian, -gradient)
+        except np.linalg.LinAlgError:
+            break
+        # Halve the step until the cut points stay ordered and the fit improves
+        scale = 1.0
+        while scale > 1e-8:
+            new_beta, new_cuts = beta + scale * step[:k], cuts + scale * step[k:]
+            if (np.diff(new_cuts) > 0).all():
+                new_llf = log_likelihood(X, codes, weights, new_beta, new_cuts)
+                if new_llf >= llf - 1e-12 * abs(llf):
+                    break
+            scale /= 2
+        else:
+            break
+        beta, cuts = new_beta, new_cuts
+        llf, gradient, hessian = _derivatives(X, codes, weights, beta, cuts)
+        if np.abs(scale * step).max() < tol:
+            converged = True
+            break
+    if not converged:
+        warnings.warn(f"Newton's method did not converge after {iteration} iterations; "
+                      "check result.iterations or pass a larger maxiter", ConvergenceWarning,
+                      stacklevel=2)
+
+    # Covariance of (beta, cut points), then of OrderedModel's parameters
+    jacobian = np.eye(k + n_cuts)
+    jacobian[k:, k:] = _threshold_jacobian(cuts)
+    try:
+        cov_cuts = np.linalg.inv(-hessian)
+        inverse = np.linalg.inv(jacobian)
+        cov = inverse @ cov_cuts @ inverse.T
+    except np.linalg.LinAlgError:
+        cov = np.full((k + n_cuts, k + n_cuts), np.nan)
+
+    index = names + [f'{levels[j]}/{levels[j + 1]}' for j in range(n_cuts)]
+    params = pd.Series(np.concatenate([beta, cuts_to_params(cuts)]), index=index)
+    bse = pd.Series(np.sqrt(np.diag(cov)), index=index)
+    return OrdinalResult(params, bse, pd.DataFrame(cov, index=index, columns=index), llf,
+                         llnull, float(weights.sum()), levels, iteration, converged)
@@ -0,0 +1,182 @@
+"""
+Sufficient-Statistics OLS - Regression Models
+=============================================
+Ordinary least squares from accumulated cross-products, for data that is
+too large to hold in memory (e.g. every survey wave at once).
+
+An OLSAccumulator keeps only n, Z'Z, Z'y and y'y for Z = [1 X]. It is
+updated chunk by chunk, and accumulators of different files can be
+merged, so each file can be processed in its own worker process. fit()
+then gives the same coefficients, standard errors, t-statistics,
+p-values, confidence intervals, R-squared and F-test as sm.OLS on the
+full data (rows with missing values are dropped, as with .dropna()).
+
+Centering a predictor on its overall mean, as the notebook does with the
+*_c columns, is a linear change of Z. fit(center=[...]) applies it to the
+accumulated sums, so no second pass over the data is needed to learn the
+means.
+
+Usage:
+    from sufficient_ols import OLSAccumulator, accumulate_csv
+    acc = OLSAccumulator(['fairness'], 'support_info')
+    for chunk in pd.read_csv('GCAP3226_week3.csv', chunksize=10_000):
+        acc.update(chunk)
+    result = acc.fit(center=['fairness'])
+    print(result.coef_table())
+
+    # One accumulator per file in a process pool, then merged
+    acc = accumulate_csv(['wave1.csv', 'wave2.csv'], ['fairness'], 'support_info')
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class OLSAccumulator:
+    """Running n, Z'Z, Z'y and y'y for the regression of `response` on `columns`."""
+
+    def __init__(self, columns, response):
+        self.columns = list(columns)
+        self.response = response
+        k = len(self.columns) + 1
+        self.n = 0
+        self.zz = np.zeros((k, k))
+        self.zy = np.zeros(k)
+        self.yy = 0.0
+        self.y_sum = 0.0
+
+    def update(self, df):
+        """Add the complete rows of a DataFrame chunk."""
+        data = df[self.columns + [self.response]].dropna().to_numpy(dtype=np.float64)
+        if len(data) == 0:
+            return self
+        Z = np.column_stack([np.ones(len(data)), data[:, :-1]])
+        y = data[:, -1]
+        self.n += len(y)
+        self.zz += Z.T @ Z
+        self.zy += Z.T @ y
+        self.yy += y @ y
+        self.y_sum += y.sum()
+        return self
+
+    def merge(self, other):
+        """Add the sums of another accumulator over the same model."""
+        if (other.columns, other.response) != (self.columns, self.response):
+            raise ValueError('Cannot merge accumulators of different models')
+        self.n += other.n
+        self.zz += other.zz
+        self.zy += other.zy
+        self.yy += other.yy
+        self.y_sum += other.y_sum
+        return self
+
+    def means(self):
+        """Mean of each predictor over the accumulated rows."""
+        return pd.Series(self.zz[0, 1:] / self.n, index=self.columns)
+
+    def fit(self, center=()):
+        """OLS estimates from the accumulated sums.
+
+        Predictors listed in `center` are centered on their mean first;
+        only the intercept (and its standard error) changes.
+        """
+        if self.n == 0:
+            raise ValueError('No complete rows have been accumulated')
+        names = ['const'] + self.columns
+        # Z_c = Z T: column j becomes x_j - mean_j for the centered columns
+        T = np.eye(len(names))
+        means = self.zz[0] / self.n
+        for col in center:
+            j = names.index(col)
+            T[0, j] = -means[j]
+        zz = T.T @ self.zz @ T
+        zy = T.T @ self.zy
+        return OLSResult(names, self.n, zz, zy, self.yy, self.y_sum)
+
+
+class OLSResult:
+    """Coefficient statistics and fit measures, named like statsmodels'."""
+
+    def __init__(self, names, n, zz, zy, yy, y_sum):
+        # statsmodels solves with the pseudo-inverse too, so rank-deficient
+        # designs give the same (minimum-norm) estimates
+        cov_unscaled = np.linalg.pinv(zz)
+        params = cov_unscaled @ zy
+        rank = np.linalg.matrix_rank(zz)
+
+        self.nobs = n
+        self.df_model = rank - 1
+        self.df_resid = n - rank
+        self.ssr = yy - params @ zy
+        self.centered_tss = yy - y_sum ** 2 / n
+        self.scale = self.ssr / self.df_resid
+
+        self.params = pd.Series(params, index=names)
+        self.bse = pd.Series(np.sqrt(np.diag(cov_unscaled) * self.scale), index=names)
+        self.tvalues = self.params / self.bse
+        self.pvalues = pd.Series(2 * stats.t.sf(np.abs(self.tvalues), self.df_resid),
+                                 index=names)
+        self.rsquared = 1 - self.ssr / self.centered_tss
+        self.rsquared_adj = 1 - (n - 1) / self.df_resid * (1 - self.rsquared)
+        self.fvalue = ((self.centered_tss - self.ssr) / self.df_model) / self.scale
+        self.f_pvalue = stats.f.sf(self.fvalue, self.df_model, self.df_resid)
+
+    def conf_int(self, alpha=0.05):
+        q = stats.t.ppf(1 - alpha / 2, self.df_resid)
+        return pd.DataFrame({0: self.params - q * self.bse, 1: self.params + q * self.bse})
+
+    def coef_table(self, alpha=0.05):
+        """The coefficient table of statsmodels' summary, as a DataFrame."""
+        ci = self.conf_int(alpha)
+        return pd.DataFrame({'coef': self.params, 'std err': self.bse, 't': self.tvalues,
+                             'P>|t|': self.pvalues,
+                             f'[{alpha / 2:g}': ci[0], f'{1 - alpha / 2:g}]': ci[1]})
+
+
+# ============================================================
+# Accumulating CSV files
+# ============================================================
+def accumulate_file(csv_path, columns, response, chunksize=DEFAULT_CHUNKSIZE,
+                    transform=None):
+    """Accumulate one CSV file chunk by chunk.
+
+    `transform(chunk) -> DataFrame` may derive the model columns (e.g. the
+    income or age recodes); it must be a module-level function to run in
+    a worker process. Without it only the needed columns are read.
+    """
+    acc = OLSAccumulator(columns, response)
+    usecols = None if transform is not None else acc.columns + [response]
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunksize):
+        if transform is not None:
+            chunk = transform(chunk)
+        acc.update(chunk)
+    return acc
+
+
+def accumulate_csv(csv_paths, columns, response, chunksize=DEFAULT_CHUNKSIZE,
+                   transform=None, processes=None):
+    """Accumulate several CSV files, one worker process per file, and merge.
+
+    processes=1 reads the files one after another in this process.
+    """
+    if isinstance(csv_paths, str):
+        csv_paths = [csv_paths]
+    total = OLSAccumulator(columns, response)
+    if processes == 1 or len(csv_paths) <= 1:
+        for path in csv_paths:
+            total.merge(accumulate_file(path, columns, response, chunksize, transform))
+        return total
+
+    workers = min(processes or os.cpu_count() or 1, len(csv_paths))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(accumulate_file, path, columns, response, chunksize, transform)
+                   for path in csv_paths]
+        for future in futures:
+            total.merge(future.result())
+    return total
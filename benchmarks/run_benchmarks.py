@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - MSW Charging Scheme Data Visualization
+========================================================
+Times the analysis steps of demo3226week2/ and the week 3 notebook on
+synthetic surveys of increasing size (see synthetic_survey.py), and
+stores the results so runs can be compared for scaling regressions.
+
+Steps (in-memory steps are skipped above --max-in-memory rows):
+  load            load_survey(path, use_cache=False): parse the whole file
+  convert         first cached load: parse and write the Arrow sidecar (CSV only)
+  load_cached     load from the memory-mapped sidecar (CSV only)
+  crosstab        section 3 district x food_waste_behavior cross table
+  summary         section 4 one-pass summary of Distance_artificial
+  relationship    section 5 correlation and sufficient-statistics trend fit
+  render          every chart of run_all_sections.py, rendered in this process
+  render_variants one support_level chart per district from a chart template
+  stream_crosstab section 3 cross table from chunks (any size)
+  stream_summary  section 4 summary from chunks (any size)
+  recode          week 3 one-hot recodes (income, education, age)
+  forward_selection  week 3 OLS forward selection on the notebook's features
+  ordinal         week 3 ordered logit of Support_ordinal on the Likert items
+  bitmap_index    week 3 bitmap index over every one-hot block
+  subgroup        week 3 subgroup sizes and housing counts from the bitmap index
+
+Every step is measured with instrumentation.Instrumentation (wall time,
+CPU time, RSS; tracemalloc with --trace-memory). Each run is saved as
+results/<timestamp>.json and compared with the latest earlier run with
+the same format: steps that got slower at the same size are listed, and
+the 'per 10x' column shows how much the time grows per 10x rows (10 means
+linear scaling).
+
+Usage:
+    python run_benchmarks.py                         # 1e3 ... 1e6 rows, Parquet
+    python run_benchmarks.py --sizes 1e3 1e5 1e7 1e8 --format csv
+    python run_benchmarks.py --steps load crosstab --baseline results/20260101-120000.json
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(ROOT, 'demo3226week2'))
+sys.path.insert(0, os.path.join(ROOT, 'GCAP3226_week3'))
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import REGRESSION_MIN_SECONDS, REGRESSION_RATIO, Instrumentation
+from synthetic_survey import DEFAULT_SEED, write_synthetic
+
+DEFAULT_SIZES = [1e3, 1e4, 1e5, 1e6]
+DEFAULT_MAX_IN_MEMORY = 10_000_000
+FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+WEEK2_STEPS = ('load', 'convert', 'load_cached', 'crosstab', 'summary', 'relationship',
+               'render', 'render_variants', 'stream_crosstab', 'stream_summary')
+WEEK3_STEPS = ('recode', 'forward_selection', 'ordinal', 'bitmap_index', 'subgroup')
+STEPS = WEEK2_STEPS + WEEK3_STEPS
+STREAM_STEPS = ('stream_crosstab', 'stream_summary')
+
+# Predictors of the notebook's forward selection (centered where it centers them)
+WEEK3_FEATURES = ['fairness_c', 'government_consideration_c', 'policy_helpfulness_c',
+                  'waste_severity_c', 'recycling_effort_c', 'LocalResidentcode',
+                  'DailyWasteBags_More than 1 bag', 'DailyWasteBags_Exactly 1 bag',
+                  'HousingType_Other', 'HousingType_Private housing',
+                  'HousingType_Subsidized housing', 'age_c', 'income_c', 'education_c',
+                  'recycle_frequency_c', 'household_size_c', 'total_score_c']
+
+# Predictors of the 'ordinal' step: discrete, so rows collapse to patterns
+ORDINAL_FEATURES = ['fairness_c', 'government_consideration_c', 'policy_helpfulness_c',
+                    'waste_severity_c']
+# support_info -> Support_ordinal, as in the notebook
+SUPPORT_ORDINAL = {1: 1, 2: 1, 3: 2, 4: 3, 5: 3}
+
+# Subgroups counted by the 'subgroup' step (conditions of BitmapIndex.count)
+SUBGROUPS = [(age, income) for age in ('AgeRange_18-24', 'AgeRange_25-34', 'AgeRange_35-44',
+                                       'AgeRange_45-54', 'AgeRange_55-64', 'AgeRange_65+')
+             for income in ('HouseholdMonthlyIncomeRange_Below15k',
+                            'HouseholdMonthlyIncomeRange_AboveHK70k')]
+
+
+def data_path(data_dir, schema, rows, fmt, seed):
+    """Generated file for (schema, rows, format, seed), created on first use."""
+    path = os.path.join(data_dir, f"{schema}_{rows}_seed{seed}{FORMATS[fmt]}")
+    if not os.path.exists(path):
+        print(f"  generating {os.path.basename(path)}")
+        write_synthetic(schema, rows, path, seed)
+    return path
+
+
+# ============================================================
+# Steps
+# ============================================================
+def run_week2(path, rows, steps, inst, in_memory, fmt):
+    from charts import FIGURE_JOBS, save_support_by_district
+    from figure_jobs import run_figure_jobs
+    from onehot_crosstab import crosstab_onehot
+    from scatter_density import trend_from_moments, trend_moments
+    from stream_summary import summarize_csv_column, summarize_series
+    from survey_data import clear_memory_cache, load_survey, sidecar_path
+    from survey_stream import stream_aggregates
+
+    def step(name):
+        return inst.section(f"{name}@{rows}")
+
+    if in_memory:
+        df = None
+        if 'load' in steps:
+            with step('load'):
+                df = load_survey(path, use_cache=False)
+        if fmt == 'csv' and 'convert' in steps:
+            # Start from no sidecar, as on the first run over a new file
+            if os.path.exists(sidecar_path(path)):
+                os.remove(sidecar_path(path))
+            clear_memory_cache()
+            with step('convert'):
+                df = load_survey(path)
+        if fmt == 'csv' and 'load_cached' in steps:
+            load_survey(path)  # make sure the sidecar exists
+            clear_memory_cache()
+            with step('load_cached'):
+                df = load_survey(path)
+        if df is None:
+            df = load_survey(path, use_cache=False)
+        clear_memory_cache()
+
+        if 'crosstab' in steps:
+            with step('crosstab'):
+                crosstab_onehot(df, 'HongKongDistrict_', 'food_waste_behavior')
+        if 'summary' in steps:
+            with step('summary'):
+                summarize_series(df['Distance_artificial']).five_number()
+        if 'relationship' in steps:
+            with step('relationship'):
+                df['Distance_artificial'].corr(df['recycling_effort'])
+                trend_from_moments(trend_moments(df['Distance_artificial'],
+                                                 df['recycling_effort']))
+        if 'render' in steps:
+            with tempfile.TemporaryDirectory() as plots_dir, step('render'):
+                run_figure_jobs(FIGURE_JOBS, df, plots_dir, processes=1, incremental=False)
+        if 'render_variants' in steps:
+            with tempfile.TemporaryDirectory() as plots_dir, step('render_variants'):
+                save_support_by_district(df, plots_dir)
+        del df
+
+    if 'stream_crosstab' in steps:
+        with step('stream_crosstab'):
+            stream_aggregates(path, sum_prefixes=['HongKongDistrict_'],
+                              crosstabs=[('HongKongDistrict_', 'food_waste_behavior')])
+    if 'stream_summary' in steps:
+        with step('stream_summary'):
+            summarize_csv_column(path, 'Distance_artificial').five_number()
+
+
+def run_week3(path, rows, steps, inst):
+    from bitmap_index import BitmapIndex
+    from forward_selection import forward_selection
+    from ordinal_logit import fit_ordinal
+    from recoding import WEEK3_RECODES, recode_onehot
+    from survey_data import read_arrow, read_parquet
+
+    readers = {'.csv': pd.read_csv, '.parquet': read_parquet, '.arrow': read_arrow}
+    df = readers[os.path.splitext(path)[1]](path)
+    measure = 'recode' in steps
+    with inst.section(f"recode@{rows}") if measure else contextlib.nullcontext():
+        recoded = recode_onehot(df, WEEK3_RECODES)
+    df[recoded.columns] = recoded
+    for feature in WEEK3_FEATURES:
+        if feature.endswith('_c'):
+            df[feature] = df[feature[:-2]] - df[feature[:-2]].mean()
+
+    if 'forward_selection' in steps:
+        X = df[WEEK3_FEATURES].dropna()
+        y = df.loc[X.index, 'support_info']
+        # The step-by-step report is not part of what is measured
+        with contextlib.redirect_stdout(io.StringIO()), \
+                inst.section(f"forward_selection@{rows}"):
+            forward_selection(X, y)
+
+    if 'ordinal' in steps:
+        X = df[ORDINAL_FEATURES].dropna()
+        y = df.loc[X.index, 'support_info'].map(SUPPORT_ORDINAL)
+        with inst.section(f"ordinal@{rows}"):
+            fit_ordinal(X[y.notna()], y.dropna())
+
+    if 'bitmap_index' in steps or 'subgroup' in steps:
+        with inst.section(f"bitmap_index@{rows}") if 'bitmap_index' in steps \
+                else contextlib.nullcontext():
+            index = BitmapIndex.from_frame(df)
+        if 'subgroup' in steps:
+            with inst.section(f"subgroup@{rows}"):
+                for subgroup in SUBGROUPS:
+                    index.count(*subgroup)
+                    index.block_counts('HousingType_', *subgroup)
+
+
+# ============================================================
+# Results
+# ============================================================
+def result_rows(inst):
+    rows = []
+    for record in inst.records:
+        step, size = record.name.rsplit('@', 1)
+        rows.append(dict(record._asdict(), name=step, rows=int(size)))
+    return rows
+
+
+def add_scaling(results):
+    """Add 'per_10x': time growth per 10x rows since the previous size."""
+    previous = {}
+    for r in results:
+        before = previous.get(r['name'])
+        r['per_10x'] = None
+        if before is not None and before['wall_seconds'] > 0 and r['wall_seconds'] > 0:
+            exponent = (math.log(r['wall_seconds'] / before['wall_seconds'])
+                        / math.log(r['rows'] / before['rows']))
+            r['per_10x'] = 10 ** exponent
+        previous[r['name']] = r
+    return results
+
+
+def latest_result(results_dir, settings):
+    """Path of the newest saved run with the same format and memory tracing."""
+    keys = ('format', 'trace_memory')
+    for path in sorted(glob.glob(os.path.join(results_dir, '*.json')), reverse=True):
+        try:
+            with open(path) as f:
+                saved = json.load(f)['settings']
+            if all(saved.get(key) == settings[key] for key in keys):
+                return path
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
+
+
+def compare_results(previous, results):
+    """(step, rows, before, now) for every step that got slower."""
+    before = {(r['name'], r['rows']): r['wall_seconds'] for r in previous['results']}
+    slower = []
+    for r in results:
+        old = before.get((r['name'], r['rows']))
+        if (old is not None and r['wall_seconds'] > old * REGRESSION_RATIO
+                and r['wall_seconds'] - old > REGRESSION_MIN_SECONDS):
+            slower.append((r['name'], r['rows'], old, r['wall_seconds']))
+    return slower
+
+
+def print_results(results):
+    print(f"\n  {'step':<18} {'rows':>11} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} "
+          f"{'per 10x':>8}")
+    for r in sorted(results, key=lambda r: (STEPS.index(r['name']), r['rows'])):
+        scaling = '' if r['per_10x'] is None else f"{r['per_10x']:.1f}"
+        peak = '' if r['peak_rss_mb'] is None else f"{r['peak_rss_mb']:.0f}"
+        print(f"  {r['name']:<18} {r['rows']:>11,} {r['wall_seconds']:9.3f} "
+              f"{r['cpu_seconds']:9.3f} {peak:>9} {scaling:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the survey analysis at increasing sizes')
+    parser.add_argument('--sizes', type=float, nargs='+', default=DEFAULT_SIZES,
+                        help='numbers of rows (e.g. 1e3 1e6 1e8)')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet',
+                        help='input file format (default: parquet)')
+    parser.add_argument('--steps', nargs='+', choices=STEPS, default=list(STEPS),
+                        help='steps to run (default: all)')
+    parser.add_argument('--max-in-memory', type=float, default=DEFAULT_MAX_IN_MEMORY,
+                        help='largest size for steps that load the whole file')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--data-dir', default=os.path.join(HERE, 'data'),
+                        help='where generated surveys are kept between runs')
+    parser.add_argument('--results-dir', default=os.path.join(HERE, 'results'))
+    parser.add_argument('--baseline', help='saved run to compare with (default: the latest)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record peak Python allocations per step (slower)')
+    args = parser.parse_args()
+    if min(args.sizes) < 1:
+        parser.error("--sizes must be at least 1 row each")
+
+    # Charts are rendered headless; draw one figure first so font loading
+    # is not counted in the first render step
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.figure()
+    plt.savefig(io.BytesIO())
+    plt.close()
+
+    sizes = sorted(int(size) for size in args.sizes)
+    inst = Instrumentation(trace_memory=args.trace_memory)
+    for rows in sizes:
+        print(f"{rows:,} rows")
+        in_memory = rows <= args.max_in_memory
+        week2_steps = [s for s in args.steps if s in WEEK2_STEPS
+                       and (in_memory or s in STREAM_STEPS)]
+        if week2_steps:
+            path = data_path(args.data_dir, 'week2', rows, args.format, args.seed)
+            run_week2(path, rows, week2_steps, inst, in_memory, args.format)
+        week3_steps = [s for s in args.steps if s in WEEK3_STEPS]
+        if week3_steps and in_memory:
+            path = data_path(args.data_dir, 'week3', rows, args.format, args.seed)
+            run_week3(path, rows, week3_steps, inst)
+
+    results = add_scaling(result_rows(inst))
+    print_results(results)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    out_path = os.path.join(args.results_dir, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    settings = {'format': args.format, 'seed': args.seed, 'sizes': sizes,
+                'trace_memory': args.trace_memory}
+    baseline = args.baseline or latest_result(args.results_dir, settings)
+    run = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'settings': settings,
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                    'cpus': os.cpu_count(), 'numpy': np.__version__,
+                    'pandas': pd.__version__},
+        'results': results,
+    }
+    with open(out_path, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults saved to {out_path}")
+
+    if baseline:
+        with open(baseline) as f:
+            previous = json.load(f)
+        slower = compare_results(previous, results)
+        print(f"Compared with {baseline}: "
+              f"{len(slower) if slower else 'no'} step(s) slower")
+        for name, rows, old, new in slower:
+            print(f"  {name} at {rows:,} rows: {old:.3f} s -> {new:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
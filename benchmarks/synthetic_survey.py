@@ -0,0 +1,126 @@
+"""
+Synthetic Survey Generator - Benchmarks
+=======================================
+Writes survey files of any size with the schema of GCAP3226_week2.csv or
+GCAP3226_week3.csv, for measuring the analysis code at production scale.
+
+Rows are drawn with replacement from the real survey (the template), so
+every column keeps its real distribution: Likert levels, one flag per
+one-hot block (district, age, income, ...), the category values, and the
+relationships between columns (e.g. the correlation of
+Distance_artificial and recycling_effort). Continuous columns (floats
+such as Distance_artificial and height) get a little Gaussian noise,
+clipped to the template's range, so they have many distinct values as
+real data would. An ID column is renumbered 1..n.
+
+Files are written chunk by chunk, so 10^8 rows never have to fit in memory.
+CSV, Parquet and Arrow IPC outputs are supported (by file extension).
+
+Usage:
+    python synthetic_survey.py week2 1000000 data/week2_1e6.parquet
+    from synthetic_survey import write_synthetic
+    write_synthetic('week3', 10_000, 'data/week3_1e4.csv')
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEMPLATES = {
+    'week2': os.path.join(ROOT, 'demo3226week2', 'GCAP3226_week2.csv'),
+    'week3': os.path.join(ROOT, 'GCAP3226_week3', 'GCAP3226_week3.csv'),
+}
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_SEED = 42
+
+# Noise added to float columns, as a fraction of the column's std
+JITTER = 0.05
+
+
+def load_template(schema):
+    """The real survey a synthetic file is drawn from."""
+    if schema not in TEMPLATES:
+        raise ValueError(f"schema must be one of {sorted(TEMPLATES)}, got {schema!r}")
+    return pd.read_csv(TEMPLATES[schema])
+
+
+def synthetic_chunk(template, n_rows, rng, first_id=1):
+    """`n_rows` rows drawn from `template` (see the module docstring)."""
+    chunk = template.iloc[rng.integers(0, len(template), n_rows)].reset_index(drop=True)
+    for col in template.columns:
+        values = template[col]
+        if col == 'ID':
+            chunk[col] = np.arange(first_id, first_id + n_rows)
+        elif pd.api.types.is_float_dtype(values):
+            noise = rng.normal(0.0, JITTER * values.std(), n_rows)
+            chunk[col] = np.clip(chunk[col] + noise, values.min(), values.max())
+    return chunk
+
+
+def synthetic_survey(schema, n_rows, seed=DEFAULT_SEED, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield DataFrame chunks of a synthetic survey with `n_rows` rows in total.
+
+    n_rows=0 yields one empty chunk, so a written file still has the
+    template's columns and types.
+    """
+    if n_rows < 0:
+        raise ValueError(f"n_rows must be at least 0, got {n_rows}")
+    template = load_template(schema)
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, chunk_rows) or [0]:
+        yield synthetic_chunk(template, min(chunk_rows, n_rows - start), rng, start + 1)
+
+
+def write_synthetic(schema, n_rows, path, seed=DEFAULT_SEED, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write a synthetic survey to a .csv, .parquet or .arrow/.feather file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    ext = os.path.splitext(path)[1].lower()
+    chunks = synthetic_survey(schema, n_rows, seed, chunk_rows)
+    tmp_path = path + '.tmp'
+
+    if ext == '.csv':
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    elif ext in ('.parquet', '.pq', '.arrow', '.ipc', '.feather'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = (pq.ParquetWriter(tmp_path, table.schema) if ext in ('.parquet', '.pq')
+                          else pa.ipc.new_file(tmp_path, table.schema))
+            writer.write_table(table)
+        writer.close()
+    else:
+        raise ValueError(f"Unsupported output format: {path!r}")
+    # Rename so an interrupted run never leaves a truncated file behind
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic survey file')
+    parser.add_argument('schema', choices=sorted(TEMPLATES), help='survey to imitate')
+    parser.add_argument('rows', type=float, help='number of rows (1e6 is accepted; 0 writes '
+                        'just the columns)')
+    parser.add_argument('output', help='output file (.csv, .parquet or .arrow)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help='rows generated and written at a time')
+    args = parser.parse_args()
+    if args.rows < 0:
+        parser.error("rows must be at least 0")
+
+    write_synthetic(args.schema, int(args.rows), args.output, args.seed, args.chunk_rows)
+    print(f"Wrote {int(args.rows)} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
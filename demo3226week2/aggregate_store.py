@@ -0,0 +1,177 @@
+"""
+Aggregate Store - MSW Charging Scheme Data Visualization
+========================================================
+Keeps mergeable aggregates of every survey response seen so far, so a
+batch of new responses updates the results in time proportional to the
+batch instead of re-reading the whole survey.
+
+The store holds
+  - value counts of the Likert columns (section 3 frequency tables),
+  - respondents per district and the district x food_waste_behavior
+    counts (section 3 district analysis),
+  - a ColumnSummary of Distance_artificial: exact count, mean, std, min
+    and max, a KLL quantile sketch and a histogram (section 4),
+  - the sufficient statistics of Distance_artificial vs recycling_effort
+    (n, sums, sums of squares and cross-products), which give the
+    correlation and the trend line (section 5).
+Every part is a sum or a mergeable sketch: append() adds a batch of rows
+and merge() adds another store (e.g. one per district office).
+
+The store is saved with pickle (only load stores you created yourself)
+along with a list of the appended batches, so the same file is never
+counted twice.
+
+Usage:
+    from aggregate_store import AggregateStore
+    store = AggregateStore.load('aggregates/survey_store.pkl')   # or AggregateStore()
+    store.append_file('responses_2026-10-18.csv')
+    store.frequency_table('support_level')
+    store.five_number(), store.correlation(), store.trend_line()
+    store.save('aggregates/survey_store.pkl')
+"""
+
+import hashlib
+import os
+import pickle
+import time
+from collections import namedtuple
+
+from likert_summary import LikertSummary
+from onehot_crosstab import crosstab_onehot, onehot_columns
+from scatter_density import (correlation_from_moments, merge_moments, trend_from_moments,
+                             trend_moments)
+from stream_summary import DEFAULT_ERROR, ColumnSummary
+from survey_data import LIKERT_COLUMNS, load_survey
+from survey_stream import merge_counts
+
+# Bump this whenever the stored state changes; older stores must be rebuilt
+# (2: the Distance_artificial summary counts infinite values)
+STORE_VERSION = 2
+
+DISTRICT_PREFIX = 'HongKongDistrict_'
+CROSSTAB_COLUMN = 'food_waste_behavior'
+
+# Columns read from each appended file
+STORE_COLUMNS = LIKERT_COLUMNS + [DISTRICT_PREFIX + '*', CROSSTAB_COLUMN, 'Distance_artificial']
+
+# One per appended file or frame; digest is the SHA-256 of the file
+Batch = namedtuple('Batch', ['source', 'digest', 'rows', 'appended_at'])
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AggregateStore:
+    """Mergeable aggregates of all survey rows appended so far."""
+
+    def __init__(self, error=DEFAULT_ERROR):
+        self.version = STORE_VERSION
+        self.rows = 0
+        self.value_counts = {col: None for col in LIKERT_COLUMNS}
+        self.district_counts = None
+        self.crosstab = None
+        self.distance = ColumnSummary(error, name='Distance_artificial')
+        self.moments = None
+        self.batches = []
+
+    # ============================================================
+    # Updating
+    # ============================================================
+    def append(self, df, source=None, digest=None):
+        """Add a batch of new responses (a typed survey frame)."""
+        for col in LIKERT_COLUMNS:
+            self.value_counts[col] = merge_counts(self.value_counts[col],
+                                                  df[col].value_counts()).sort_index()
+
+        district_cols = onehot_columns(df.columns, DISTRICT_PREFIX)
+        totals = df[district_cols].sum().astype('int64')
+        totals.index = [col.replace(DISTRICT_PREFIX, '', 1) for col in district_cols]
+        self.district_counts = merge_counts(self.district_counts, totals)
+        cross = crosstab_onehot(df, DISTRICT_PREFIX, CROSSTAB_COLUMN).counts
+        self.crosstab = merge_counts(self.crosstab, cross).sort_index(axis=1)
+
+        self.distance.update(df['Distance_artificial'].to_numpy())
+        moments = trend_moments(df['Distance_artificial'], df['recycling_effort'])
+        self.moments = moments if self.moments is None else merge_moments(self.moments, moments)
+
+        self.rows += len(df)
+        self.batches.append(Batch(source, digest, len(df), time.strftime('%Y-%m-%d %H:%M:%S')))
+
+    def append_file(self, path):
+        """Append a survey file, unless the same file was appended before.
+
+        Returns True if the file was added.
+        """
+        digest = file_digest(path)
+        if any(batch.digest == digest for batch in self.batches):
+            return False
+        self.append(load_survey(path, columns=STORE_COLUMNS, use_cache=False), path, digest)
+        return True
+
+    def merge(self, other):
+        """Add the aggregates of another store (disjoint responses)."""
+        for col in LIKERT_COLUMNS:
+            if other.value_counts[col] is not None:
+                self.value_counts[col] = merge_counts(self.value_counts[col],
+                                                      other.value_counts[col]).sort_index()
+        if other.district_counts is not None:
+            self.district_counts = merge_counts(self.district_counts, other.district_counts)
+            self.crosstab = merge_counts(self.crosstab, other.crosstab).sort_index(axis=1)
+        self.distance.merge(other.distance)
+        if other.moments is not None:
+            self.moments = (other.moments if self.moments is None
+                            else merge_moments(self.moments, other.moments))
+        self.rows += other.rows
+        self.batches += other.batches
+
+    # ============================================================
+    # Results
+    # ============================================================
+    def likert_summary(self):
+        """LikertSummary of every Likert column (see likert_summary.py)."""
+        return LikertSummary.from_value_counts(
+            {col: counts for col, counts in self.value_counts.items() if counts is not None})
+
+    def frequency_table(self, column):
+        return self.likert_summary().frequency_table(column)
+
+    def crosstab_percentages(self):
+        """Row percentages of the district x food_waste_behavior counts."""
+        totals = self.crosstab.sum(axis=1)
+        return self.crosstab[totals > 0].div(totals[totals > 0], axis=0) * 100
+
+    def five_number(self):
+        return self.distance.five_number()
+
+    def correlation(self):
+        """Pearson correlation of Distance_artificial and recycling_effort."""
+        return correlation_from_moments(self.moments)
+
+    def trend_line(self):
+        """(slope, intercept) of recycling_effort on Distance_artificial."""
+        return trend_from_moments(self.moments)
+
+    # ============================================================
+    # Persistence
+    # ============================================================
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Rename so an interrupted save never leaves a truncated store
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            store = pickle.load(f)
+        if not isinstance(store, cls) or getattr(store, 'version', None) != STORE_VERSION:
+            raise ValueError(f"{path} is not an aggregate store of version {STORE_VERSION}; "
+                             f"rebuild it from the survey files")
+        return store
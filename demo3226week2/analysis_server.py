@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Analysis Server - MSW Charging Scheme Data Visualization
+========================================================
+A local HTTP service that loads the survey once and answers questions
+about it on demand, instead of running a section script (interpreter
+start-up, imports, reading the CSV) for every table or chart.
+
+Endpoints (GET; statistics are returned as JSON):
+  /                            dataset, endpoints, cache and pool status
+  /frequency?column=support_level
+                               frequency table of a column (section 3)
+  /crosstab?prefix=HongKongDistrict_&column=food_waste_behavior
+                               one-hot block x column counts and row
+                               percentages (section 3 district analysis)
+  /five-number?column=Distance_artificial
+                               min, Q1, median, Q3, max (section 4)
+  /correlation?x=Distance_artificial&y=recycling_effort
+                               Pearson correlation (section 5)
+  /regression?y=recycling_effort&x=Distance_artificial[,other,...]
+                               OLS fit: coefficients, standard errors,
+                               t, p-values, R-squared (section 5)
+  /charts                      names of the charts of run_all_sections.py
+  /charts/<name>.<ext>?profile=standard
+                               a chart as PNG (or the formats of the
+                               output profile: webp, svg, pdf)
+  POST /reload                 drop every cached result and re-read the data
+
+The survey is re-read automatically when the file changes (same key as
+the load_survey() cache), in a thread, so requests that do not need the
+new data are still answered; requests arriving meanwhile share the one
+read. Statistics are computed in a thread so a large
+query does not hold up other requests; charts are prepared in a thread
+and drawn in a pool of worker processes, as run_all_sections.py does, so
+several renders run at once. Results (chart files and statistics) are
+kept in an LRU cache for the current version of the data; concurrent
+requests for the same chart share one render.
+
+The server listens on 127.0.0.1 only (or a Unix socket); it is meant for
+the person running the analysis, not for a network.
+
+Usage:
+    python analysis_server.py                        # http://127.0.0.1:8326/
+    python analysis_server.py --input wave2.csv --port 8400 --processes 4
+    python analysis_server.py --unix /tmp/survey.sock
+    curl 'http://127.0.0.1:8326/five-number?column=Distance_artificial'
+    curl -o hist.png 'http://127.0.0.1:8326/charts/distance_analysis.png'
+    curl --unix-socket /tmp/survey.sock http://localhost/frequency?column=fairness
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import os
+import signal
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from charts import FIGURE_JOBS, LIKERT_LABELS, distance_summary
+from figure_jobs import use_agg_backend, with_profile
+from likert_summary import LikertSummary
+from onehot_crosstab import crosstab_onehot
+from output_profiles import DEFAULT_PROFILE, PROFILES, output_paths, wait_outputs
+from stream_summary import summarize_series
+from survey_data import LIKERT_COLUMNS, cache_key, load_survey
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8326
+
+# Chart files and statistics kept per server; the least recently used go first
+MAX_CACHED_RESULTS = 256
+
+# Requests larger than this (request line and headers) are refused
+MAX_HEADER_BYTES = 16 * 1024
+
+CONTENT_TYPES = {'json': 'application/json', 'png': 'image/png', 'webp': 'image/webp',
+                 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+CHART_JOBS = {job.name: job for job in FIGURE_JOBS}
+
+
+class RequestError(Exception):
+    """A request the server cannot answer; carries the HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """A dict that keeps the `maxsize` most recently used entries."""
+
+    def __init__(self, maxsize=MAX_CACHED_RESULTS):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+# ============================================================
+# Statistics (run in a thread)
+# ============================================================
+def _column(df, name):
+    if not name:
+        raise RequestError(400, "missing query parameter")
+    if name not in df.columns:
+        raise RequestError(404, f"no column {name!r} in the survey")
+    return df[name]
+
+
+def _numeric_column(df, name):
+    values = _column(df, name)
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        raise RequestError(400, f"column {name!r} is not numeric ({values.dtype})")
+    return values
+
+
+def frequency(df, shared, column='support_level'):
+    values = _column(df, column)
+    if column in LIKERT_COLUMNS:
+        table = LikertSummary.from_frame(df, [column]).frequency_table(column)
+        labels = LIKERT_LABELS
+    else:
+        table = values.value_counts().sort_index()
+        labels = {}
+    total = int(table.sum())
+    return {'column': column, 'total': total,
+            'levels': [{'level': level, 'label': labels.get(level), 'count': int(count),
+                        'percent': 100 * count / total if total else None}
+                       for level, count in table.items()]}
+
+
+def crosstab(df, shared, prefix='HongKongDistrict_', column='food_waste_behavior'):
+    _column(df, column)
+    try:
+        table = crosstab_onehot(df, prefix, column)
+    except (KeyError, ValueError) as exc:
+        raise RequestError(404, str(exc))
+    return {'prefix': prefix, 'column': column,
+            'categories': list(table.counts.columns),
+            'counts': {row: values.tolist() for row, values in table.counts.iterrows()},
+            'percentages': {row: values.tolist()
+                            for row, values in table.percentages.iterrows()},
+            'unassigned': table.unassigned.to_dict()}
+
+
+def five_number(df, shared, column='Distance_artificial'):
+    if column == 'Distance_artificial':
+        summary = distance_summary(df, shared)
+    else:
+        summary = summarize_series(_numeric_column(df, column))
+    return dict(summary.five_number(), column=column, count=summary.count,
+                mean=summary.mean, std=summary.std)
+
+
+def correlation(df, shared, x='Distance_artificial', y='recycling_effort'):
+    x_values, y_values = _numeric_column(df, x), _numeric_column(df, y)
+    return {'x': x, 'y': y, 'n': int((x_values.notna() & y_values.notna()).sum()),
+            'correlation': x_values.corr(y_values)}
+
+
+def regression(df, shared, y='recycling_effort', x='Distance_artificial'):
+    """OLS of y on a constant and the comma-separated columns of x."""
+    from scipy import stats
+
+    names = [name.strip() for name in x.split(',') if name.strip()]
+    frame = df[[_numeric_column(df, y).name]
+               + [_numeric_column(df, name).name for name in names]]
+    values = frame.dropna().to_numpy(dtype=np.float64)
+    n, k = len(values), len(names) + 1
+    if n <= k:
+        raise RequestError(400, f"{n} complete rows are too few for {k} coefficients")
+    Z = np.column_stack([np.ones(n), values[:, 1:]])
+    target = values[:, 0]
+    coef, _, rank, _ = np.linalg.lstsq(Z, target, rcond=None)
+    if rank < k:
+        raise RequestError(400, "the predictors are collinear")
+    resid = target - Z @ coef
+    df_resid = n - k
+    scale = resid @ resid / df_resid
+    bse = np.sqrt(np.diag(np.linalg.inv(Z.T @ Z)) * scale)
+    tvalues = coef / bse
+    centered = target - target.mean()
+    return {'y': y, 'nobs': n, 'rsquared': 1 - resid @ resid / (centered @ centered),
+            'terms': [{'term': term, 'coef': c, 'std_err': s, 't': t,
+                       'p_value': 2 * stats.t.sf(abs(t), df_resid)}
+                      for term, c, s, t in zip(['const'] + names, coef, bse, tvalues)]}
+
+
+STATS = {'frequency': frequency, 'crosstab': crosstab, 'five-number': five_number,
+         'correlation': correlation, 'regression': regression}
+
+
+def _plain(value):
+    """`value` with numpy scalars as Python numbers and NaN as None (for JSON)."""
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+# ============================================================
+# Charts (drawn in a worker process)
+# ============================================================
+def start_worker(process=False):
+    """Agg backend and pyplot loaded before the first chart is requested."""
+    if process:
+        # Ctrl-C stops the server, which shuts the pool down
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    use_agg_backend()
+    import matplotlib.pyplot  # noqa: F401
+
+
+def render_chart(job, data):
+    """Draw one prepared chart; returns {format: file bytes}."""
+    with tempfile.TemporaryDirectory(prefix='survey-chart-') as tmp:
+        path = os.path.join(tmp, job.filename)
+        outputs = wait_outputs(job.render(data, job.params, path))
+        files = {}
+        for output in outputs:
+            with open(output.path, 'rb') as f:
+                files[os.path.splitext(output.path)[1][1:]] = f.read()
+        return files
+
+
+# ============================================================
+# Server
+# ============================================================
+class AnalysisServer:
+    """The survey kept in memory, and the handlers answering requests about it."""
+
+    def __init__(self, path, processes=None, cache_size=MAX_CACHED_RESULTS):
+        self.path = path
+        self.processes = processes
+        self.cache = LRUCache(cache_size)
+        # Charts being rendered: concurrent requests wait on the same future
+        self._rendering = {}
+        self.threads = ThreadPoolExecutor(thread_name_prefix='stats')
+        if processes == 1:
+            # "In this process": one drawing thread keeps the event loop free
+            self.pool = ThreadPoolExecutor(max_workers=1, initializer=start_worker,
+                                           thread_name_prefix='render')
+        else:
+            workers = processes or os.cpu_count() or 1
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=start_worker,
+                                            initargs=(True,))
+            # Start the workers now rather than on the first chart request
+            for _ in range(workers):
+                self.pool.submit(int)
+        self.key = None
+        # The survey being re-read: concurrent requests wait on the same future
+        self._loading = None
+        self.load()
+
+    def _read(self):
+        """(cache key, survey, seconds) of the file as it is now."""
+        start = time.perf_counter()
+        key = cache_key(self.path)
+        df = load_survey(self.path)
+        return key, df, time.perf_counter() - start
+
+    def _use(self, loaded):
+        self.key, self.df, self.load_seconds = loaded
+        # Summaries shared by the statistics and the chart prepare steps
+        self.shared = {}
+        self.cache.clear()
+
+    def load(self):
+        """Read the survey in this thread (before the event loop runs)."""
+        self._use(self._read())
+
+    async def reload(self):
+        """Re-read the survey in a stats thread, keeping the event loop free."""
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._reload())
+        await asyncio.shield(self._loading)
+
+    async def _reload(self):
+        loop = asyncio.get_running_loop()
+        try:
+            self._use(await loop.run_in_executor(self.threads, self._read))
+        finally:
+            self._loading = None
+
+    async def refresh(self):
+        """Re-read the survey if the file changed since it was loaded."""
+        if cache_key(self.path) != self.key:
+            await self.reload()
+
+    def close(self):
+        self.threads.shutdown(wait=False, cancel_futures=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def status(self):
+        return {'input': self.path, 'rows': len(self.df), 'columns': len(self.df.columns),
+                'load_seconds': self.load_seconds,
+                'endpoints': ['/' + name for name in STATS] + ['/charts', '/charts/<name>.png'],
+                'charts': list(CHART_JOBS), 'profiles': sorted(PROFILES),
+                'cache': {'entries': len(self.cache), 'hits': self.cache.hits,
+                          'misses': self.cache.misses},
+                'render_workers': self.processes or os.cpu_count() or 1}
+
+    async def statistic(self, name, query):
+        func = STATS[name]
+        try:
+            inspect.signature(func).bind(self.df, self.shared, **query)
+        except TypeError as exc:
+            raise RequestError(400, f"bad parameters for /{name}: {exc}")
+        key = (self.key, name, tuple(sorted(query.items())))
+        result = self.cache.get(key)
+        if result is None:
+            loop = asyncio.get_running_loop()
+            # The data as of this request, even if a reload replaces it meanwhile
+            df, shared = self.df, self.shared
+            result = await loop.run_in_executor(
+                self.threads, lambda: _plain(func(df, shared, **query)))
+            self.cache.put(key, result)
+        return result
+
+    async def chart(self, filename, profile):
+        name, ext = os.path.splitext(filename)
+        ext = ext[1:] or 'png'
+        if name not in CHART_JOBS:
+            raise RequestError(404, f"no chart {name!r}; see /charts")
+        if profile not in PROFILES:
+            raise RequestError(400, f"unknown profile {profile!r}; one of {sorted(PROFILES)}")
+        if ext not in PROFILES[profile].formats:
+            raise RequestError(404, f"the {profile!r} profile saves "
+                                    f"{', '.join(PROFILES[profile].formats)}, not {ext}")
+
+        key = (self.key, 'chart', name, profile)
+        files = self.cache.get(key)
+        if files is None:
+            if key not in self._rendering:
+                self._rendering[key] = asyncio.ensure_future(self._render(key, name, profile))
+            # shield: a client hanging up does not cancel the render for the others
+            files = await asyncio.shield(self._rendering[key])
+        return files[ext]
+
+    async def _render(self, key, name, profile):
+        job = with_profile(CHART_JOBS[name], profile)
+        loop = asyncio.get_running_loop()
+        df, shared = self.df, self.shared
+        try:
+            # Only the prepared aggregate is sent to the worker, never the DataFrame
+            data = await loop.run_in_executor(
+                self.threads, lambda: job.prepare(df, job.params, shared))
+            files = await loop.run_in_executor(self.pool, render_chart, job, data)
+            self.cache.put(key, files)
+            return files
+        finally:
+            del self._rendering[key]
+
+    async def dispatch(self, method, target):
+        """(content type, body bytes) for one request."""
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip('/') or '/'
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if path == '/reload':
+            if method != 'POST':
+                raise RequestError(405, "use POST /reload")
+            await self.reload()
+            return 'json', self.status()
+        if method != 'GET':
+            raise RequestError(405, f"{method} is not supported; use GET")
+
+        await self.refresh()
+        if path == '/':
+            return 'json', self.status()
+        profile = query.get('profile', DEFAULT_PROFILE)
+        if path == '/charts':
+            if profile not in PROFILES:
+                raise RequestError(400, f"unknown profile {profile!r}; one of {sorted(PROFILES)}")
+            return 'json', {'profile': profile,
+                            'charts': {name: ['/charts/' + os.path.basename(out) for out in
+                                              output_paths(job.filename, profile)]
+                                       for name, job in CHART_JOBS.items()}}
+        if path.startswith('/charts/'):
+            filename = path[len('/charts/'):]
+            body = await self.chart(filename, profile)
+            return os.path.splitext(filename)[1][1:] or 'png', body
+        if path[1:] in STATS:
+            return 'json', await self.statistic(path[1:], query)
+        raise RequestError(404, f"no endpoint {path}; see /")
+
+    async def handle(self, reader, writer):
+        """Answer one HTTP/1.1 request per connection."""
+        start = time.perf_counter()
+        status, kind, body = 200, 'json', None
+        method = target = '-'
+        try:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except asyncio.LimitOverrunError:
+                raise RequestError(413, "request headers too large")
+            except asyncio.IncompleteReadError:
+                return
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, _ = lines[0].split(' ', 2)
+            except ValueError:
+                raise RequestError(400, "malformed request line")
+            headers = dict(line.split(':', 1) for line in lines[1:] if ':' in line)
+            length = int(headers.get('Content-Length', headers.get('content-length', 0)) or 0)
+            if length:
+                await reader.readexactly(length)
+            kind, body = await self.dispatch(method, target)
+        except RequestError as exc:
+            status, kind, body = exc.status, 'json', {'error': str(exc)}
+        except Exception as exc:
+            status, kind, body = 500, 'json', {'error': f"{type(exc).__name__}: {exc}"}
+
+        if kind == 'json':
+            body = json.dumps(body, indent=1).encode('utf-8')
+        writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                      f"Content-Type: {CONTENT_TYPES.get(kind, 'application/octet-stream')}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      f"Connection: close\r\n\r\n").encode('latin-1') + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        print(f"{method} {target} -> {status} ({len(body)} bytes, "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix, limit=MAX_HEADER_BYTES)
+        print(f"Serving {server.path} on unix socket {unix}")
+    else:
+        listener = await asyncio.start_server(server.handle, host, port,
+                                              limit=MAX_HEADER_BYTES)
+        print(f"Serving {server.path} on http://{host}:{port}/")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve survey statistics and charts')
+    parser.add_argument('--input', default=os.path.relpath(os.path.join(HERE, 'GCAP3226_week2.csv')),
+                        help="survey file (default: 'GCAP3226_week2.csv' next to this script)")
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help='address to listen on (default: %(default)s, this machine only)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='TCP port (default: %(default)s)')
+    parser.add_argument('--unix', metavar='PATH',
+                        help='listen on a Unix socket instead of a TCP port')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='chart worker processes (default: one per CPU core; 1 = no workers)')
+    parser.add_argument('--cache-size', type=int, default=MAX_CACHED_RESULTS,
+                        help='charts and statistics kept in memory (default: %(default)s)')
+    args = parser.parse_args()
+
+    server = AnalysisServer(args.input, args.processes, args.cache_size)
+    print(f"Loaded {len(server.df)} rows in {server.load_seconds:.2f} s")
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Bitmap Index - MSW Charging Scheme Data Visualization
+=====================================================
+Answers subgroup questions ("respondents aged 25-34 in public rental
+housing") without scanning the survey frame again.
+
+from_frame() packs every column of the one-hot blocks (HongKongDistrict_*
+in week 2; AgeRange_*, HousingType_*, DailyWasteBags_*,
+HighestEducationLevel_* and HouseholdMonthlyIncomeRange_* in week 3) into
+a bitset with one bit per respondent, stored as 64-bit words. A subgroup
+is the bitwise AND of its conditions (a list of columns in one condition
+is OR-ed, e.g. two age ranges) and its size is a popcount, so a query
+reads n/64 words per condition instead of whole columns.
+
+Usage:
+    from bitmap_index import BitmapIndex
+    index = BitmapIndex.from_frame(df)
+    group = ['AgeRange_25-34', 'HousingType_Publicrentalhousing']
+    index.count(*group)                                 # size of the subgroup
+    index.count(['AgeRange_18-24', 'AgeRange_25-34'])   # either age range
+    df['support_after_info'].iloc[index.rows(*group)].value_counts()
+    index.block_counts('HousingType_', 'AgeRange_25-34')  # housing of 25-34s
+"""
+
+import numpy as np
+import pandas as pd
+
+from onehot_crosstab import onehot_columns
+
+ONEHOT_PREFIXES = ('HongKongDistrict_', 'AgeRange_', 'HousingType_', 'DailyWasteBags_',
+                   'HighestEducationLevel_', 'HouseholdMonthlyIncomeRange_')
+
+if hasattr(np, 'bitwise_count'):
+    def _popcounts(words):
+        """Set bits of uint64 words, summed over the last axis."""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:  # numpy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcounts(words):
+        """Set bits of uint64 words, summed over the last axis."""
+        as_bytes = words.view(np.uint8)
+        return _BYTE_COUNTS[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def pack_flags(flags):
+    """Pack an (n_rows, n_columns) boolean matrix into one bitset per column.
+
+    Returns a (n_columns, n_words) uint64 array; bits past n_rows are 0.
+    """
+    packed = np.packbits(flags.T, axis=1, bitorder='little')
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+class BitmapIndex:
+    """Packed bitsets of the one-hot columns of a survey (one row per column)."""
+
+    def __init__(self, words, columns, n_rows):
+        self.words = words
+        self.columns = list(columns)
+        self.n_rows = n_rows
+        self._row = {col: i for i, col in enumerate(self.columns)}
+        self._all = pack_flags(np.ones((n_rows, 1), dtype=bool))[0]
+
+    @classmethod
+    def from_frame(cls, df, prefixes=ONEHOT_PREFIXES):
+        """Index every column of the one-hot blocks in `df` that start with `prefixes`.
+
+        A flag is set where the column is 1; 0 and missing values are not set.
+        """
+        columns = [col for prefix in prefixes for col in onehot_columns(df.columns, prefix)]
+        if not columns:
+            raise ValueError(f"No columns start with any of {list(prefixes)}")
+        flags = df[columns].eq(1).to_numpy(dtype=bool, na_value=False)
+        return cls(pack_flags(flags), columns, len(df))
+
+    def _condition(self, condition):
+        # One column, or a list of columns of which any may be set
+        names = [condition] if isinstance(condition, str) else list(condition)
+        missing = [name for name in names if name not in self._row]
+        if missing:
+            raise KeyError(f"Not in the bitmap index: {missing}")
+        if len(names) == 1:
+            return self.words[self._row[names[0]]]
+        return np.bitwise_or.reduce(self.words[[self._row[name] for name in names]], axis=0)
+
+    def bits(self, *conditions):
+        """The subgroup bitset: AND of the conditions (all rows if none)."""
+        if not conditions:
+            return self._all.copy()
+        bits = self._condition(conditions[0]).copy()
+        for condition in conditions[1:]:
+            bits &= self._condition(condition)
+        return bits
+
+    def count(self, *conditions):
+        """Number of respondents in the subgroup."""
+        return int(_popcounts(self.bits(*conditions)))
+
+    def mask(self, *conditions):
+        """The subgroup as a boolean array, one entry per row of the frame."""
+        return np.unpackbits(self.bits(*conditions).view(np.uint8), count=self.n_rows,
+                             bitorder='little').astype(bool)
+
+    def rows(self, *conditions):
+        """Row positions (for DataFrame.iloc) of the subgroup, in order."""
+        return np.flatnonzero(self.mask(*conditions))
+
+    def block_counts(self, prefix, *conditions):
+        """Respondents of the subgroup flagged in each column of a block.
+
+        Returns a Series indexed by the column names without the prefix.
+        """
+        columns = onehot_columns(self.columns, prefix)
+        if not columns:
+            raise KeyError(f"No indexed columns start with {prefix!r}")
+        rows = [self._row[col] for col in columns]
+        counts = _popcounts(self.words[rows] & self.bits(*conditions))
+        return pd.Series(counts, index=[col.replace(prefix, '', 1) for col in columns])
@@ -0,0 +1,153 @@
+"""
+Plot Build Cache - MSW Charging Scheme Data Visualization
+=========================================================
+Content-addressed cache for the figure jobs in charts.py.
+
+Each plot gets a fingerprint made from
+  - the values of its input columns (FigureJob.columns),
+  - its rendering parameters (figsize, dpi, colors, labels, ...),
+  - the source code of its prepare and render functions, and of the
+    helpers every render function draws and saves with (HELPER_SOURCES).
+The fingerprints of the last build are stored in a manifest file inside
+the plots directory. A plot is re-rendered only when its fingerprint
+differs from the manifest or one of its files is missing.
+"""
+
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import time
+
+MANIFEST_NAME = '.build_manifest.json'
+
+# Manifest statuses for the last build
+REBUILT = 'rebuilt'
+REUSED = 'reused'
+# Saved by a section script (plotting.savefig); no fingerprint, so
+# run_all_sections.py always renders these charts again
+SAVED = 'saved'
+
+# Chart helpers shared by the render functions, as 'module' or
+# 'module.function'; changing any of them rebuilds every chart
+HELPER_SOURCES = ['chart_templates', 'charts.save_chart', 'output_profiles', 'plotting',
+                  'scatter_density']
+
+# In-process cache of the helpers' digest (the source does not change while running)
+_helper_digest = {}
+
+
+def resolve_columns(df, columns):
+    """Expand 'prefix*' entries into the matching DataFrame columns."""
+    resolved = []
+    for col in columns:
+        if col.endswith('*'):
+            resolved += [c for c in df.columns if c.startswith(col[:-1])]
+        else:
+            resolved.append(col)
+    return resolved
+
+
+def helpers_digest():
+    """SHA-256 of the source of every HELPER_SOURCES entry."""
+    if 'digest' not in _helper_digest:
+        digest = hashlib.sha256()
+        for name in HELPER_SOURCES:
+            module, _, attr = name.partition('.')
+            # Imported here: these modules import build_cache themselves
+            obj = importlib.import_module(module)
+            if attr:
+                obj = getattr(obj, attr)
+            digest.update(name.encode('utf-8'))
+            digest.update(inspect.getsource(obj).encode('utf-8'))
+        _helper_digest['digest'] = digest.hexdigest()
+    return _helper_digest['digest']
+
+
+def job_fingerprint(job, df):
+    """SHA-256 fingerprint of a job's inputs, parameters and code."""
+    digest = hashlib.sha256()
+    digest.update(job.filename.encode('utf-8'))
+    digest.update(json.dumps(job.params, sort_keys=True, default=repr).encode('utf-8'))
+    for func in (job.prepare, job.render):
+        digest.update(inspect.getsource(func).encode('utf-8'))
+    digest.update(helpers_digest().encode('utf-8'))
+
+    # Imported here so that listing the plots (section 6) does not load pandas
+    import pandas as pd
+
+    columns = resolve_columns(df, job.columns)
+    digest.update(json.dumps([[col, str(df[col].dtype)] for col in columns]).encode('utf-8'))
+    if columns:
+        row_hashes = pd.util.hash_pandas_object(df[columns], index=False)
+        digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def manifest_path(plots_dir):
+    return os.path.join(plots_dir, MANIFEST_NAME)
+
+
+def load_manifest(plots_dir):
+    """Return {filename: entry} from the last build ({} if there is none)."""
+    path = manifest_path(plots_dir)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # A corrupt manifest just means everything is rebuilt
+        return {}
+
+
+def save_manifest(plots_dir, manifest):
+    path = manifest_path(plots_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(entry, fingerprint, paths):
+    """True when the stored entry matches and every output file still exists."""
+    return (entry is not None and entry.get('fingerprint') == fingerprint
+            and all(os.path.exists(path) for path in paths))
+
+
+def manifest_entry(fingerprint, status, seconds, outputs=()):
+    """Manifest entry of a chart; `outputs` are its output_profiles.OutputFiles."""
+    return {'fingerprint': fingerprint, 'status': status,
+            'render_seconds': round(seconds, 4),
+            'encode_seconds': {os.path.basename(output.path): round(output.encode_seconds, 4)
+                               for output in outputs},
+            'rendered_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def record_outputs(plots_dir, outputs, seconds=0.0):
+    """Add the OutputFiles of a chart saved outside the figure jobs.
+
+    The entry is keyed by the first file, as for a figure job, so section
+    6 can list the encode time of every file the section scripts save.
+    """
+    if not outputs:
+        return
+    manifest = load_manifest(plots_dir)
+    manifest[os.path.basename(outputs[0].path)] = manifest_entry(None, SAVED, seconds, outputs)
+    save_manifest(plots_dir, manifest)
+
+
+def output_entries(manifest):
+    """{filename: (status, encode seconds)} for every file of the last build.
+
+    A chart saved in several formats has one manifest entry but several
+    files; the encode time is None where it was not recorded.
+    """
+    entries = {}
+    for filename, entry in manifest.items():
+        status = entry.get('status', 'not tracked')
+        encode_seconds = entry.get('encode_seconds') or {filename: None}
+        for output, seconds in encode_seconds.items():
+            entries[output] = (status, seconds)
+    return entries
@@ -0,0 +1,109 @@
+"""
+Chart Templates - MSW Charging Scheme Data Visualization
+========================================================
+Likert bar charts whose figure is built once and then reused.
+
+Building a figure (axes, the "1\\nStrongly oppose" ... tick labels, axis
+labels and titles) and running tight_layout() costs more than drawing it.
+A LikertBarTemplate builds the layout once; update() only changes the bar
+heights, titles and y-axis limits, and the layout is recomputed only when
+the rendered y-axis labels change width or a title changes height. Rendering the same
+chart for many districts or survey waves then costs one draw per file.
+
+Template figures are not registered with pyplot, so they are never shown
+and plt.close('all') leaves them alone. template() keeps one figure per
+set of options for the life of the process, so a run_batch.py worker
+reuses them for every input it handles.
+
+Usage:
+    from chart_templates import template
+    from output_profiles import wait_outputs
+    chart = template(figsize=(10, 6), labels=BAR_LABELS, colors=['steelblue'],
+                     xlabel='Support Level', ylabel='Number of Respondents')
+    for district, counts in counts_by_district.items():
+        chart.update([counts], titles=[f'Support Level in {district}'])
+        wait_outputs(chart.save(f'plots/support_{district}.png'))
+"""
+
+from collections import OrderedDict
+
+from output_profiles import DEFAULT_PROFILE, save_figure
+
+# Templates kept per process; the least recently used one is dropped first
+MAX_TEMPLATES = 16
+
+_templates = OrderedDict()
+
+
+class LikertBarTemplate:
+    """A row of bar panels, one per color, sharing the Likert x labels."""
+
+    def __init__(self, figsize, labels, colors, xlabel=None, ylabel=None,
+                 title_fontsize=12, label_fontsize=12):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        self.axes = list(self.figure.subplots(1, len(colors), squeeze=False)[0])
+        self.bars = []
+        for ax, color in zip(self.axes, colors):
+            self.bars.append(ax.bar(labels, [0] * len(labels), color=color, edgecolor='black'))
+            if xlabel is not None:
+                ax.set_xlabel(xlabel, fontsize=label_fontsize)
+            if ylabel is not None:
+                ax.set_ylabel(ylabel, fontsize=label_fontsize)
+        self.title_fontsize = title_fontsize
+        self._layout = None
+
+    def update(self, counts, titles=None, ylim=None):
+        """Show new data: one list of bar heights per panel.
+
+        `titles` (one per panel) replaces the panel titles; `ylim` fixes
+        the y range of every panel, otherwise it is fitted to the bars.
+        """
+        for i, (ax, bars) in enumerate(zip(self.axes, self.bars)):
+            for bar, height in zip(bars, counts[i]):
+                bar.set_height(height)
+            if titles is not None:
+                ax.set_title(titles[i], fontsize=self.title_fontsize)
+            if ylim is None:
+                ax.set_autoscaley_on(True)
+                ax.relim()
+                ax.autoscale_view(scalex=False)
+            else:
+                ax.set_ylim(*ylim)
+
+        if self._layout_signature() != self._layout:
+            self.figure.tight_layout()
+            # The new axes size can change the ticks: compare with this layout
+            self._layout = self._layout_signature()
+        return self
+
+    def _layout_signature(self):
+        # What tight_layout() depends on that update() can change: the
+        # rendered extents (in pixels) of the y tick labels and titles
+        renderer = self.figure.canvas.get_renderer()
+        signature = []
+        for ax in self.axes:
+            yaxis = ax.yaxis.get_tightbbox(renderer)
+            title = ax.title.get_window_extent(renderer)
+            signature.append((round(yaxis.width, 1) if yaxis is not None else 0.0,
+                              round(title.height, 1) if ax.get_title() else 0.0))
+        return signature
+
+    def save(self, path, profile=DEFAULT_PROFILE, dpi=150):
+        """Save in an output profile; returns the pending outputs (see save_figure)."""
+        return save_figure(self.figure, path, profile, dpi)
+
+
+def template(**options):
+    """The LikertBarTemplate for `options`, built on first use in this process."""
+    key = repr(sorted(options.items()))
+    if key in _templates:
+        _templates.move_to_end(key)
+    else:
+        _templates[key] = LikertBarTemplate(**options)
+        if len(_templates) > MAX_TEMPLATES:
+            _templates.popitem(last=False)
+    return _templates[key]
@@ -0,0 +1,283 @@
+"""
+Charts - MSW Charging Scheme Data Visualization
+===============================================
+Prepare and render functions for the charts produced by run_all_sections.py,
+bundled as figure jobs (see figure_jobs.py).
+
+prepare functions reduce the survey DataFrame to what the chart needs;
+render functions only see that prepared data and the job parameters, and
+return the pending outputs of save_chart(). The Likert bar charts reuse
+one figure per process (see chart_templates.py).
+"""
+
+import os
+
+import numpy as np
+
+from chart_templates import template
+from figure_jobs import FigureJob
+from likert_summary import LikertSummary
+from onehot_crosstab import crosstab_onehot
+from output_profiles import DEFAULT_PROFILE, save_figure, wait_outputs
+from plotting import palette
+from scatter_density import (DENSITY_BINS, LARGE_N_THRESHOLD, binned_density, draw_density,
+                             is_large, trend_from_moments, trend_moments)
+from stream_summary import summarize_series
+
+# Likert scale labels
+LIKERT_LABELS = {1: 'Strongly oppose', 2: 'Oppose', 3: 'Neutral',
+                 4: 'Support', 5: 'Strongly support'}
+ORDER = [1, 2, 3, 4, 5]
+BAR_LABELS = [f"{i}\n{LIKERT_LABELS[i]}" for i in ORDER]
+PIE_LABELS = [f"{i}: {LIKERT_LABELS[i]}" for i in ORDER]
+
+SUPPORT_COLUMNS = ['support_level', 'support_after_info']
+
+
+def support_summary(df, shared):
+    """Likert summary of both support columns, computed once per run."""
+    if 'support_summary' not in shared:
+        shared['support_summary'] = LikertSummary.from_frame(df, SUPPORT_COLUMNS)
+    return shared['support_summary']
+
+
+def save_chart(path, params):
+    """Save and close the current figure in the job's output profile."""
+    import matplotlib.pyplot as plt
+
+    pending = save_figure(plt.gcf(), path, params['output_profile'], params['dpi'])
+    plt.close()
+    return pending
+
+
+def shared_from_store(store):
+    """The shared summaries of a run, taken from an aggregate store.
+
+    With these, the SUMMARY_JOBS charts are prepared without the survey
+    rows (see aggregate_store.py and update_aggregates.py).
+    """
+    return {'support_summary': store.likert_summary(),
+            'distance_summary': store.distance,
+            'district_totals': store.district_counts}
+
+
+# ============================================================
+# Section 3: Categorical charts
+# ============================================================
+def prepare_support_counts(df, params, shared):
+    return {'counts': support_summary(df, shared).counts('support_level')}
+
+
+def prepare_support_comparison(df, params, shared):
+    likert = support_summary(df, shared)
+    return {'counts_before': likert.counts('support_level'),
+            'counts_after': likert.counts('support_after_info'),
+            'max_count': likert.max_count(SUPPORT_COLUMNS) + 5}
+
+
+def district_totals(df, shared):
+    """Respondents per district (prefix removed), computed once per run."""
+    if 'district_totals' not in shared:
+        district_cols = [col for col in df.columns if 'HongKongDistrict' in col]
+        totals = df[district_cols].sum().astype('int64')
+        totals.index = [col.replace('HongKongDistrict_', '') for col in district_cols]
+        shared['district_totals'] = totals
+    return shared['district_totals']
+
+
+def prepare_district_counts(df, params, shared):
+    # Ascending so the largest district ends up at the top of the barh chart
+    totals = district_totals(df, shared).sort_values(ascending=True)
+    return {'districts': list(zip(totals.index, totals.tolist()))}
+
+
+def render_support_bar(data, params, path):
+    chart = template(figsize=params['figsize'], labels=params['labels'],
+                     colors=[params['color']], xlabel='Support Level',
+                     ylabel='Number of Respondents', title_fontsize=14)
+    chart.update([data['counts']], titles=[params['title']])
+    return chart.save(path, params['output_profile'], params['dpi'])
+
+
+def render_support_pie(data, params, path):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=params['figsize'])
+    plt.pie(data['counts'], labels=params['labels'], autopct='%1.1f%%', startangle=90,
+            colors=palette(params['palette'], n_colors=5))
+    plt.title(params['title'], fontsize=14)
+    plt.tight_layout()
+    return save_chart(path, params)
+
+
+def render_support_comparison(data, params, path):
+    chart = template(figsize=params['figsize'], labels=params['labels'],
+                     colors=params['colors'])
+    chart.update([data['counts_before'], data['counts_after']], titles=params['titles'],
+                 ylim=(0, data['max_count']))
+    return chart.save(path, params['output_profile'], params['dpi'])
+
+
+def render_district_distribution(data, params, path):
+    import matplotlib.pyplot as plt
+
+    names = [name for name, _ in data['districts']]
+    counts = [count for _, count in data['districts']]
+    plt.figure(figsize=params['figsize'])
+    plt.barh(names, counts, color=params['color'], edgecolor='black')
+    plt.xlabel('Number of Respondents', fontsize=12)
+    plt.title(params['title'], fontsize=14)
+    plt.tight_layout()
+    return save_chart(path, params)
+
+
+# ============================================================
+# Section 4: Continuous data
+# ============================================================
+def distance_summary(df, shared):
+    """One-pass summary of Distance_artificial, computed once per run."""
+    if 'distance_summary' not in shared:
+        shared['distance_summary'] = summarize_series(df['Distance_artificial'])
+    return shared['distance_summary']
+
+
+def prepare_distance(df, params, shared):
+    summary = distance_summary(df, shared)
+    counts, edges = summary.histogram(params['bins'])
+    return {'box': summary.boxplot_stats(), 'hist_counts': counts, 'hist_edges': edges,
+            'mean': summary.mean}
+
+
+def render_distance_analysis(data, params, path):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=params['figsize'])
+
+    # Box plot, drawn from the precomputed quartiles and whiskers
+    axes[0].bxp([data['box']], patch_artist=True,
+                boxprops=dict(facecolor='lightblue'))
+    axes[0].set_ylabel('Distance (m)', fontsize=11)
+    axes[0].set_title('Box-Whisker Plot of Distance_artificial', fontsize=12)
+
+    # Histogram, drawn from the precomputed bin counts
+    edges = data['hist_edges']
+    axes[1].hist(edges[:-1], bins=edges, weights=data['hist_counts'],
+                 color=params['color'], edgecolor='black')
+    axes[1].set_xlabel('Distance (m)', fontsize=11)
+    axes[1].set_ylabel('Frequency', fontsize=11)
+    axes[1].set_title('Histogram of Distance_artificial', fontsize=12)
+    axes[1].axvline(data['mean'], color='red', linestyle='--',
+                    label=f'Mean: {data["mean"]:.1f}m')
+    axes[1].legend()
+
+    plt.tight_layout()
+    return save_chart(path, params)
+
+
+# ============================================================
+# Section 5: Relationship
+# ============================================================
+def prepare_distance_vs_recycling(df, params, shared):
+    distance = df['Distance_artificial'].to_numpy()
+    effort = df['recycling_effort'].to_numpy()
+    if is_large(len(df), params['large_n']):
+        # Too many points to draw: bin them and keep only the fit statistics
+        levels = np.unique(effort[~np.isnan(effort)]).tolist()
+        return {'mode': 'density',
+                'density': binned_density(distance, effort, levels, params['density_bins']),
+                'moments': trend_moments(distance, effort)}
+
+    rng = np.random.RandomState(params['seed'])
+    jitter = rng.uniform(-0.2, 0.2, size=len(df))
+    return {'mode': 'scatter', 'distance': distance, 'effort': effort + jitter}
+
+
+def render_distance_vs_recycling(data, params, path):
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=params['figsize'])
+    if data['mode'] == 'density':
+        ax = plt.gca()
+        mesh = draw_density(ax, data['density'])
+        if mesh is not None:
+            fig.colorbar(mesh, ax=ax, label='Number of Respondents')
+        moments = data['moments']
+        slope, intercept = trend_from_moments(moments)
+        x_line = np.linspace(moments['xmin'], moments['xmax'], 100)
+        plt.plot(x_line, slope * x_line + intercept, 'r--', linewidth=2, label='Trend line')
+        plt.legend()
+    else:
+        plt.scatter(data['distance'], data['effort'],
+                    alpha=0.6, c=params['color'], edgecolor='white', s=60)
+    plt.xlabel('Distance to Nearest Recycling Facility (m)', fontsize=12)
+    plt.ylabel('Recycling Effort Level', fontsize=12)
+    plt.title(params['title'], fontsize=14)
+    plt.yticks([1, 2, 3], ['1 (Low)', '2 (Medium)', '3 (High)'])
+    plt.tight_layout()
+    return save_chart(path, params)
+
+
+# ============================================================
+# Variants: the same Likert chart for every district
+# ============================================================
+def save_support_by_district(df, plots_dir, profile=DEFAULT_PROFILE):
+    """Save one support_level bar chart per district; returns the OutputFiles.
+
+    Every chart is drawn from the same template, so each one costs a draw
+    and an encode, not a new figure.
+    """
+    counts = crosstab_onehot(df, 'HongKongDistrict_', 'support_level').counts
+    counts = counts.reindex(columns=ORDER, fill_value=0)
+    chart = template(figsize=(10, 6), labels=BAR_LABELS, colors=['steelblue'],
+                     xlabel='Support Level', ylabel='Number of Respondents',
+                     title_fontsize=14)
+    os.makedirs(plots_dir, exist_ok=True)
+    pending = []
+    for district, row in counts.iterrows():
+        chart.update([row.tolist()], titles=[f'Support Level in {district}'])
+        filename = f"support_level_{district.replace(' ', '_')}.png"
+        pending += chart.save(os.path.join(plots_dir, filename), profile)
+    return wait_outputs(pending)
+
+
+# ============================================================
+# Jobs rendered by run_all_sections.py
+# ============================================================
+FIGURE_JOBS = [
+    FigureJob('support_level_bar_chart', 'support_level_bar_chart.png',
+              ['support_level'],
+              {'figsize': (10, 6), 'dpi': 150, 'color': 'steelblue', 'labels': BAR_LABELS,
+               'title': 'Distribution of Support Level for MSW Charging Scheme'},
+              prepare_support_counts, render_support_bar),
+    FigureJob('support_level_pie_chart', 'support_level_pie_chart.png',
+              ['support_level'],
+              {'figsize': (10, 8), 'dpi': 150, 'palette': 'Blues', 'labels': PIE_LABELS,
+               'title': 'Distribution of Support Level'},
+              prepare_support_counts, render_support_pie),
+    FigureJob('support_comparison', 'support_comparison.png',
+              SUPPORT_COLUMNS,
+              {'figsize': (14, 6), 'dpi': 150, 'colors': ['steelblue', 'coral'],
+               'labels': BAR_LABELS,
+               'titles': ['Support Level (Before Information)',
+                          'Support Level (After Information)']},
+              prepare_support_comparison, render_support_comparison),
+    FigureJob('district_distribution', 'district_distribution.png',
+              ['HongKongDistrict_*'],
+              {'figsize': (12, 6), 'dpi': 150, 'color': 'steelblue',
+               'title': 'Living District Distribution of Respondents'},
+              prepare_district_counts, render_district_distribution),
+    FigureJob('distance_analysis', 'distance_analysis.png',
+              ['Distance_artificial'],
+              {'figsize': (14, 5), 'dpi': 150, 'color': 'steelblue', 'bins': 15},
+              prepare_distance, render_distance_analysis),
+    FigureJob('distance_vs_recycling', 'distance_vs_recycling.png',
+              ['Distance_artificial', 'recycling_effort'],
+              {'figsize': (10, 7), 'dpi': 150, 'color': 'steelblue', 'seed': 42,
+               'title': 'Distance vs. Recycling Effort',
+               'large_n': LARGE_N_THRESHOLD, 'density_bins': DENSITY_BINS},
+              prepare_distance_vs_recycling, render_distance_vs_recycling),
+]
+
+# Jobs whose prepare step only reads the shared summaries, so they can be
+# drawn from an aggregate store; the scatter plot needs the points
+SUMMARY_JOBS = [job for job in FIGURE_JOBS if job.name != 'distance_vs_recycling']
@@ -0,0 +1,157 @@
+"""
+Figure Job Pipeline - MSW Charging Scheme Data Visualization
+============================================================
+Renders charts in parallel. Each chart is a FigureJob made of
+
+  prepare(df, params, shared) -> data   runs in the main process and reduces
+                                        the DataFrame to the small aggregate
+                                        the chart needs (counts, arrays, ...)
+  render(data, params, path)            runs in a worker process with the
+                                        non-interactive Agg backend, saves
+                                        the figure to `path` with
+                                        output_profiles.save_figure() and
+                                        returns its pending outputs
+
+Only the prepared data is sent to the workers, never the full DataFrame.
+`shared` is a dict shared by all prepare functions of one run, so work
+such as the Likert summary is done once and reused by several charts.
+
+prepare and render must be module-level functions so they can be sent to
+worker processes. `columns` lists the DataFrame columns the job reads
+('prefix*' matches a one-hot block); together with `params` it decides
+when a plot has to be rebuilt (see build_cache.py).
+
+The output profile (see output_profiles.py) is added to every job's
+params as 'output_profile' and sets the file extension, so switching
+profiles rebuilds the charts in the new formats.
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from build_cache import (REBUILT, REUSED, is_up_to_date, job_fingerprint, load_manifest,
+                         manifest_entry, save_manifest)
+from instrumentation import peak_rss_mb
+from output_profiles import DEFAULT_PROFILE, get_profile, output_paths, wait_outputs
+
+FigureJob = namedtuple('FigureJob', ['name', 'filename', 'columns', 'params',
+                                     'prepare', 'render'])
+
+# seconds: render wall time (drawing, and waiting for the encoder);
+# prepare_seconds, cpu_seconds (render), peak_rss_mb (of the rendering
+# process) and outputs (output_profiles.OutputFile per saved file) are
+# measured for rebuilt charts
+JobResult = namedtuple('JobResult', ['name', 'path', 'seconds', 'rebuilt', 'prepare_seconds',
+                                     'cpu_seconds', 'peak_rss_mb', 'outputs'],
+                       defaults=(0.0, 0.0, None, ()))
+
+
+def use_agg_backend():
+    """Switch matplotlib to the non-interactive Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def with_profile(job, profile):
+    """`job` saving its chart with an output profile."""
+    profile = get_profile(profile)
+    filename = os.path.basename(output_paths(job.filename, profile)[0])
+    return job._replace(filename=filename, params=dict(job.params, output_profile=profile))
+
+
+def _draw(job, data, path):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    pending = job.render(data, job.params, path)
+    return (JobResult(job.name, path, time.perf_counter() - start, True,
+                      cpu_seconds=time.process_time() - cpu_start), pending)
+
+
+def _finish(result, pending):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    outputs = tuple(wait_outputs(pending))
+    return result._replace(seconds=result.seconds + time.perf_counter() - start,
+                           cpu_seconds=result.cpu_seconds + time.process_time() - cpu_start,
+                           peak_rss_mb=peak_rss_mb(), outputs=outputs)
+
+
+def _render(job, data, path):
+    return _finish(*_draw(job, data, path))
+
+
+def prepare_jobs(jobs, df, shared=None, seconds=None):
+    """Run every job's prepare step; returns {job name: data}.
+
+    If `seconds` is a dict, the time of each prepare step is stored in it.
+    """
+    if shared is None:
+        shared = {}
+    prepared = {}
+    for job in jobs:
+        start = time.perf_counter()
+        prepared[job.name] = job.prepare(df, job.params, shared)
+        if seconds is not None:
+            seconds[job.name] = time.perf_counter() - start
+    return prepared
+
+
+def render_jobs(jobs, df, paths, processes=None, shared=None):
+    """Prepare and render `jobs` unconditionally; returns JobResults."""
+    if not jobs:
+        return []
+    prepare_seconds = {}
+    prepared = prepare_jobs(jobs, df, shared, prepare_seconds)
+
+    if processes == 1 or len(jobs) <= 1:
+        use_agg_backend()
+        # Draw every chart first, so encoding overlaps with the next drawing
+        drawn = [_draw(job, prepared[job.name], paths[job.name]) for job in jobs]
+        results = [_finish(result, pending) for result, pending in drawn]
+    else:
+        workers = min(processes or os.cpu_count() or 1, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_agg_backend) as pool:
+            futures = [pool.submit(_render, job, prepared[job.name], paths[job.name])
+                       for job in jobs]
+            results = [future.result() for future in futures]
+    return [result._replace(prepare_seconds=prepare_seconds[result.name])
+            for result in results]
+
+
+def run_figure_jobs(jobs, df, plots_dir='plots', processes=None, shared=None,
+                    incremental=True, profile=DEFAULT_PROFILE):
+    """Render the jobs whose inputs changed, in a process pool.
+
+    With incremental=True a job is skipped when its fingerprint (input
+    columns, parameters and code, see build_cache.py) matches the last
+    build and its file still exists. processes=None uses one worker per
+    CPU core; processes=1 renders in this process. `shared` may carry
+    results the caller already computed (see charts.support_summary).
+    `profile` names the output profile (see output_profiles.py).
+    Returns a list of JobResult in the order of `jobs`.
+    """
+    os.makedirs(plots_dir, exist_ok=True)
+    jobs = [with_profile(job, profile) for job in jobs]
+    paths = {job.name: os.path.join(plots_dir, job.filename) for job in jobs}
+    manifest = load_manifest(plots_dir)
+    fingerprints = {job.name: job_fingerprint(job, df) for job in jobs}
+
+    stale = [job for job in jobs
+             if not (incremental and is_up_to_date(manifest.get(job.filename),
+                                                   fingerprints[job.name],
+                                                   output_paths(paths[job.name], profile)))]
+    rendered = {result.name: result
+                for result in render_jobs(stale, df, paths, processes, shared)}
+
+    results = []
+    for job in jobs:
+        if job.name in rendered:
+            result = rendered[job.name]
+            manifest[job.filename] = manifest_entry(fingerprints[job.name], REBUILT,
+                                                    result.seconds, result.outputs)
+        else:
+            result = JobResult(job.name, paths[job.name], 0.0, False)
+            manifest[job.filename] = dict(manifest[job.filename], status=REUSED)
+        results.append(result)
+    save_manifest(plots_dir, manifest)
+    return results
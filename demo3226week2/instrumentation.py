@@ -0,0 +1,204 @@
+"""
+Run Instrumentation - MSW Charging Scheme Data Visualization
+============================================================
+Measures where run_all_sections.py spends its time and memory.
+
+Every section is wrapped in Instrumentation.section(name), which records
+  - wall time and CPU time (this process),
+  - resident memory (RSS) at the end of the section, its change during
+    the section and the process peak so far,
+  - optionally the peak Python allocation during the section
+    (tracemalloc; slows the run down, so off by default),
+  - optionally a cProfile of one chosen section, saved next to the report.
+Each rebuilt chart adds one record with its prepare time (main process)
+and its render wall/CPU time and worker peak RSS (see
+figure_jobs.JobResult).
+
+write_report() saves the records as run_report.json and run_report.csv in
+the plots directory and compares them with the report of the last run,
+so a section that got slower shows up run over run.
+
+Usage:
+    from instrumentation import Instrumentation
+    inst = Instrumentation(profile='load')
+    with inst.section('load'):
+        df = load_survey('GCAP3226_week2.csv')
+    inst.add_charts(results)
+    inst.write_report('plots', input='GCAP3226_week2.csv', rows=len(df))
+"""
+
+import cProfile
+import csv
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_NAME = 'run_report'
+
+# Sections of run_all_sections.run_pipeline, in order
+SECTIONS = ('load', 'structure', 'categorical', 'continuous', 'relationship', 'charts',
+            'saved')
+
+# A section is reported as slower than the last run when its wall time
+# grew by this factor and by at least this many seconds (small sections
+# are too noisy to compare)
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_SECONDS = 0.05
+
+Record = namedtuple('Record', ['name', 'kind', 'wall_seconds', 'cpu_seconds', 'rss_mb',
+                               'rss_delta_mb', 'peak_rss_mb', 'traced_peak_mb'])
+
+Regression = namedtuple('Regression', ['name', 'previous_seconds', 'wall_seconds'])
+
+
+def is_report_file(filename):
+    """True for the report and profile files written by write_report()."""
+    return filename.startswith((REPORT_NAME + '.', 'profile_'))
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB (None where /proc is missing)."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def peak_rss_mb():
+    """Highest resident memory of this process so far, in MB (None on Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class Instrumentation:
+    """Collects one Record per section and per chart of a run."""
+
+    def __init__(self, trace_memory=False, profile=None):
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.records = []
+        self.profile_stats = None
+
+    @contextmanager
+    def section(self, name):
+        """Measure the body of the with-block as section `name`."""
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if name == self.profile else None
+
+        rss_start = current_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.profile_stats = pstats.Stats(profiler)
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            rss = current_rss_mb()
+            traced_peak = None
+            if self.trace_memory:
+                traced_peak = (tracemalloc.get_traced_memory()[1] - traced_start) / 2 ** 20
+            if tracing:
+                tracemalloc.stop()
+            delta = rss - rss_start if rss is not None and rss_start is not None else None
+            self.records.append(Record(name, 'section', wall, cpu, rss, delta, peak_rss_mb(),
+                                       traced_peak))
+
+    def add_charts(self, results):
+        """Add one record per rebuilt chart (figure_jobs.JobResult)."""
+        for result in results:
+            if not result.rebuilt:
+                continue
+            self.records.append(Record(f"chart:{result.name}", 'chart',
+                                       result.prepare_seconds + result.seconds,
+                                       result.cpu_seconds, None, None, result.peak_rss_mb,
+                                       None))
+
+    def print_table(self):
+        print(f"  {'step':<38} {'wall s':>8} {'cpu s':>8} {'RSS MB':>8} {'peak MB':>8}")
+        for r in self.records:
+            rss = '' if r.rss_mb is None else f"{r.rss_mb:.1f}"
+            peak = '' if r.peak_rss_mb is None else f"{r.peak_rss_mb:.1f}"
+            print(f"  {r.name:<38} {r.wall_seconds:8.3f} {r.cpu_seconds:8.3f} "
+                  f"{rss:>8} {peak:>8}")
+
+    def write_report(self, out_dir, **info):
+        """Save run_report.json/.csv (and the profile) in `out_dir`.
+
+        `info` (input path, rows, ...) is stored with the records. Returns
+        the sections and charts that are slower than in the previous report.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        json_path = os.path.join(out_dir, REPORT_NAME + '.json')
+        settings = {'trace_memory': self.trace_memory, 'profile': self.profile}
+        regressions = compare_reports(load_report(json_path, settings), self.records)
+
+        report = dict(info, created=time.strftime('%Y-%m-%d %H:%M:%S'),
+                      python=sys.version.split()[0], settings=settings,
+                      records=[r._asdict() for r in self.records])
+        tmp_path = json_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, json_path)
+
+        with open(os.path.join(out_dir, REPORT_NAME + '.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(Record._fields)
+            writer.writerows(self.records)
+
+        if self.profile_stats is not None:
+            base = os.path.join(out_dir, f"profile_{self.profile}")
+            self.profile_stats.dump_stats(base + '.prof')
+            with open(base + '.txt', 'w') as f:
+                pstats.Stats(base + '.prof', stream=f).sort_stats('cumulative').print_stats(40)
+        return regressions
+
+
+def load_report(path, settings=None):
+    """Records of a saved report as {name: dict}.
+
+    Returns {} if there is no report, or if it was made with different
+    `settings` (tracemalloc and cProfile slow a run down, so such runs
+    are not comparable).
+    """
+    try:
+        with open(path) as f:
+            report = json.load(f)
+        if settings is not None and report.get('settings') != settings:
+            return {}
+        return {r['name']: r for r in report['records']}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def compare_reports(previous, records):
+    """Regressions of `records` against the previous report's records."""
+    regressions = []
+    for r in records:
+        before = previous.get(r.name, {}).get('wall_seconds')
+        if (before is not None and r.wall_seconds > before * REGRESSION_RATIO
+                and r.wall_seconds - before > REGRESSION_MIN_SECONDS):
+            regressions.append(Regression(r.name, before, r.wall_seconds))
+    return regressions
@@ -0,0 +1,70 @@
+"""
+Likert Summary - MSW Charging Scheme Data Visualization
+=======================================================
+Counts every level of every Likert column in one vectorized pass, so the
+bar, pie, comparison and panel charts read their heights from one table
+instead of calling value_counts() once per bar.
+
+Usage:
+    from likert_summary import LikertSummary
+    summary = LikertSummary.from_frame(df, ['support_level', 'support_after_info'])
+    summary.counts('support_level')          # [n1, n2, n3, n4, n5]
+    summary.max_count(['support_level', 'support_after_info'])
+"""
+
+import numpy as np
+import pandas as pd
+
+LIKERT_LEVELS = [1, 2, 3, 4, 5]
+
+
+class LikertSummary:
+    """Level counts for a set of Likert columns (one row per column)."""
+
+    def __init__(self, table, columns, levels=LIKERT_LEVELS):
+        self.table = np.asarray(table, dtype=np.int64)
+        self.columns = list(columns)
+        self.levels = list(levels)
+        self._row = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def from_frame(cls, df, columns, levels=LIKERT_LEVELS):
+        """Count all levels of all columns with a single np.bincount.
+
+        Levels must be consecutive integers; values outside the range
+        (and missing values) are not counted.
+        """
+        lo, n_levels = levels[0], len(levels)
+        matrix = df[columns].to_numpy()
+        if matrix.dtype.kind != 'f':
+            # Typed survey frames are already int8; float means NaNs are present
+            matrix = matrix.astype(np.int8, copy=False)
+        offsets = matrix - lo
+        valid = (offsets >= 0) & (offsets < n_levels)
+        # Give each column its own block of n_levels bins
+        flat = np.where(valid, offsets, 0).astype(np.int64) + np.arange(len(columns)) * n_levels
+        table = np.bincount(flat[valid], minlength=len(columns) * n_levels)
+        return cls(table.reshape(len(columns), n_levels), columns, levels)
+
+    @classmethod
+    def from_value_counts(cls, value_counts, levels=LIKERT_LEVELS):
+        """Build a summary from {column: value_counts Series} (e.g. the
+        output of survey_stream.stream_aggregates)."""
+        columns = list(value_counts)
+        table = [[value_counts[col].get(level, 0) for level in levels] for col in columns]
+        return cls(table, columns, levels)
+
+    def counts(self, column):
+        """Counts for each level of `column`, in level order."""
+        return self.table[self._row[column]].tolist()
+
+    def max_count(self, columns=None):
+        """Largest single-level count across `columns` (default: all)."""
+        rows = [self._row[col] for col in (columns or self.columns)]
+        return int(self.table[rows].max())
+
+    def frequency_table(self, column):
+        """Observed levels and their counts, like value_counts().sort_index()."""
+        counts = pd.Series(self.table[self._row[column]], index=self.levels, name='count')
+        counts.index.name = column
+        return counts[counts > 0]
@@ -0,0 +1,126 @@
+"""
+One-Hot Cross Tables - MSW Charging Scheme Data Visualization
+=============================================================
+Single-pass cross tabulation of a one-hot block (e.g. HongKongDistrict_*,
+or the week 3 AgeRange_*, HousingType_* and DailyWasteBags_* blocks)
+against a categorical column such as food_waste_behavior.
+
+The one-hot block is turned into one code per respondent (the index of the
+flagged column), and all counts come out of a single np.bincount over
+(code, category) pairs, instead of one filtered copy of the frame per
+block column.
+
+Usage:
+    from onehot_crosstab import crosstab_onehot
+    table = crosstab_onehot(df, 'HongKongDistrict_', 'food_waste_behavior')
+    table.counts        # respondents per (district, behavior)
+    table.percentages   # row percentages
+    table.unassigned    # respondents with no flag / several flags
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Codes for respondents that cannot be assigned to exactly one column
+NO_FLAG = -1
+MULTIPLE_FLAGS = -2
+
+# How to treat respondents with more than one flag in the block:
+#   'drop'  - leave them out of the table (they are reported in `unassigned`)
+#   'first' - assign them to the first flagged column
+#   'all'   - count them once under every flagged column
+#   'error' - raise ValueError
+MULTIPLE_MODES = ('drop', 'first', 'all', 'error')
+
+Crosstab = namedtuple('Crosstab', ['counts', 'percentages', 'unassigned'])
+
+
+def onehot_columns(columns, prefix):
+    """Columns of the one-hot block with the given prefix, in file order."""
+    return [col for col in columns if col.startswith(prefix)]
+
+
+def onehot_block(df, prefix):
+    """Return (names, block): the prefix-stripped column names and the
+    one-hot block as a uint8 matrix."""
+    cols = onehot_columns(df.columns, prefix)
+    if not cols:
+        raise ValueError(f"No columns start with {prefix!r}")
+    names = [col.replace(prefix, '', 1) for col in cols]
+    return names, df[cols].to_numpy(dtype=np.uint8)
+
+
+def decode_block(block, multiple='drop', prefix=''):
+    """Decode a uint8 one-hot block into (codes, n_flags).
+
+    codes[i] is the column index of the row's flag, NO_FLAG when it has no
+    flag and MULTIPLE_FLAGS when it has several (unless multiple='first' or
+    'all', which both keep the first flagged column).
+    """
+    if multiple not in MULTIPLE_MODES:
+        raise ValueError(f"multiple must be one of {MULTIPLE_MODES}, got {multiple!r}")
+    codes = block.argmax(axis=1).astype(np.int64)
+    n_flags = block.sum(axis=1, dtype=np.int64)
+    codes[n_flags == 0] = NO_FLAG
+    if multiple == 'error' and (n_flags > 1).any():
+        raise ValueError(f"{int((n_flags > 1).sum())} rows have more than one "
+                         f"{prefix}* flag")
+    if multiple == 'drop':
+        codes[n_flags > 1] = MULTIPLE_FLAGS
+    return codes, n_flags
+
+
+def onehot_codes(df, prefix, multiple='drop'):
+    """Decode a one-hot block of `df` into one integer code per row.
+
+    Returns (codes, names), where codes index into `names` (see
+    decode_block for the NO_FLAG / MULTIPLE_FLAGS codes).
+    """
+    names, block = onehot_block(df, prefix)
+    codes, _ = decode_block(block, multiple, prefix)
+    return codes, names
+
+
+def crosstab_onehot(df, prefix, column, multiple='drop'):
+    """Cross-tabulate a one-hot block against a categorical column.
+
+    Returns a Crosstab with
+      counts:      DataFrame, one row per block column (prefix removed, in
+                   file order) and one column per value of `column`
+      percentages: counts as a percentage of each row's total, leaving out
+                   rows with no respondents
+      unassigned:  Series with the number of respondents that have no flag
+                   and that have multiple flags (the latter are included in
+                   the table when multiple='first' or 'all')
+    """
+    names, block = onehot_block(df, prefix)
+    codes, n_flags = decode_block(block, multiple, prefix)
+
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = list(values.cat.categories)
+        value_codes = values.cat.codes.to_numpy(dtype=np.int64)
+    else:
+        value_codes, uniques = pd.factorize(values, sort=True)
+        categories = list(uniques)
+    n_rows, n_cats = len(names), len(categories)
+
+    # Rows with a missing category value (code -1) are left out
+    valid = value_codes >= 0
+    if multiple == 'all':
+        # Every flagged column counts the row: block.T @ one-hot(categories)
+        table = (block[valid].T.astype(np.int64)
+                 @ np.eye(n_cats, dtype=np.int64)[value_codes[valid]])
+    else:
+        assigned = valid & (codes >= 0)
+        flat = codes[assigned] * n_cats + value_codes[assigned]
+        table = np.bincount(flat, minlength=n_rows * n_cats).reshape(n_rows, n_cats)
+
+    counts = pd.DataFrame(table, index=names, columns=categories)
+    totals = counts.sum(axis=1)
+    percentages = counts[totals > 0].div(totals[totals > 0], axis=0) * 100
+    unassigned = pd.Series({'no flag': int((n_flags == 0).sum()),
+                            'multiple flags': int((n_flags > 1).sum())})
+    return Crosstab(counts, percentages, unassigned)
@@ -0,0 +1,167 @@
+"""
+Output Profiles - MSW Charging Scheme Data Visualization
+========================================================
+Chooses the file formats, resolution and compression of the saved charts.
+
+  standard     PNG at the chart's own dpi (150), default compression;
+               the files are the same as plt.savefig(path, dpi=150)
+  preview      PNG at 72 dpi with the fastest compression, for quick looks
+  publication  SVG and PDF (vector; reproducible, no creation date)
+  web          small files: optimized PNG and WebP at 100 dpi
+
+save_figure() draws the figure once into an RGBA buffer and hands the
+buffer to a pool of encoder threads (Pillow releases the GIL while it
+compresses), so the next chart can be drawn while this one is encoded
+and several formats are encoded at the same time. Vector formats need
+the figure itself and are written before save_figure() returns.
+
+A file is written under its final name only once it is complete.
+
+Usage:
+    from output_profiles import save_figure, wait_outputs
+    pending = save_figure(fig, 'plots/support_comparison.png', 'web', dpi=150)
+    for output in wait_outputs(pending):
+        print(output.path, output.size_kb, output.encode_seconds)
+"""
+
+import io
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# options are Pillow save options for raster formats and savefig()
+# keyword arguments for vector formats; dpi=None keeps the chart's own dpi
+OutputProfile = namedtuple('OutputProfile', ['name', 'formats', 'dpi', 'options'])
+
+PROFILES = {
+    'standard': OutputProfile('standard', ('png',), None, {}),
+    'preview': OutputProfile('preview', ('png',), 72, {'png': {'compress_level': 1}}),
+    'publication': OutputProfile('publication', ('svg', 'pdf'), 300,
+                                 {'svg': {'metadata': {'Date': None}},
+                                  'pdf': {'metadata': {'CreationDate': None}}}),
+    'web': OutputProfile('web', ('png', 'webp'), 100,
+                         {'png': {'optimize': True}, 'webp': {'quality': 80}}),
+}
+DEFAULT_PROFILE = 'standard'
+
+VECTOR_FORMATS = ('svg', 'pdf')
+
+# Encoder threads mostly wait on Pillow's compression, outside the GIL
+ENCODE_THREADS = 4
+
+# One per saved file; encode_seconds is the time spent writing that file
+OutputFile = namedtuple('OutputFile', ['path', 'size_kb', 'encode_seconds'])
+
+_encoder = None
+
+
+def _reset_encoder():
+    # A forked worker process does not inherit the parent's threads
+    global _encoder
+    _encoder = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_encoder)
+
+
+def encoder():
+    """The thread pool shared by all save_figure() calls of this process."""
+    global _encoder
+    if _encoder is None:
+        _encoder = ThreadPoolExecutor(max_workers=ENCODE_THREADS, thread_name_prefix='encode')
+    return _encoder
+
+
+def get_profile(profile):
+    """An OutputProfile from its name (a profile is returned unchanged)."""
+    if isinstance(profile, OutputProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"output profile must be one of {sorted(PROFILES)}, got {profile!r}")
+    return PROFILES[profile]
+
+
+def output_paths(path, profile=DEFAULT_PROFILE):
+    """The files written for `path` (its extension is replaced per format)."""
+    stem = os.path.splitext(path)[0]
+    return [f"{stem}.{fmt}" for fmt in get_profile(profile).formats]
+
+
+def _output_file(path, start):
+    return OutputFile(path, os.path.getsize(path) / 1024, time.perf_counter() - start)
+
+
+def _encode(rgba, path, fmt, dpi, options):
+    from matplotlib.image import imsave
+
+    start = time.perf_counter()
+    tmp_path = f"{path}.tmp"
+    imsave(tmp_path, rgba, format=fmt, dpi=dpi, pil_kwargs=dict(options))
+    os.replace(tmp_path, path)
+    return _output_file(path, start)
+
+
+class _PixelCapture(io.BytesIO):
+    """Target of savefig(format='rgba') that keeps the shape of the pixels.
+
+    Agg writes its (h, w, 4) buffer in one call; keeping that shape avoids
+    recomputing the size Agg chose from figsize * dpi, which floating-point
+    error can get wrong by a pixel.
+    """
+
+    shape = None
+
+    def write(self, data):
+        if self.shape is None:
+            self.shape = getattr(data, 'shape', None)
+        return super().write(data)
+
+
+def render_rgba(fig, dpi):
+    """Draw `fig` as savefig() would and return its pixels as an (h, w, 4) array."""
+    import numpy as np
+
+    capture = _PixelCapture()
+    fig.savefig(capture, format='rgba', dpi=dpi)
+    pixels = np.frombuffer(capture.getbuffer(), np.uint8)
+    if capture.shape is not None and len(capture.shape) == 3:
+        return pixels.reshape(capture.shape)
+    # Written in pieces: Agg's width is figure width * dpi, rounded down
+    # unless within 1e-8 of the next pixel
+    width = int(fig.get_figwidth() * dpi + 1e-8)
+    return pixels.reshape(-1, width, 4)
+
+
+def save_figure(fig, path, profile=DEFAULT_PROFILE, dpi=150):
+    """Save `fig` in every format of `profile`; returns a list of futures.
+
+    Raster formats are encoded by the encoder threads, so the figure may
+    be closed as soon as this returns. Each future gives an OutputFile;
+    see wait_outputs().
+    """
+    profile = get_profile(profile)
+    dpi = profile.dpi or dpi
+    pending = []
+    rgba = None
+    for fmt, out in zip(profile.formats, output_paths(path, profile)):
+        options = profile.options.get(fmt, {})
+        if fmt in VECTOR_FORMATS:
+            start = time.perf_counter()
+            tmp_path = f"{out}.tmp"
+            fig.savefig(tmp_path, format=fmt, dpi=dpi, **options)
+            os.replace(tmp_path, out)
+            done = Future()
+            done.set_result(_output_file(out, start))
+            pending.append(done)
+        else:
+            if rgba is None:
+                rgba = render_rgba(fig, dpi)
+            pending.append(encoder().submit(_encode, rgba, out, fmt, dpi, options))
+    return pending
+
+
+def wait_outputs(pending):
+    """Wait for the futures of save_figure(); returns their OutputFiles."""
+    return [future.result() for future in pending]
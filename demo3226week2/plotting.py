@@ -0,0 +1,101 @@
+"""
+Plotting Setup - MSW Charging Scheme Data Visualization
+=======================================================
+Lets the section scripts start without the plotting stack.
+
+matplotlib is imported by pyplot() only once a chart is drawn, and
+seaborn (slow to import) only for the regression plot of section 5;
+palette() gives the seaborn colors from matplotlib's colormaps. Every
+section script takes
+  --stats  print the tables and summaries only; matplotlib is never imported
+  --batch  save the charts without showing them (non-interactive Agg
+           backend), for scheduled runs; also enabled by SURVEY_BATCH=1
+  --output-profile  formats and quality of the saved charts (see
+           output_profiles.py); savefig() saves in the chosen profile and
+           records the encode time of each file for section 6
+
+Usage:
+    from plotting import add_output_arguments, palette, pyplot, savefig, show
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    ...                                   # print the statistics
+    if args.stats:
+        sys.exit()
+    plt = pyplot(args.batch)
+    plt.bar(labels, counts, color=palette('Blues', 5))
+    savefig(plt, 'plots/chart.png', args.output_profile)
+    show(plt)
+"""
+
+import os
+import time
+
+from build_cache import record_outputs
+from output_profiles import DEFAULT_PROFILE, PROFILES, save_figure, wait_outputs
+
+BATCH_ENV = 'SURVEY_BATCH'
+
+# Backends that only write files; plt.show() has nothing to display
+NON_INTERACTIVE_BACKENDS = ('agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template')
+
+
+def add_output_arguments(parser):
+    """Add the --stats, --batch and --output-profile options to a section script's parser."""
+    parser.add_argument('--stats', action='store_true',
+                        help='print the tables and summaries only (no charts, no matplotlib)')
+    parser.add_argument('--batch', action='store_true', default=batch_requested(),
+                        help=f'save charts without showing them (also set by {BATCH_ENV}=1)')
+    parser.add_argument('--output-profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help='chart formats and quality (default: %(default)s PNG)')
+
+
+def batch_requested():
+    return os.environ.get(BATCH_ENV, '') not in ('', '0')
+
+
+def pyplot(batch=False):
+    """Import matplotlib.pyplot, with the Agg backend in batch mode."""
+    import matplotlib
+    if batch:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def savefig(plt, path, profile=DEFAULT_PROFILE, dpi=150):
+    """plt.savefig(path, dpi=dpi) in the formats of an output profile.
+
+    The saved files and their encode times are recorded in the plots
+    directory's manifest, which section 6 lists. Returns the OutputFiles.
+    """
+    start = time.perf_counter()
+    outputs = wait_outputs(save_figure(plt.gcf(), path, profile, dpi))
+    record_outputs(os.path.dirname(path) or '.', outputs, time.perf_counter() - start)
+    return outputs
+
+
+def show(plt):
+    """plt.show(), or close the figures under a non-interactive backend."""
+    import matplotlib
+
+    if matplotlib.get_backend().lower() in NON_INTERACTIVE_BACKENDS:
+        plt.close('all')
+    else:
+        plt.show()
+
+
+def palette(name, n_colors=None):
+    """RGB colors of a matplotlib colormap, as seaborn.color_palette(name, n_colors).
+
+    Qualitative maps (Set2, ...) give their own colors; continuous maps
+    (Blues, ...) are sampled at n_colors evenly spaced inner points.
+    """
+    import matplotlib
+    import numpy as np
+    from matplotlib.colors import ListedColormap
+
+    cmap = matplotlib.colormaps[name]
+    if isinstance(cmap, ListedColormap) and cmap.N < 256:
+        return [tuple(color[:3]) for color in cmap.colors[:n_colors]]
+    n = 6 if n_colors is None else n_colors
+    return [tuple(color) for color in cmap(np.linspace(0, 1, n + 2)[1:-1])[:, :3]]
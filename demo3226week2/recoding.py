@@ -0,0 +1,143 @@
+"""
+One-Hot Recoding - MSW Charging Scheme Data Visualization
+=========================================================
+Turns one-hot blocks (AgeRange_*, HighestEducationLevel_*,
+HouseholdMonthlyIncomeRange_*, ...) back into single numeric variables
+such as age midpoints or an ordinal education level.
+
+A recode is declared as {new column: (prefix, {block column: value})},
+where block columns are named without the prefix. All blocks are decoded
+together: one uint8 matrix of every flag column and a single matrix
+multiply that gives each block's number of flags and flagged column. By
+default each row must have exactly one flag per block; missing='nan' gives
+rows with no flag NaN instead (e.g. when those rows are dropped later).
+
+Used by the week 3 regression notebook and reusable from the week 2
+scripts (the helpers live next to onehot_crosstab.py).
+
+Usage:
+    from recoding import WEEK3_RECODES, recode_onehot
+    recoded = recode_onehot(df, WEEK3_RECODES)       # columns income, education, age
+    recoded = recode_onehot(df, WEEK3_RECODES, missing='nan')   # unanswered -> NaN
+    df[recoded.columns] = recoded
+"""
+
+import numpy as np
+import pandas as pd
+
+from onehot_crosstab import decode_block, onehot_columns
+
+WEEK3_RECODES = {
+    # Household monthly income, midpoints in thousands of HK$
+    'income': ('HouseholdMonthlyIncomeRange_', {
+        'Below15k': 10,
+        '15,001-30,000': 22.5,
+        '30,001-50,000': 40,
+        '50,001-70,000': 60,
+        'AboveHK70k': 90,
+    }),
+    # Highest education level, ordinal 1-4
+    'education': ('HighestEducationLevel_', {
+        'Primaryorbelow': 1,
+        'Secondary': 2,
+        'DiplomaorBachelor': 3,
+        'Masterorabove': 4,
+    }),
+    # Age range midpoints in years
+    'age': ('AgeRange_', {
+        '18-24': 20,
+        '25-34': 30,
+        '35-44': 40,
+        '45-54': 50,
+        '55-64': 60,
+        '65+': 70,
+    }),
+}
+
+# How to treat rows with more than one flag in a block:
+#   'error' - raise ValueError (the default: the survey allows one answer)
+#   'nan'   - give the row NaN
+#   'first' - use the first flagged column (in file order)
+MULTIPLE_MODES = ('error', 'nan', 'first')
+
+# How to treat rows with no flag in a block:
+#   'error' - raise ValueError (the default)
+#   'nan'   - give the row NaN, like np.select(..., default=np.nan)
+MISSING_MODES = ('error', 'nan')
+
+
+def recode_onehot(df, recodes, multiple='error', missing='error'):
+    """Decode every one-hot block in `recodes` into one column each.
+
+    Returns a float DataFrame with one column per recode, indexed like
+    `df`. A flag in a block column that the mapping does not list gives
+    NaN, like a missing np.select condition.
+    """
+    if multiple not in MULTIPLE_MODES:
+        raise ValueError(f"multiple must be one of {MULTIPLE_MODES}, got {multiple!r}")
+    if missing not in MISSING_MODES:
+        raise ValueError(f"missing must be one of {MISSING_MODES}, got {missing!r}")
+
+    names = list(recodes)
+    columns, blocks = [], []
+    for name, (prefix, mapping) in recodes.items():
+        block_cols = onehot_columns(df.columns, prefix)
+        if not block_cols:
+            raise ValueError(f"No columns start with {prefix!r}")
+        unknown = set(mapping) - {col.replace(prefix, '', 1) for col in block_cols}
+        if unknown:
+            raise ValueError(f"{prefix}* has no columns named {sorted(unknown)}")
+        columns += block_cols
+        blocks.append((prefix, mapping, block_cols))
+
+    # membership[j, k] = 1 when flag column j belongs to recode k and
+    # position[j, k] is its index within that block; lookups[k] holds the
+    # block's values in column order (NaN for columns the mapping omits)
+    n_cols, n_recodes = len(columns), len(names)
+    membership = np.zeros((n_cols, n_recodes), dtype=np.float32)
+    position = np.zeros((n_cols, n_recodes), dtype=np.float32)
+    lookups = []
+    start = 0
+    for k, (prefix, mapping, block_cols) in enumerate(blocks):
+        membership[start:start + len(block_cols), k] = 1
+        position[start:start + len(block_cols), k] = np.arange(len(block_cols))
+        lookups.append(np.array([mapping.get(col.replace(prefix, '', 1), np.nan)
+                                 for col in block_cols], dtype=np.float64))
+        start += len(block_cols)
+
+    # One float32 product gives every block's flag count and, for rows
+    # with one flag, the flagged column. The operands are small integers,
+    # so float32 is exact, and values come from the float64 lookups.
+    flags = df[columns].to_numpy(dtype=np.uint8)
+    product = flags.astype(np.float32) @ np.hstack([membership, position])
+    n_flags = product[:, :n_recodes].astype(np.int64)
+    codes = product[:, n_recodes:].astype(np.int64)
+
+    result = np.empty((len(df), n_recodes))
+    for k in range(n_recodes):
+        result[:, k] = lookups[k][np.minimum(codes[:, k], len(lookups[k]) - 1)]
+    result[n_flags != 1] = np.nan
+
+    none = n_flags == 0
+    if missing == 'error' and none.any():
+        bad = [names[k] for k in np.flatnonzero(none.any(axis=0))]
+        raise ValueError(f"{int(none.any(axis=1).sum())} rows have no flag "
+                         f"in the block(s) for {bad}")
+
+    several = n_flags > 1
+    if several.any():
+        if multiple == 'error':
+            bad = [names[k] for k in np.flatnonzero(several.any(axis=0))]
+            raise ValueError(f"{int(several.any(axis=1).sum())} rows have more than "
+                             f"one flag in the block(s) for {bad}")
+        if multiple == 'first':
+            start = 0
+            for k, (prefix, mapping, block_cols) in enumerate(blocks):
+                rows = np.flatnonzero(several[:, k])
+                if len(rows):
+                    block = flags[rows, start:start + len(block_cols)]
+                    first, _ = decode_block(block, 'first', prefix)
+                    result[rows, k] = lookups[k][first]
+                start += len(block_cols)
+
+    return pd.DataFrame(result, index=df.index, columns=names)
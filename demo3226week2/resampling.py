@@ -0,0 +1,186 @@
+"""
+Resampling Inference - MSW Charging Scheme Data Visualization
+=============================================================
+Bootstrap confidence intervals and permutation p-values for statistics
+such as the Pearson correlation of Distance_artificial and
+recycling_effort, or the Wilcoxon signed-rank statistic of support_info
+vs. support_after_info.
+
+Resamples are drawn as index (or sign) matrices, one batch of
+`batch_size` resamples at a time, and the statistic is computed for the
+whole batch at once: every statistic below takes arrays of shape
+(batch, n) and reduces along the last axis. Batches run in a process
+pool. Each batch gets its own seed spawned from one SeedSequence, so the
+results depend only on `seed`, not on the number of worker processes.
+
+Resampling schemes:
+  'bootstrap'   rows drawn with replacement (all arrays resampled together)
+  'permutation' the last array shuffled against the others (tests no
+                association, e.g. correlation = 0)
+  'sign_flip'   signs of paired differences flipped at random (tests a
+                symmetric distribution around 0, e.g. the signed-rank test)
+
+Usage:
+    from resampling import bootstrap_ci, permutation_test, pearson_r
+    ci = bootstrap_ci(pearson_r, (x, y), n_resamples=100_000)
+    test = permutation_test(pearson_r, (x, y), n_resamples=100_000)
+    print(ci.statistic, ci.ci_low, ci.ci_high, test.p_value)
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_SEED = 42
+
+# Below this many resampled values (n_resamples * n) batches run in this
+# process; starting workers would take longer than the work itself
+PARALLEL_MIN_VALUES = 5_000_000
+
+SCHEMES = ('bootstrap', 'permutation', 'sign_flip')
+ALTERNATIVES = ('two-sided', 'greater', 'less')
+
+BootstrapResult = namedtuple('BootstrapResult', ['statistic', 'ci_low', 'ci_high',
+                                                 'std_error', 'n_resamples'])
+PermutationResult = namedtuple('PermutationResult', ['statistic', 'p_value', 'n_resamples'])
+
+
+# ============================================================
+# Vectorized statistics: arrays (batch, n) -> (batch,)
+# ============================================================
+def pearson_r(x, y):
+    """Pearson correlation of each row of x with the same row of y."""
+    xc = x - x.mean(axis=-1, keepdims=True)
+    yc = y - y.mean(axis=-1, keepdims=True)
+    return (xc * yc).sum(axis=-1) / np.sqrt((xc ** 2).sum(axis=-1) * (yc ** 2).sum(axis=-1))
+
+
+def regression_slope(x, y):
+    """Least-squares slope of y on x, row by row."""
+    xc = x - x.mean(axis=-1, keepdims=True)
+    return (xc * (y - y.mean(axis=-1, keepdims=True))).sum(axis=-1) / (xc ** 2).sum(axis=-1)
+
+
+def ols_coefficients(*columns):
+    """OLS coefficients [const, b1, ..., bk] of the last array on the others.
+
+    Returns shape (batch, k + 1); every row is solved in one stacked
+    np.linalg.solve call.
+    """
+    *predictors, y = columns
+    X = np.stack([np.ones_like(y)] + list(predictors), axis=-1)
+    Xt = np.swapaxes(X, -1, -2)
+    return np.linalg.solve(Xt @ X, (Xt @ y[..., None]))[..., 0]
+
+
+def mean_difference(differences):
+    return differences.mean(axis=-1)
+
+
+def signed_rank_sum(differences):
+    """Sum of signed ranks of paired differences (W+ minus W-).
+
+    Zero differences are dropped and tied |differences| get their average
+    rank, as in scipy.stats.wilcoxon(zero_method='wilcox').
+    """
+    from scipy import stats  # slow to import; only this statistic needs it
+
+    magnitude = np.abs(differences)
+    n_zero = (magnitude == 0).sum(axis=-1, keepdims=True)
+    # Zeros rank lowest, so dropping them lowers every other rank by n_zero
+    ranks = stats.rankdata(magnitude, axis=-1) - n_zero
+    return (np.sign(differences) * ranks).sum(axis=-1)
+
+
+# ============================================================
+# Batched resampling
+# ============================================================
+def _resample_batch(statistic, data, scheme, size, seed):
+    """Statistic of `size` resamples of `data` drawn with `seed`."""
+    rng = np.random.default_rng(seed)
+    n = len(data[0])
+    if scheme == 'bootstrap':
+        index = rng.integers(0, n, size=(size, n))
+        return statistic(*(values[index] for values in data))
+    if scheme == 'permutation':
+        index = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+        fixed = [np.broadcast_to(values, (size, n)) for values in data[:-1]]
+        return statistic(*fixed, data[-1][index])
+    signs = rng.integers(0, 2, size=(size, n), dtype=np.int8) * 2 - 1
+    return statistic(data[0] * signs)
+
+
+def resample(statistic, data, scheme='bootstrap', n_resamples=DEFAULT_RESAMPLES,
+             batch_size=DEFAULT_BATCH_SIZE, seed=DEFAULT_SEED, processes=None):
+    """Statistic of `n_resamples` resamples of `data` (a tuple of 1-D arrays).
+
+    `statistic` must be a module-level function (it is sent to worker
+    processes). processes=None uses one worker per CPU core for large
+    jobs; processes=1 runs every batch in this process.
+    Returns an array of shape (n_resamples,) or (n_resamples, k).
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"scheme must be one of {SCHEMES}, got {scheme!r}")
+    data = tuple(np.asarray(values, dtype=np.float64) for values in data)
+    sizes = [min(batch_size, n_resamples - start)
+             for start in range(0, n_resamples, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if (processes == 1 or len(sizes) == 1
+            or processes is None and n_resamples * len(data[0]) < PARALLEL_MIN_VALUES):
+        batches = [_resample_batch(statistic, data, scheme, size, batch_seed)
+                   for size, batch_seed in zip(sizes, seeds)]
+    else:
+        workers = min(processes or os.cpu_count() or 1, len(sizes))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_resample_batch, statistic, data, scheme, size, batch_seed)
+                       for size, batch_seed in zip(sizes, seeds)]
+            batches = [future.result() for future in futures]
+    return np.concatenate(batches)
+
+
+def bootstrap_ci(statistic, data, n_resamples=DEFAULT_RESAMPLES, confidence=0.95,
+                 batch_size=DEFAULT_BATCH_SIZE, seed=DEFAULT_SEED, processes=None):
+    """Percentile bootstrap confidence interval of `statistic`."""
+    data = tuple(np.asarray(values, dtype=np.float64) for values in data)
+    observed = statistic(*(values[None, :] for values in data))[0]
+    replicates = resample(statistic, data, 'bootstrap', n_resamples, batch_size, seed,
+                          processes)
+    alpha = (1 - confidence) / 2
+    low, high = np.nanquantile(replicates, [alpha, 1 - alpha], axis=0)
+    return BootstrapResult(observed, low, high, np.nanstd(replicates, axis=0, ddof=1),
+                           n_resamples)
+
+
+def permutation_test(statistic, data, scheme='permutation', n_resamples=DEFAULT_RESAMPLES,
+                     alternative='two-sided', batch_size=DEFAULT_BATCH_SIZE,
+                     seed=DEFAULT_SEED, processes=None):
+    """Monte Carlo permutation (or sign-flip) p-value of `statistic`.
+
+    The null distribution of the statistic must be centered on 0 (true of
+    the correlation, slope, mean difference and signed-rank sum). The
+    p-value counts the observed arrangement as one of the resamples, so
+    it is never 0.
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"alternative must be one of {ALTERNATIVES}, got {alternative!r}")
+    if scheme == 'bootstrap':
+        raise ValueError("Use scheme='permutation' or 'sign_flip' for a test")
+    data = tuple(np.asarray(values, dtype=np.float64) for values in data)
+    observed = statistic(*(values[None, :] for values in data))[0]
+    null = resample(statistic, data, scheme, n_resamples, batch_size, seed, processes)
+    # Round-off can make resamples equal to the observed value differ in
+    # the last digits; count them as at least as extreme
+    tolerance = 1e-12 * max(1.0, np.abs(observed).max())
+    if alternative == 'two-sided':
+        extreme = np.abs(null) >= np.abs(observed) - tolerance
+    elif alternative == 'greater':
+        extreme = null >= observed - tolerance
+    else:
+        extreme = null <= observed + tolerance
+    p_value = (extreme.sum(axis=0) + 1) / (n_resamples + 1)
+    return PermutationResult(observed, p_value, n_resamples)
@@ -5,206 +5,232 @@ Run All Sections - MSW Charging Scheme Data Visualization
 This script runs all sections of the data visualization workflow.
 It creates the plots directory and generates all visualizations.
 
+The text output of each section is printed first; the charts are then
+rendered in parallel by a pool of worker processes (see figure_jobs.py
+and charts.py).
+
+Charts whose input columns, parameters and code have not changed since
+the last run are reused instead of re-rendered (see build_cache.py).
+
+The output profile picks the chart formats (PNG, SVG/PDF, WebP), dpi and
+compression (see output_profiles.py).
+
+Every section and chart is timed; the measurements are saved next to the
+plots as run_report.json/.csv and compared with the last run (see
+instrumentation.py).
+
 Run this file to execute all tasks from the notebook.
+    python run_all_sections.py [--processes N] [--force]
+    python run_all_sections.py --trace-memory --profile charts
+    python run_all_sections.py --stats        # text only, no plotting libraries
+    python run_all_sections.py --output-profile publication   # SVG + PDF
+    python run_all_sections.py --input wave2.csv --plots-dir wave2_plots
+
+Paths are taken relative to the current directory (the defaults point
+next to this script), so run_pipeline() can be called for several
+inputs at once (see run_batch.py).
 """
 
+import argparse
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-
-# Change to the script's directory
-os.chdir(os.path.dirname(os.path.abspath(__file__)))
-
-# ============================================================
-# Section 0: Import Libraries (already done above)
-# ============================================================
-print("=" * 70)
-print("SECTION 0: Libraries imported successfully!")
-print("=" * 70)
-
-# ============================================================
-# Section 6 (Pre-run): Create plots directory
-# ============================================================
-if not os.path.exists('plots'):
-    os.makedirs('plots')
-    print("Created 'plots' directory")
-
-# ============================================================
-# Section 1: Load and Examine the Dataset
-# ============================================================
-print("\n" + "=" * 70)
-print("SECTION 1: Load and Examine the Dataset")
-print("=" * 70)
-df = pd.read_csv('GCAP3226_week2.csv')
-print(f"Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-print("\nFirst 5 rows:")
-print(df.head())
-
-# ============================================================
-# Section 2: Understand Dataset Structure
-# ============================================================
-print("\n" + "=" * 70)
-print("SECTION 2: Dataset Structure and Summary Statistics")
-print("=" * 70)
-print("\nDataset Info:")
-df.info()
-print("\nSummary Statistics:")
-print(df.describe())
-
-# ============================================================
-# Section 3: Categorical Data Visualization
-# ============================================================
-print("\n" + "=" * 70)
-print("SECTION 3: Categorical Data Visualization")
-print("=" * 70)
-
-# Likert scale labels
-likert_labels = {1: 'Strongly oppose', 2: 'Oppose', 3: 'Neutral', 
-                 4: 'Support', 5: 'Strongly support'}
-order = [1, 2, 3, 4, 5]
-labels = [f"{i}\n{likert_labels[i]}" for i in order]
-
-# 3.1 Frequency Table
-print("\nFrequency Table - support_level:")
-freq_table = df['support_level'].value_counts().sort_index()
-for level, count in freq_table.items():
-    print(f"  {level} ({likert_labels[level]}): {count}")
-
-# 3.2 Bar Chart for support_level
-plt.figure(figsize=(10, 6))
-counts = [df['support_level'].value_counts().get(i, 0) for i in order]
-plt.bar(labels, counts, color='steelblue', edgecolor='black')
-plt.xlabel('Support Level', fontsize=12)
-plt.ylabel('Number of Respondents', fontsize=12)
-plt.title('Distribution of Support Level for MSW Charging Scheme', fontsize=14)
-plt.tight_layout()
-plt.savefig('plots/support_level_bar_chart.png', dpi=150)
-plt.close()
-print("Saved: plots/support_level_bar_chart.png")
-
-# 3.3 Pie Chart
-plt.figure(figsize=(10, 8))
-pie_labels = [f"{i}: {likert_labels[i]}" for i in order]
-plt.pie(counts, labels=pie_labels, autopct='%1.1f%%', startangle=90,
-        colors=sns.color_palette('Blues', n_colors=5))
-plt.title('Distribution of Support Level', fontsize=14)
-plt.tight_layout()
-plt.savefig('plots/support_level_pie_chart.png', dpi=150)
-plt.close()
-print("Saved: plots/support_level_pie_chart.png")
-
-# 3.4 Comparison
-fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-max_count = max(df['support_level'].value_counts().max(), 
-                df['support_after_info'].value_counts().max()) + 5
-
-counts_before = [df['support_level'].value_counts().get(i, 0) for i in order]
-counts_after = [df['support_after_info'].value_counts().get(i, 0) for i in order]
-
-axes[0].bar(labels, counts_before, color='steelblue', edgecolor='black')
-axes[0].set_title('Support Level (Before Information)', fontsize=12)
-axes[0].set_ylim(0, max_count)
-
-axes[1].bar(labels, counts_after, color='coral', edgecolor='black')
-axes[1].set_title('Support Level (After Information)', fontsize=12)
-axes[1].set_ylim(0, max_count)
-
-plt.tight_layout()
-plt.savefig('plots/support_comparison.png', dpi=150)
-plt.close()
-print("Saved: plots/support_comparison.png")
-
-# 3.5 District Distribution
-district_cols = [col for col in df.columns if 'HongKongDistrict' in col]
-district_counts = {}
-for col in district_cols:
-    district_name = col.replace('HongKongDistrict_', '')
-    district_counts[district_name] = df[col].sum()
-
-district_series = pd.Series(district_counts).sort_values(ascending=True)
-
-plt.figure(figsize=(12, 6))
-plt.barh(district_series.index, district_series.values, color='steelblue', edgecolor='black')
-plt.xlabel('Number of Respondents', fontsize=12)
-plt.title('Living District Distribution of Respondents', fontsize=14)
-plt.tight_layout()
-plt.savefig('plots/district_distribution.png', dpi=150)
-plt.close()
-print("Saved: plots/district_distribution.png")
-
-# ============================================================
-# Section 4: Continuous Data Analysis
-# ============================================================
-print("\n" + "=" * 70)
-print("SECTION 4: Continuous Data Analysis")
-print("=" * 70)
-
-print("\nFive-Number Summary for Distance_artificial:")
-print(f"  Minimum: {df['Distance_artificial'].min():.2f}")
-print(f"  Q1:      {df['Distance_artificial'].quantile(0.25):.2f}")
-print(f"  Median:  {df['Distance_artificial'].median():.2f}")
-print(f"  Q3:      {df['Distance_artificial'].quantile(0.75):.2f}")
-print(f"  Maximum: {df['Distance_artificial'].max():.2f}")
-
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-
-# Box plot
-axes[0].boxplot(df['Distance_artificial'].dropna(), vert=True, patch_artist=True,
-                boxprops=dict(facecolor='lightblue'))
-axes[0].set_ylabel('Distance (m)', fontsize=11)
-axes[0].set_title('Box-Whisker Plot of Distance_artificial', fontsize=12)
-
-# Histogram
-axes[1].hist(df['Distance_artificial'].dropna(), bins=15, color='steelblue', edgecolor='black')
-axes[1].set_xlabel('Distance (m)', fontsize=11)
-axes[1].set_ylabel('Frequency', fontsize=11)
-axes[1].set_title('Histogram of Distance_artificial', fontsize=12)
-axes[1].axvline(df['Distance_artificial'].mean(), color='red', linestyle='--', 
-                label=f'Mean: {df["Distance_artificial"].mean():.1f}m')
-axes[1].legend()
-
-plt.tight_layout()
-plt.savefig('plots/distance_analysis.png', dpi=150)
-plt.close()
-print("Saved: plots/distance_analysis.png")
-
-# ============================================================
-# Section 5: Relationship Analysis
-# ============================================================
-print("\n" + "=" * 70)
-print("SECTION 5: Relationship Analysis")
-print("=" * 70)
-
-plt.figure(figsize=(10, 7))
-np.random.seed(42)
-jitter = np.random.uniform(-0.2, 0.2, size=len(df))
-plt.scatter(df['Distance_artificial'], df['recycling_effort'] + jitter, 
-            alpha=0.6, c='steelblue', edgecolor='white', s=60)
-plt.xlabel('Distance to Nearest Recycling Facility (m)', fontsize=12)
-plt.ylabel('Recycling Effort Level', fontsize=12)
-plt.title('Distance vs. Recycling Effort', fontsize=14)
-plt.yticks([1, 2, 3], ['1 (Low)', '2 (Medium)', '3 (High)'])
-plt.tight_layout()
-plt.savefig('plots/distance_vs_recycling.png', dpi=150)
-plt.close()
-
-correlation = df['Distance_artificial'].corr(df['recycling_effort'])
-print(f"Correlation coefficient: {correlation:.4f}")
-print("Saved: plots/distance_vs_recycling.png")
-
-# ============================================================
-# Section 6: Summary of saved files
-# ============================================================
-print("\n" + "=" * 70)
-print("SECTION 6: Saved Visualizations")
-print("=" * 70)
-files = os.listdir('plots')
-for i, f in enumerate(sorted(files), 1):
-    file_size = os.path.getsize(os.path.join('plots', f)) / 1024
-    print(f"  {i}. {f} ({file_size:.1f} KB)")
-
-print("\n" + "=" * 70)
-print("ALL SECTIONS COMPLETED SUCCESSFULLY!")
-print("=" * 70)
+
+from build_cache import load_manifest, output_entries
+from charts import FIGURE_JOBS, LIKERT_LABELS, distance_summary, support_summary
+from figure_jobs import run_figure_jobs
+from instrumentation import REPORT_NAME, SECTIONS, Instrumentation, is_report_file
+from output_profiles import DEFAULT_PROFILE, PROFILES
+from survey_data import load_survey
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_pipeline(csv_path, plots_dir, processes=None, incremental=True, instrument=None,
+                 render=True, output_profile=DEFAULT_PROFILE):
+    """Run sections 0-6 for one survey file, saving the charts in `plots_dir`.
+
+    Prints the same report as the section scripts and returns a dict
+    summary of the input: rows, support_level counts, the five-number
+    summary of Distance_artificial, the correlation with recycling_effort
+    and how many charts were rebuilt.
+
+    Each section and chart is timed (see instrumentation.py) and the
+    measurements are saved as run_report.json/.csv in `plots_dir`; pass an
+    Instrumentation to trace memory or profile a section. render=False
+    prints the statistics only; matplotlib is then never imported.
+    `output_profile` names the chart formats (see output_profiles.py).
+    """
+    inst = instrument or Instrumentation()
+
+    # ============================================================
+    # Section 0: Setup (matplotlib is imported only when a chart is drawn)
+    # ============================================================
+    print("=" * 70)
+    print(f"SECTION 0: Input {csv_path}")
+    print(f"Charts: {plots_dir}" if render else "Charts: none (statistics only)")
+    print("=" * 70)
+
+    # ============================================================
+    # Section 6 (Pre-run): Create plots directory
+    # ============================================================
+    if not os.path.exists(plots_dir):
+        os.makedirs(plots_dir)
+        print(f"Created '{plots_dir}' directory")
+
+    # ============================================================
+    # Section 1: Load and Examine the Dataset
+    # ============================================================
+    print("\n" + "=" * 70)
+    print("SECTION 1: Load and Examine the Dataset")
+    print("=" * 70)
+    with inst.section('load'):
+        df = load_survey(csv_path)
+        print(f"Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+        print("\nFirst 5 rows:")
+        print(df.head())
+
+    # ============================================================
+    # Section 2: Understand Dataset Structure
+    # ============================================================
+    print("\n" + "=" * 70)
+    print("SECTION 2: Dataset Structure and Summary Statistics")
+    print("=" * 70)
+    with inst.section('structure'):
+        print("\nDataset Info:")
+        df.info()
+        print("\nSummary Statistics:")
+        print(df.describe())
+
+    # ============================================================
+    # Section 3: Categorical Data Visualization
+    # ============================================================
+    print("\n" + "=" * 70)
+    print("SECTION 3: Categorical Data Visualization")
+    print("=" * 70)
+    with inst.section('categorical'):
+        # The Likert summary is shared with the chart jobs below
+        shared = {}
+        likert = support_summary(df, shared)
+
+        # 3.1 Frequency Table
+        print("\nFrequency Table - support_level:")
+        freq_table = likert.frequency_table('support_level')
+        for level, count in freq_table.items():
+            print(f"  {level} ({LIKERT_LABELS[level]}): {count}")
+
+    # ============================================================
+    # Section 4: Continuous Data Analysis
+    # ============================================================
+    print("\n" + "=" * 70)
+    print("SECTION 4: Continuous Data Analysis")
+    print("=" * 70)
+    with inst.section('continuous'):
+        # One pass over the column; the chart job reuses the same summary
+        five = distance_summary(df, shared).five_number()
+        print("\nFive-Number Summary for Distance_artificial:")
+        print(f"  Minimum: {five['min']:.2f}")
+        print(f"  Q1:      {five['q1']:.2f}")
+        print(f"  Median:  {five['median']:.2f}")
+        print(f"  Q3:      {five['q3']:.2f}")
+        print(f"  Maximum: {five['max']:.2f}")
+
+    # ============================================================
+    # Section 5: Relationship Analysis
+    # ============================================================
+    print("\n" + "=" * 70)
+    print("SECTION 5: Relationship Analysis")
+    print("=" * 70)
+    with inst.section('relationship'):
+        correlation = df['Distance_artificial'].corr(df['recycling_effort'])
+        print(f"Correlation coefficient: {correlation:.4f}")
+
+    rebuilt = 0
+    if render:
+        # ============================================================
+        # Sections 3-5: Render all charts in parallel
+        # ============================================================
+        print("\n" + "=" * 70)
+        print(f"Rendering {len(FIGURE_JOBS)} charts")
+        print("=" * 70)
+        with inst.section('charts'):
+            results = run_figure_jobs(FIGURE_JOBS, df, plots_dir, processes=processes,
+                                      shared=shared, incremental=incremental,
+                                      profile=output_profile)
+        for result in results:
+            if result.rebuilt:
+                print(f"Saved: {result.path} ({result.seconds:.2f} s)")
+            else:
+                print(f"Unchanged: {result.path}")
+        inst.add_charts(results)
+
+        # ============================================================
+        # Section 6: Summary of saved files
+        # ============================================================
+        print("\n" + "=" * 70)
+        print("SECTION 6: Saved Visualizations")
+        print("=" * 70)
+        with inst.section('saved'):
+            entries = output_entries(load_manifest(plots_dir))
+            files = [f for f in os.listdir(plots_dir)
+                     if not f.startswith('.') and not is_report_file(f)]
+            for i, f in enumerate(sorted(files), 1):
+                file_size = os.path.getsize(os.path.join(plots_dir, f)) / 1024
+                status, encode_seconds = entries.get(f, ('not tracked', None))
+                encode = '' if encode_seconds is None else f", encoded in {encode_seconds:.3f} s"
+                print(f"  {i}. {f} ({file_size:.1f} KB{encode}, {status})")
+            rebuilt = sum(result.rebuilt for result in results)
+            print(f"\n  {rebuilt} chart(s) rebuilt, {len(results) - rebuilt} reused")
+
+    # ============================================================
+    # Timings: where the run spent its time and memory
+    # ============================================================
+    print("\n" + "=" * 70)
+    print("Timings")
+    print("=" * 70)
+    inst.print_table()
+    regressions = inst.write_report(plots_dir, input=csv_path, rows=len(df),
+                                    processes=processes)
+    for r in regressions:
+        print(f"  Slower than last run: {r.name} "
+              f"({r.previous_seconds:.3f} s -> {r.wall_seconds:.3f} s)")
+    print(f"  Report saved to {os.path.join(plots_dir, REPORT_NAME)}.json/.csv")
+
+    print("\n" + "=" * 70)
+    print("ALL SECTIONS COMPLETED SUCCESSFULLY!")
+    print("=" * 70)
+
+    summary = {'rows': len(df)}
+    summary.update({f'support_level_{level}': count for level, count in freq_table.items()})
+    summary.update({f'distance_{stat}': value for stat, value in five.items()})
+    summary['correlation'] = correlation
+    summary['charts_rebuilt'] = rebuilt
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run all sections of the visualization workflow')
+    parser.add_argument('--input', default=os.path.relpath(os.path.join(HERE, 'GCAP3226_week2.csv')),
+                        help='survey data file (default: the week 2 CSV next to this script)')
+    parser.add_argument('--plots-dir', default=os.path.relpath(os.path.join(HERE, 'plots')),
+                        help="where to save the charts (default: 'plots' next to this script)")
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes for rendering charts (default: one per CPU core)')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render every chart even if its inputs have not changed')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the tables and summaries only (no charts, no matplotlib)')
+    parser.add_argument('--output-profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help='chart formats and quality (default: %(default)s PNG)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record peak Python allocations per section (slower)')
+    parser.add_argument('--profile', choices=SECTIONS,
+                        help='run cProfile on one section; saved as profile_<section>.prof/.txt')
+    args = parser.parse_args()
+
+    run_pipeline(args.input, args.plots_dir, processes=args.processes,
+                 incremental=not args.force,
+                 instrument=Instrumentation(args.trace_memory, args.profile),
+                 render=not args.stats, output_profile=args.output_profile)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Run Batch - MSW Charging Scheme Data Visualization
+==================================================
+Runs the whole section pipeline (run_all_sections.run_pipeline) for many
+survey files, e.g. one per district office and survey wave, and writes
+one combined summary across the inputs.
+
+Each input is handled by one worker process, from parsing to saving its
+charts, so one file is parsed while another is being rendered. Every
+input gets its own output directory:
+
+    <output-dir>/<name>/plots/       charts (rebuilt only when changed)
+    <output-dir>/<name>/report.txt   the text report of sections 0-6
+    <output-dir>/batch_summary.csv   one row per input: counts, five-number
+                                     summary, correlation, timing
+
+<name> is the file name without its extension, or its path relative to
+the other inputs (office1_wave1, ...) when two files share a name.
+
+Usage:
+    python run_batch.py 'waves/*.csv' --output-dir batch_output
+    python run_batch.py --manifest inputs.txt [--processes N] [--force]
+    python run_batch.py 'waves/*.csv' --output-profile preview
+
+A manifest lists one input file per line (relative to the manifest; blank
+lines and lines starting with # are ignored). Inputs can be CSV, Parquet
+or Arrow files (see survey_data.py).
+"""
+
+import argparse
+import contextlib
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from output_profiles import DEFAULT_PROFILE, PROFILES
+from run_all_sections import run_pipeline
+from survey_data import clear_memory_cache
+
+SUMMARY_NAME = 'batch_summary.csv'
+REPORT_NAME = 'report.txt'
+
+
+def read_manifest(path):
+    """Input files listed in a manifest, relative to the manifest's folder."""
+    base = os.path.dirname(path)
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base, line) for line in lines if line and not line.startswith('#')]
+
+
+def expand_inputs(patterns, manifests=()):
+    """Files matching the glob patterns and listed in the manifests, in order."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"No files match {pattern!r}")
+        paths += matches
+    for manifest in manifests:
+        listed = read_manifest(manifest)
+        missing = [path for path in listed if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"{manifest} lists missing files: {missing}")
+        paths += listed
+    # The same file listed twice would write to the same folder twice
+    return list(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+
+def output_names(paths):
+    """Folder name of each input: its stem, or its relative path if stems clash."""
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    if len(set(stems)) == len(stems):
+        return stems
+    common = os.path.commonpath([os.path.abspath(path) for path in paths])
+    return [os.path.splitext(os.path.relpath(os.path.abspath(path), common))[0]
+            .replace(os.sep, '_') for path in paths]
+
+
+def run_input(csv_path, out_dir, incremental=True, render=True,
+              output_profile=DEFAULT_PROFILE):
+    """Worker: run the pipeline for one input, writing its report to a file."""
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    with open(os.path.join(out_dir, REPORT_NAME), 'w') as report, \
+            contextlib.redirect_stdout(report):
+        # Charts are rendered in this worker; the pool already uses every core
+        summary = run_pipeline(csv_path, os.path.join(out_dir, 'plots'), processes=1,
+                               incremental=incremental, render=render,
+                               output_profile=output_profile)
+    # A worker handles many inputs; don't keep every frame alive
+    clear_memory_cache()
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def _outcome(func, *args):
+    """(summary, '') from func(*args), or ({}, error message) if it raised."""
+    try:
+        return func(*args), ''
+    except Exception as exc:
+        return {}, f"{type(exc).__name__}: {exc}"
+
+
+def run_batch(paths, output_dir, processes=None, incremental=True, render=True,
+              output_profile=DEFAULT_PROFILE):
+    """Run the pipeline for every input in a process pool.
+
+    processes=None uses one worker per CPU core; processes=1 runs the
+    inputs one after another in this process. An input that fails is
+    reported in the summary (column 'error') and does not stop the others.
+    Returns the combined summary DataFrame, one row per input.
+    """
+    names = output_names(paths)
+    out_dirs = [os.path.join(output_dir, name) for name in names]
+
+    if processes == 1 or len(paths) <= 1:
+        outcomes = [_outcome(run_input, path, out_dir, incremental, render,
+                             output_profile)
+                    for path, out_dir in zip(paths, out_dirs)]
+    else:
+        workers = min(processes or os.cpu_count() or 1, len(paths))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_input, path, out_dir, incremental, render,
+                                   output_profile)
+                       for path, out_dir in zip(paths, out_dirs)]
+            outcomes = [_outcome(future.result) for future in futures]
+
+    rows = []
+    for name, path, out_dir, (summary, error) in zip(names, paths, out_dirs, outcomes):
+        if error:
+            print(f"FAILED: {path}: {error}", file=sys.stderr)
+        else:
+            print(f"Done: {path} -> {out_dir} ({summary['seconds']:.2f} s)")
+        rows.append(dict(name=name, input=path, error=error, **summary))
+
+    # Counts stay integers even when a failed input leaves them empty
+    summary = pd.DataFrame(rows).convert_dtypes(convert_string=False, convert_boolean=False)
+    # Put the identifying columns first, then the statistics in pipeline order
+    first = ['name', 'input', 'error']
+    summary = summary[first + [col for col in summary.columns if col not in first]]
+    os.makedirs(output_dir, exist_ok=True)
+    summary.to_csv(os.path.join(output_dir, SUMMARY_NAME), index=False)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the visualization workflow for many survey files')
+    parser.add_argument('inputs', nargs='*',
+                        help="input files or glob patterns (quote them, e.g. 'waves/*.csv')")
+    parser.add_argument('--manifest', action='append', default=[],
+                        help='text file listing one input file per line (may be repeated)')
+    parser.add_argument('--output-dir', default='batch_output',
+                        help="folder for the per-input outputs and the summary (default: 'batch_output')")
+    parser.add_argument('--processes', type=int, default=None,
+                        help='inputs processed at once (default: one per CPU core)')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render every chart even if its inputs have not changed')
+    parser.add_argument('--stats', action='store_true',
+                        help='compute the summaries only (no charts, no matplotlib)')
+    parser.add_argument('--output-profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help='chart formats and quality (default: %(default)s PNG)')
+    args = parser.parse_args()
+
+    paths = expand_inputs(args.inputs, args.manifest)
+    if not paths:
+        parser.error('no inputs given; pass files, glob patterns or --manifest')
+
+    print(f"Running the pipeline for {len(paths)} input(s)")
+    summary = run_batch(paths, args.output_dir, processes=args.processes,
+                        incremental=not args.force, render=not args.stats,
+                        output_profile=args.output_profile)
+
+    print("\n" + "=" * 70)
+    print("BATCH SUMMARY")
+    print("=" * 70)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summary.drop(columns=['input']).to_string(index=False))
+    print(f"\nSummary saved to {os.path.join(args.output_dir, SUMMARY_NAME)}")
+
+    failed = (summary['error'] != '').sum()
+    if failed:
+        print(f"{failed} input(s) failed; see the 'error' column", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Large-N Scatter Density - MSW Charging Scheme Data Visualization
+================================================================
+Helpers for drawing Distance_artificial vs. recycling_effort when there
+are too many respondents for a point-per-respondent scatter plot.
+
+Above LARGE_N_THRESHOLD rows the charts switch to
+  - a binned density: one histogram of distance per recycling_effort
+    level, drawn as a band of colored cells, and
+  - a trend line fitted from sufficient statistics (n, sums, sums of
+    squares and cross-products), which gives the same line as np.polyfit
+    without keeping the points or bootstrapping a confidence band.
+"""
+
+import numpy as np
+
+LARGE_N_THRESHOLD = 50_000
+DENSITY_BINS = 60
+
+
+def is_large(n_rows, threshold=LARGE_N_THRESHOLD):
+    return n_rows > threshold
+
+
+def trend_moments(x, y):
+    """Sufficient statistics of a simple linear fit (NaN pairs dropped).
+
+    The result is a dict of sums, so moments from several chunks can be
+    combined with merge_moments.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    return {'n': int(len(x)), 'sx': float(x.sum()), 'sy': float(y.sum()),
+            'sxx': float(x @ x), 'sxy': float(x @ y), 'syy': float(y @ y),
+            'xmin': float(x.min()) if len(x) else np.nan,
+            'xmax': float(x.max()) if len(x) else np.nan}
+
+
+def merge_moments(a, b):
+    merged = {key: a[key] + b[key] for key in ('n', 'sx', 'sy', 'sxx', 'sxy', 'syy')}
+    merged['xmin'] = float(np.nanmin([a['xmin'], b['xmin']]))
+    merged['xmax'] = float(np.nanmax([a['xmax'], b['xmax']]))
+    return merged
+
+
+def trend_from_moments(m):
+    """Least-squares (slope, intercept) from trend_moments output."""
+    n = m['n']
+    sxx_c = m['sxx'] - m['sx'] ** 2 / n
+    sxy_c = m['sxy'] - m['sx'] * m['sy'] / n
+    slope = sxy_c / sxx_c
+    intercept = (m['sy'] - slope * m['sx']) / n
+    return slope, intercept
+
+
+def correlation_from_moments(m):
+    """Pearson correlation from trend_moments output."""
+    n = m['n']
+    sxx_c = m['sxx'] - m['sx'] ** 2 / n
+    syy_c = m['syy'] - m['sy'] ** 2 / n
+    sxy_c = m['sxy'] - m['sx'] * m['sy'] / n
+    return sxy_c / np.sqrt(sxx_c * syy_c)
+
+
+def binned_density(x, levels_y, levels, bins=DENSITY_BINS, x_range=None):
+    """Count respondents per (x bin, level).
+
+    Returns {'counts': array (len(levels), bins), 'x_edges': array (bins + 1),
+    'levels': list}.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    levels_y = np.asarray(levels_y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(levels_y))
+    x, levels_y = x[keep], levels_y[keep]
+    if x_range is None:
+        x_range = (x.min(), x.max())
+    # One y bin per level: [level - 0.5, level + 0.5)
+    y_edges = np.append(np.asarray(levels, dtype=np.float64) - 0.5, levels[-1] + 0.5)
+    counts, x_edges, _ = np.histogram2d(x, levels_y, bins=[bins, y_edges],
+                                        range=[x_range, (y_edges[0], y_edges[-1])])
+    return {'counts': counts.T.astype(np.int64), 'x_edges': x_edges, 'levels': list(levels)}
+
+
+def draw_density(ax, density, band=0.8, cmap='Blues'):
+    """Draw a binned_density result as one band of cells per level.
+
+    Returns the mesh (for a colorbar) or None when there is nothing to draw.
+    """
+    from matplotlib.colors import LogNorm
+
+    counts = np.ma.masked_equal(density['counts'], 0)
+    if counts.count() == 0:
+        return None
+    mesh = None
+    for row, level in enumerate(density['levels']):
+        y_edges = [level - band / 2, level + band / 2]
+        mesh = ax.pcolormesh(density['x_edges'], y_edges, counts[row:row + 1],
+                             cmap=cmap, norm=LogNorm(vmin=1, vmax=counts.max()))
+    return mesh
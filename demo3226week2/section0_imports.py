@@ -5,5 +5,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-print("Libraries imported successfully!")
-print(f"pandas version: {pd.__version__}")
+
+def main():
+    print("Libraries imported successfully!")
+    print(f"pandas version: {pd.__version__}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,96 +1,118 @@
 # Section 3 (Extended): District Distribution and Cross-Table Analysis
 # This script analyzes district distribution and food waste behavior by district
 
+import argparse
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load the dataset
-df = pd.read_csv('GCAP3226_week2.csv')
-
-# ============================================================
-# Step 1: Identify and count district columns
-# ============================================================
-# Find all columns containing "HongKongDistrict"
-district_cols = [col for col in df.columns if 'HongKongDistrict' in col]
-print(f"Number of district columns: {len(district_cols)}")
-print("District columns:", district_cols)
-
-# ============================================================
-# Step 2: Combine all district columns and count frequencies
-# ============================================================
-district_counts = {}
-for col in district_cols:
-    # Extract district name after the underscore
-    district_name = col.replace('HongKongDistrict_', '')
-    # Sum the values (number of participants for this district)
-    district_counts[district_name] = df[col].sum()
-
-# Convert to Series for easier plotting
-district_series = pd.Series(district_counts)
-print("\n" + "=" * 60)
-print("District Distribution of Respondents:")
-print("=" * 60)
-print(district_series.sort_values(ascending=False))
-
-# ============================================================
-# Step 3: Generate a bar chart sorted by frequency (descending)
-# ============================================================
-plt.figure(figsize=(12, 6))
-district_sorted = district_series.sort_values(ascending=True)  # ascending for horizontal bar
-plt.barh(district_sorted.index, district_sorted.values, color='steelblue', edgecolor='black')
-plt.xlabel('Number of Respondents', fontsize=12)
-plt.ylabel('District', fontsize=12)
-plt.title('Living District Distribution of Respondents', fontsize=14)
-plt.tight_layout()
-plt.savefig('plots/district_distribution.png', dpi=150)
-plt.show()
-
-# ============================================================
-# Cross Table: Food Waste Behavior by District
-# ============================================================
-print("\n" + "=" * 60)
-print("Cross Table: Food Waste Behavior by District")
-print("=" * 60)
-
-# Step 1: Create a DataFrame to hold district and food waste behavior
-cross_data = []
-for col in district_cols:
-    district_name = col.replace('HongKongDistrict_', '')
-    # Filter respondents living in this district
-    district_respondents = df[df[col] == 1]
-    if len(district_respondents) > 0:
-        # Count food waste behavior
-        behavior_counts = district_respondents['food_waste_behavior'].value_counts()
-        for behavior, count in behavior_counts.items():
-            cross_data.append({
-                'District': district_name,
-                'Behavior': behavior,
-                'Count': count,
-                'Percentage': count / len(district_respondents) * 100
-            })
-
-cross_df = pd.DataFrame(cross_data)
-
-# Step 2: Create a pivot table for better visualization
-pivot_table = cross_df.pivot_table(
-    index='District', 
-    columns='Behavior', 
-    values='Percentage', 
-    fill_value=0
-)
-print(pivot_table.round(1))
-
-# Step 3: Visualize the pivot table using a grouped bar chart
-plt.figure(figsize=(14, 8))
-pivot_table.plot(kind='bar', figsize=(14, 8), colormap='Set2', edgecolor='black')
-plt.xlabel('District', fontsize=12)
-plt.ylabel('Percentage of Respondents (%)', fontsize=12)
-plt.title('Food Waste Behavior by District', fontsize=14)
-plt.legend(title='Behavior', bbox_to_anchor=(1.02, 1), loc='upper left')
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.savefig('plots/food_waste_by_district.png', dpi=150)
-plt.show()
-
-print("\nDistrict analysis completed! Check the 'plots' folder for saved images.")
+
+from onehot_crosstab import crosstab_onehot
+from plotting import add_output_arguments, pyplot, savefig, show
+from survey_data import load_survey
+from survey_stream import DEFAULT_CHUNKSIZE, stream_aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Section 3: District Distribution and Cross-Table Analysis')
+    parser.add_argument('--input', default='GCAP3226_week2.csv',
+                        help='survey data: CSV, Parquet (.parquet) or Arrow IPC (.arrow/.feather)')
+    parser.add_argument('--stream', action='store_true',
+                        help='read the input in chunks instead of loading it into memory')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='rows per chunk in --stream mode')
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    # Columns this script reads
+    COLUMNS = ['HongKongDistrict_*', 'food_waste_behavior']
+
+    # Each mode produces the same results: the respondents per district, the
+    # food waste behavior counts per district, and the respondents left out of
+    # the cross table (no district or several districts)
+    CROSSTAB = ('HongKongDistrict_', 'food_waste_behavior')
+
+    if args.stream:
+        # One chunked pass gives the district totals and the cross-table counts
+        result = stream_aggregates(args.input, sum_prefixes=['HongKongDistrict_'],
+                                   crosstabs=[CROSSTAB], chunksize=args.chunksize)
+        district_counts = result.column_sums['HongKongDistrict_']
+        cross_counts = result.crosstabs[CROSSTAB]
+        unassigned = result.unassigned[CROSSTAB]
+    else:
+        # Load the dataset (only the district block and the cross-table column)
+        df = load_survey(args.input, columns=COLUMNS)
+        # Sum each district column (number of participants for this district)
+        district_counts = pd.Series({col.replace('HongKongDistrict_', ''): int(df[col].sum())
+                                     for col in df.columns if 'HongKongDistrict' in col})
+        # One bincount over (district code, behavior) pairs
+        cross = crosstab_onehot(df, *CROSSTAB)
+        cross_counts, unassigned = cross.counts, cross.unassigned
+
+    # ============================================================
+    # Step 1: Identify and count district columns
+    # ============================================================
+    district_cols = ['HongKongDistrict_' + name for name in district_counts.index]
+    print(f"Number of district columns: {len(district_cols)}")
+    print("District columns:", district_cols)
+
+    # ============================================================
+    # Step 2: Combine all district columns and count frequencies
+    # ============================================================
+    district_series = district_counts
+    print("\n" + "=" * 60)
+    print("District Distribution of Respondents:")
+    print("=" * 60)
+    print(district_series.sort_values(ascending=False))
+
+    # ============================================================
+    # Step 3: Generate a bar chart sorted by frequency (descending)
+    # ============================================================
+    if not args.stats:
+        plt = pyplot(args.batch)
+        plt.figure(figsize=(12, 6))
+        district_sorted = district_series.sort_values(ascending=True)  # ascending for horizontal bar
+        plt.barh(district_sorted.index, district_sorted.values, color='steelblue', edgecolor='black')
+        plt.xlabel('Number of Respondents', fontsize=12)
+        plt.ylabel('District', fontsize=12)
+        plt.title('Living District Distribution of Respondents', fontsize=14)
+        plt.tight_layout()
+        savefig(plt, 'plots/district_distribution.png', args.output_profile)
+        show(plt)
+
+    # ============================================================
+    # Cross Table: Food Waste Behavior by District
+    # ============================================================
+    print("\n" + "=" * 60)
+    print("Cross Table: Food Waste Behavior by District")
+    print("=" * 60)
+
+    if unassigned.sum() > 0:
+        print("Respondents left out of the cross table:")
+        print(unassigned)
+
+    # Percentage of each district's respondents showing each behavior
+    # (districts without respondents are left out)
+    district_totals = cross_counts.sum(axis=1)
+    pivot_table = cross_counts[district_totals > 0].sort_index()
+    pivot_table = pivot_table.div(district_totals[pivot_table.index], axis=0) * 100
+    pivot_table.index.name = 'District'
+    pivot_table.columns.name = 'Behavior'
+    print(pivot_table.round(1))
+
+    if not args.stats:
+        # Step 3: Visualize the pivot table using a grouped bar chart
+        plt.figure(figsize=(14, 8))
+        pivot_table.plot(kind='bar', figsize=(14, 8), colormap='Set2', edgecolor='black')
+        plt.xlabel('District', fontsize=12)
+        plt.ylabel('Percentage of Respondents (%)', fontsize=12)
+        plt.title('Food Waste Behavior by District', fontsize=14)
+        plt.legend(title='Behavior', bbox_to_anchor=(1.02, 1), loc='upper left')
+        plt.xticks(rotation=45, ha='right')
+        plt.tight_layout()
+        savefig(plt, 'plots/food_waste_by_district.png', args.output_profile)
+        show(plt)
+
+        print("\nDistrict analysis completed! Check the 'plots' folder for saved images.")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,64 +2,98 @@
 # This script creates summary statistics, box-whisker plots, and histograms
 # for the Distance_artificial variable
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load the dataset
-df = pd.read_csv('GCAP3226_week2.csv')
-
-# ============================================================
-# Summary Statistics for Distance_artificial
-# ============================================================
-print("=" * 60)
-print("Summary Statistics for Distance_artificial (meters):")
-print("=" * 60)
-
-# The five-number summary plus additional statistics
-stats = df['Distance_artificial'].describe()
-print(stats)
-
-print("\n" + "-" * 40)
-print("Five-Number Summary:")
-print(f"  Minimum:   {df['Distance_artificial'].min():.2f}")
-print(f"  Q1 (25%):  {df['Distance_artificial'].quantile(0.25):.2f}")
-print(f"  Median:    {df['Distance_artificial'].median():.2f}")
-print(f"  Q3 (75%):  {df['Distance_artificial'].quantile(0.75):.2f}")
-print(f"  Maximum:   {df['Distance_artificial'].max():.2f}")
-
-# ============================================================
-# Box-Whisker Plot and Histogram (1x2 layout)
-# ============================================================
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-
-# Box-whisker plot
-axes[0].boxplot(df['Distance_artificial'].dropna(), vert=True, patch_artist=True,
-                boxprops=dict(facecolor='lightblue', color='black'),
+import argparse
+
+from plotting import add_output_arguments, pyplot, savefig, show
+from stream_summary import DEFAULT_ERROR, summarize_csv_column, summarize_series
+from survey_data import load_survey
+from survey_stream import DEFAULT_CHUNKSIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Section 4: Analyze Continuous Data')
+    parser.add_argument('--input', default='GCAP3226_week2.csv',
+                        help='survey data: CSV, Parquet (.parquet) or Arrow IPC (.arrow/.feather)')
+    parser.add_argument('--stream', action='store_true',
+                        help='read the input in chunks instead of loading it into memory')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='rows per chunk in --stream mode')
+    parser.add_argument('--error', type=float, default=DEFAULT_ERROR,
+                        help='rank error allowed for quantiles on large inputs')
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    # Summarize Distance_artificial in a single pass: exact count/min/max/mean,
+    # sketched quantiles (exact for small data) and histogram counts
+    if args.stream:
+        summary = summarize_csv_column(args.input, 'Distance_artificial',
+                                       error=args.error, chunksize=args.chunksize)
+    else:
+        # Load the dataset
+        df = load_survey(args.input, columns=['Distance_artificial'])
+        summary = summarize_series(df['Distance_artificial'], error=args.error)
+
+    # ============================================================
+    # Summary Statistics for Distance_artificial
+    # ============================================================
+    print("=" * 60)
+    print("Summary Statistics for Distance_artificial (meters):")
+    print("=" * 60)
+
+    # The five-number summary plus additional statistics
+    stats = summary.describe()
+    print(stats)
+
+    five = summary.five_number()
+    print("\n" + "-" * 40)
+    print("Five-Number Summary:")
+    print(f"  Minimum:   {five['min']:.2f}")
+    print(f"  Q1 (25%):  {five['q1']:.2f}")
+    print(f"  Median:    {five['median']:.2f}")
+    print(f"  Q3 (75%):  {five['q3']:.2f}")
+    print(f"  Maximum:   {five['max']:.2f}")
+
+    if args.stats:
+        return
+
+    # ============================================================
+    # Box-Whisker Plot and Histogram (1x2 layout)
+    # ============================================================
+    plt = pyplot(args.batch)
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Box-whisker plot (from the summary's quartiles and whiskers)
+    axes[0].bxp([summary.boxplot_stats()], patch_artist=True,
+                boxprops=dict(facecolor='lightblue', edgecolor='black'),
                 medianprops=dict(color='red', linewidth=2),
                 whiskerprops=dict(color='black'),
                 capprops=dict(color='black'),
                 flierprops=dict(marker='o', markerfacecolor='gray', markersize=6))
-axes[0].set_ylabel('Distance to Nearest Recycling Facility (m)', fontsize=11)
-axes[0].set_title('Box-Whisker Plot of Distance_artificial', fontsize=12)
-axes[0].set_xticklabels(['Distance'])
-
-# Histogram
-axes[1].hist(df['Distance_artificial'].dropna(), bins=15, color='steelblue', 
-             edgecolor='black', alpha=0.7)
-axes[1].set_xlabel('Distance to Nearest Recycling Facility (m)', fontsize=11)
-axes[1].set_ylabel('Frequency', fontsize=11)
-axes[1].set_title('Histogram of Distance_artificial', fontsize=12)
-
-# Add mean and median lines to histogram
-mean_val = df['Distance_artificial'].mean()
-median_val = df['Distance_artificial'].median()
-axes[1].axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'Mean: {mean_val:.1f}m')
-axes[1].axvline(median_val, color='green', linestyle='-', linewidth=2, label=f'Median: {median_val:.1f}m')
-axes[1].legend()
-
-plt.tight_layout()
-plt.savefig('plots/distance_analysis.png', dpi=150)
-plt.show()
-
-print("\nContinuous data visualization completed! Check the 'plots' folder for saved images.")
+    axes[0].set_ylabel('Distance to Nearest Recycling Facility (m)', fontsize=11)
+    axes[0].set_title('Box-Whisker Plot of Distance_artificial', fontsize=12)
+    axes[0].set_xticklabels(['Distance'])
+
+    # Histogram (from the summary's 15 bin counts)
+    hist_counts, hist_edges = summary.histogram(15)
+    axes[1].hist(hist_edges[:-1], bins=hist_edges, weights=hist_counts, color='steelblue', 
+                 edgecolor='black', alpha=0.7)
+    axes[1].set_xlabel('Distance to Nearest Recycling Facility (m)', fontsize=11)
+    axes[1].set_ylabel('Frequency', fontsize=11)
+    axes[1].set_title('Histogram of Distance_artificial', fontsize=12)
+
+    # Add mean and median lines to histogram
+    mean_val = summary.mean
+    median_val = five['median']
+    axes[1].axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'Mean: {mean_val:.1f}m')
+    axes[1].axvline(median_val, color='green', linestyle='-', linewidth=2, label=f'Median: {median_val:.1f}m')
+    axes[1].legend()
+
+    plt.tight_layout()
+    savefig(plt, 'plots/distance_analysis.png', args.output_profile)
+    show(plt)
+
+    print("\nContinuous data visualization completed! Check the 'plots' folder for saved images.")
+
+
+if __name__ == '__main__':
+    main()
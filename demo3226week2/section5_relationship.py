@@ -1,68 +1,139 @@
 # Section 5: Explore Relationships Between Variables
 # This script creates a scatter plot with jitter to explore the relationship
 # between Distance_artificial and recycling_effort
+# With more than LARGE_N_THRESHOLD respondents the scatter plots switch to a
+# binned density with a trend line fitted from sufficient statistics
+# The correlation is reported with a bootstrap confidence interval and a
+# permutation p-value (see resampling.py)
+
+import argparse
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 
-# Load the dataset
-df = pd.read_csv('GCAP3226_week2.csv')
-
-# ============================================================
-# Scatter Plot with Jitter
-# ============================================================
-plt.figure(figsize=(10, 7))
-
-# Add jitter to recycling_effort for better visualization
-# (since recycling_effort is discrete: 1, 2, 3)
-np.random.seed(42)  # For reproducibility
-jitter = np.random.uniform(-0.2, 0.2, size=len(df))
-recycling_jittered = df['recycling_effort'] + jitter
-
-# Create scatter plot
-plt.scatter(df['Distance_artificial'], recycling_jittered, 
-            alpha=0.6, c='steelblue', edgecolor='white', s=60)
-
-# Add labels and title
-plt.xlabel('Distance to Nearest Recycling Facility (m)', fontsize=12)
-plt.ylabel('Recycling Effort Level', fontsize=12)
-plt.title('Relationship: Distance to Recycling Facility vs. Recycling Effort', fontsize=14)
-
-# Set y-axis ticks to show discrete levels
-plt.yticks([1, 2, 3], ['1\n(Low)', '2\n(Medium)', '3\n(High)'])
-
-# Add a trend line (optional)
-z = np.polyfit(df['Distance_artificial'].dropna(), df['recycling_effort'].dropna(), 1)
-p = np.poly1d(z)
-x_line = np.linspace(df['Distance_artificial'].min(), df['Distance_artificial'].max(), 100)
-plt.plot(x_line, p(x_line), 'r--', linewidth=2, label=f'Trend line')
-
-plt.legend()
-plt.tight_layout()
-plt.savefig('plots/distance_vs_recycling_scatter.png', dpi=150)
-plt.show()
-
-# ============================================================
-# Additional: Seaborn regression plot
-# ============================================================
-plt.figure(figsize=(10, 7))
-sns.regplot(x='Distance_artificial', y='recycling_effort', data=df,
-            scatter_kws={'alpha': 0.5, 's': 60},
-            line_kws={'color': 'red'},
-            x_jitter=0, y_jitter=0.2)
-plt.xlabel('Distance to Nearest Recycling Facility (m)', fontsize=12)
-plt.ylabel('Recycling Effort Level', fontsize=12)
-plt.title('Relationship: Distance to Recycling Facility vs. Recycling Effort\n(with Regression Line)', fontsize=14)
-plt.yticks([1, 2, 3], ['1 (Low)', '2 (Medium)', '3 (High)'])
-plt.tight_layout()
-plt.savefig('plots/distance_vs_recycling_regplot.png', dpi=150)
-plt.show()
-
-# Print correlation coefficient
-correlation = df['Distance_artificial'].corr(df['recycling_effort'])
-print(f"\nCorrelation coefficient (Pearson): {correlation:.4f}")
-print("Note: A weak correlation suggests little linear relationship between distance and recycling effort.")
-
-print("\nRelationship analysis completed! Check the 'plots' folder for saved images.")
+from plotting import add_output_arguments, pyplot, savefig, show
+from resampling import DEFAULT_RESAMPLES, bootstrap_ci, pearson_r, permutation_test
+from scatter_density import (binned_density, draw_density, is_large,
+                             trend_from_moments, trend_moments)
+from survey_data import load_survey
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Section 5: Explore Relationships Between Variables')
+    parser.add_argument('--input', default='GCAP3226_week2.csv',
+                        help='survey data: CSV, Parquet (.parquet) or Arrow IPC (.arrow/.feather)')
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES,
+                        help='bootstrap and permutation resamples for the correlation')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='worker processes for resampling')
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    # Load the dataset (only the two columns used below)
+    df = load_survey(args.input, columns=['Distance_artificial', 'recycling_effort'])
+
+    # Large inputs: no resampling below, and binned plots instead of points
+    large_n = is_large(len(df))
+
+    # Print correlation coefficient
+    correlation = df['Distance_artificial'].corr(df['recycling_effort'])
+    print(f"\nCorrelation coefficient (Pearson): {correlation:.4f}")
+
+    # Resampling inference: no normality assumption, unlike the usual t-test p-value
+    # (at large N the asymptotic results are accurate and resampling is costly)
+    if not large_n:
+        pairs = df[['Distance_artificial', 'recycling_effort']].dropna()
+        data = (pairs['Distance_artificial'].to_numpy(), pairs['recycling_effort'].to_numpy())
+        ci = bootstrap_ci(pearson_r, data, n_resamples=args.resamples, processes=args.processes)
+        test = permutation_test(pearson_r, data, n_resamples=args.resamples,
+                                processes=args.processes)
+        print(f"Bootstrap 95% CI ({args.resamples} resamples): [{ci.ci_low:.4f}, {ci.ci_high:.4f}]")
+        print(f"Permutation p-value ({args.resamples} permutations): {test.p_value:.6f}")
+    print("Note: A weak correlation suggests little linear relationship between distance and recycling effort.")
+
+    if args.stats:
+        return
+
+    plt = pyplot(args.batch)
+
+    # Too many points to draw one by one? Then bin them instead
+    if large_n:
+        levels = sorted(df['recycling_effort'].dropna().unique())
+        density = binned_density(df['Distance_artificial'], df['recycling_effort'], levels)
+        moments = trend_moments(df['Distance_artificial'], df['recycling_effort'])
+        print(f"{len(df)} respondents: drawing binned density instead of individual points")
+
+    # ============================================================
+    # Scatter Plot with Jitter
+    # ============================================================
+    plt.figure(figsize=(10, 7))
+
+    if large_n:
+        # Binned density: one band of cells per recycling_effort level
+        mesh = draw_density(plt.gca(), density)
+        if mesh is not None:
+            plt.colorbar(mesh, label='Number of Respondents')
+    else:
+        # Add jitter to recycling_effort for better visualization
+        # (since recycling_effort is discrete: 1, 2, 3)
+        np.random.seed(42)  # For reproducibility
+        jitter = np.random.uniform(-0.2, 0.2, size=len(df))
+        recycling_jittered = df['recycling_effort'] + jitter
+
+        # Create scatter plot
+        plt.scatter(df['Distance_artificial'], recycling_jittered, 
+                    alpha=0.6, c='steelblue', edgecolor='white', s=60)
+
+    # Add labels and title
+    plt.xlabel('Distance to Nearest Recycling Facility (m)', fontsize=12)
+    plt.ylabel('Recycling Effort Level', fontsize=12)
+    plt.title('Relationship: Distance to Recycling Facility vs. Recycling Effort', fontsize=14)
+
+    # Set y-axis ticks to show discrete levels
+    plt.yticks([1, 2, 3], ['1\n(Low)', '2\n(Medium)', '3\n(High)'])
+
+    # Add a trend line (optional)
+    if large_n:
+        # Same least-squares line as np.polyfit, from sums instead of points
+        p = np.poly1d(trend_from_moments(moments))
+    else:
+        z = np.polyfit(df['Distance_artificial'].dropna(), df['recycling_effort'].dropna(), 1)
+        p = np.poly1d(z)
+    x_line = np.linspace(df['Distance_artificial'].min(), df['Distance_artificial'].max(), 100)
+    plt.plot(x_line, p(x_line), 'r--', linewidth=2, label=f'Trend line')
+
+    plt.legend()
+    plt.tight_layout()
+    savefig(plt, 'plots/distance_vs_recycling_scatter.png', args.output_profile)
+    show(plt)
+
+    # ============================================================
+    # Additional: Seaborn regression plot
+    # ============================================================
+    plt.figure(figsize=(10, 7))
+    if large_n:
+        # regplot would redraw every point and bootstrap a confidence band;
+        # draw the density and the sufficient-statistics fit instead
+        mesh = draw_density(plt.gca(), density)
+        if mesh is not None:
+            plt.colorbar(mesh, label='Number of Respondents')
+        plt.plot(x_line, p(x_line), color='red', linewidth=2)
+    else:
+        # seaborn is slow to import, so only when this chart is drawn
+        import seaborn as sns
+        sns.regplot(x='Distance_artificial', y='recycling_effort', data=df,
+                    scatter_kws={'alpha': 0.5, 's': 60},
+                    line_kws={'color': 'red'},
+                    x_jitter=0, y_jitter=0.2)
+    plt.xlabel('Distance to Nearest Recycling Facility (m)', fontsize=12)
+    plt.ylabel('Recycling Effort Level', fontsize=12)
+    plt.title('Relationship: Distance to Recycling Facility vs. Recycling Effort\n(with Regression Line)', fontsize=14)
+    plt.yticks([1, 2, 3], ['1 (Low)', '2 (Medium)', '3 (High)'])
+    plt.tight_layout()
+    savefig(plt, 'plots/distance_vs_recycling_regplot.png', args.output_profile)
+    show(plt)
+
+    print("\nRelationship analysis completed! Check the 'plots' folder for saved images.")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,37 +4,54 @@
 
 import os
 
-# ============================================================
-# Check if 'plots' directory exists, create if not
-# ============================================================
-plots_dir = 'plots'
-
-if not os.path.exists(plots_dir):
-    os.makedirs(plots_dir)
-    print(f"Created directory: '{plots_dir}'")
-else:
-    print(f"Directory '{plots_dir}' already exists")
-
-# ============================================================
-# List all files in the plots directory
-# ============================================================
-print("\n" + "=" * 60)
-print("Files in the 'plots' directory:")
-print("=" * 60)
-
-if os.path.exists(plots_dir):
-    files = os.listdir(plots_dir)
-    if files:
-        for i, file in enumerate(files, 1):
-            file_path = os.path.join(plots_dir, file)
-            file_size = os.path.getsize(file_path) / 1024  # Size in KB
-            print(f"{i}. {file} ({file_size:.1f} KB)")
+from build_cache import load_manifest, output_entries
+from instrumentation import is_report_file
+
+
+def main():
+    # ============================================================
+    # Check if 'plots' directory exists, create if not
+    # ============================================================
+    plots_dir = 'plots'
+
+    if not os.path.exists(plots_dir):
+        os.makedirs(plots_dir)
+        print(f"Created directory: '{plots_dir}'")
     else:
-        print("No files found. Run the visualization scripts to generate plots.")
-else:
-    print(f"Directory '{plots_dir}' does not exist.")
-
-print("\n" + "=" * 60)
-print("To save plots, use plt.savefig() in your visualization code:")
-print("  Example: plt.savefig('plots/my_plot.png', dpi=150)")
-print("=" * 60)
+        print(f"Directory '{plots_dir}' already exists")
+
+    # ============================================================
+    # List all files in the plots directory
+    # ============================================================
+    print("\n" + "=" * 60)
+    print("Files in the 'plots' directory:")
+    print("=" * 60)
+
+    if os.path.exists(plots_dir):
+        # Skip hidden files such as the build manifest written by run_all_sections.py,
+        # and its timing report
+        files = [file for file in os.listdir(plots_dir)
+                 if not file.startswith('.') and not is_report_file(file)]
+        # The manifest records whether each chart was rebuilt or reused last run,
+        # and how long each of its files took to encode
+        entries = output_entries(load_manifest(plots_dir))
+        if files:
+            for i, file in enumerate(files, 1):
+                file_path = os.path.join(plots_dir, file)
+                file_size = os.path.getsize(file_path) / 1024  # Size in KB
+                status, encode_seconds = entries.get(file, ('not tracked', None))
+                encode = '' if encode_seconds is None else f", encoded in {encode_seconds:.3f} s"
+                print(f"{i}. {file} ({file_size:.1f} KB{encode}, {status})")
+        else:
+            print("No files found. Run the visualization scripts to generate plots.")
+    else:
+        print(f"Directory '{plots_dir}' does not exist.")
+
+    print("\n" + "=" * 60)
+    print("To save plots, use plt.savefig() in your visualization code:")
+    print("  Example: plt.savefig('plots/my_plot.png', dpi=150)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
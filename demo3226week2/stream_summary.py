@@ -0,0 +1,302 @@
+"""
+Streaming Column Summary - MSW Charging Scheme Data Visualization
+=================================================================
+One-pass, bounded-memory summary of a numeric column such as
+Distance_artificial, built chunk by chunk:
+
+  - exact count, min, max, mean and standard deviation,
+  - quantiles (Q1, median, Q3, ...) from a mergeable KLL sketch with a
+    configurable rank error,
+  - fixed-bin histogram counts.
+
+Missing values are skipped, as pandas does. So are +-inf values, which
+would break the moments and the histogram; they are counted in
+`infinite` instead.
+
+While the sketch has not had to compact anything (small inputs) the
+quantiles are exact and match pandas' quantile(). The box plot and
+histogram in section 4 are drawn from the summary, not the raw column.
+
+Usage:
+    from stream_summary import summarize_series, summarize_csv_column
+    summary = summarize_series(df['Distance_artificial'])
+    summary = summarize_csv_column('GCAP3226_week2.csv', 'Distance_artificial')
+    summary.five_number()       # {'min': ..., 'q1': ..., 'median': ..., ...}
+    summary.histogram(15)       # (counts, edges)
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ERROR = 0.005
+DEFAULT_CHUNKSIZE = 100_000
+
+# Internal histogram resolution; requested bins are built from these
+FINE_BINS = 960
+
+
+class KLLSketch:
+    """Mergeable quantile sketch (Karnin, Lang & Liberty 2016).
+
+    Level h holds items of weight 2**h. When a level is over capacity it
+    is sorted and every other item (random offset) is promoted to the
+    next level, which keeps the rank error around `error` with
+    O(1/error) items in memory.
+    """
+
+    def __init__(self, error=DEFAULT_ERROR, seed=0):
+        self.k = max(8, math.ceil(1.7 / error))
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+        self.n = 0
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                offset = int(self.rng.integers(2))
+                # An odd item out stays behind so no weight is lost
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1],
+                                                         pairs[offset::2]])
+                self.levels[level] = keep
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    @property
+    def exact(self):
+        """True while every item seen is still stored (no compaction yet)."""
+        return all(len(items) == 0 for items in self.levels[1:])
+
+    def items(self):
+        """Stored items and their weights, sorted by value."""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantile(self, q):
+        """Quantile(s) q in [0, 1]; exact (linear interpolation) when exact."""
+        if self.n == 0:
+            return np.nan
+        if self.exact:
+            return np.quantile(self.levels[0], q)
+        values, weights = self.items()
+        # Midpoint ranks of each stored item, scaled to [0, 1]
+        ranks = (np.cumsum(weights) - weights / 2) / weights.sum()
+        return np.interp(q, ranks, values)
+
+
+class ColumnSummary:
+    """Count, min, max, mean, std, quantile sketch and histogram of a column."""
+
+    def __init__(self, error=DEFAULT_ERROR, hist_range=None, seed=0, name=None):
+        self.name = name
+        self.count = 0
+        # +-inf values are left out of every statistic and only counted
+        self.infinite = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.sketch = KLLSketch(error, seed)
+        # Fine histogram over [lo, hi]; it doubles its width when values
+        # fall outside, unless a fixed hist_range was given
+        self._fixed_range = hist_range is not None
+        self._lo, self._hi = hist_range if hist_range is not None else (None, None)
+        self._fine = np.zeros(FINE_BINS, dtype=np.int64)
+        self._rebinned = False
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        self.infinite += int(np.isinf(values).sum())
+        values = values[finite]
+        n = len(values)
+        if n == 0:
+            return
+        # Exact moments, merged with Chan et al.'s parallel formula
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self._m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        self.sketch.update(values)
+        self._update_histogram(values)
+
+    def _update_histogram(self, values):
+        if self._lo is None:
+            self._lo, self._hi = values.min(), values.max()
+            if self._lo == self._hi:
+                self._hi = self._lo + 1.0
+        elif not self._fixed_range:
+            while values.min() < self._lo or values.max() > self._hi:
+                self._widen(grow_down=values.min() < self._lo)
+        counts, _ = np.histogram(values, bins=FINE_BINS, range=(self._lo, self._hi))
+        self._fine += counts
+
+    def _widen(self, grow_down):
+        """Double the histogram range by merging neighbouring fine bins."""
+        width = self._hi - self._lo
+        merged = self._fine.reshape(-1, 2).sum(axis=1)
+        self._fine = np.zeros(FINE_BINS, dtype=np.int64)
+        if grow_down:
+            self._fine[FINE_BINS // 2:] = merged
+            self._lo -= width
+        else:
+            self._fine[:FINE_BINS // 2] = merged
+            self._hi += width
+        self._rebinned = True
+
+    def merge(self, other):
+        """Combine with a summary of another chunk/file (same hist_range)."""
+        self.infinite += other.infinite
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update({key: value for key, value in other.__dict__.items()
+                                  if key not in ('sketch', 'infinite')})
+            self._fine = other._fine.copy()
+            self.sketch.merge(other.sketch)
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta ** 2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+        while not self._fixed_range and (other._lo < self._lo or other._hi > self._hi):
+            self._widen(grow_down=other._lo < self._lo)
+        if (other._lo, other._hi) == (self._lo, self._hi):
+            self._fine += other._fine
+        else:
+            # Spread the other histogram's fine bins onto ours
+            other_edges = np.linspace(other._lo, other._hi, FINE_BINS + 1)
+            self._fine += _rebin(other._fine, other_edges, self._fine_edges())
+            self._rebinned = True
+        self._rebinned = self._rebinned or other._rebinned
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def five_number(self):
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        return {'min': self.min, 'q1': q1, 'median': median, 'q3': q3, 'max': self.max}
+
+    def describe(self):
+        """Same layout as pandas Series.describe()."""
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        return pd.Series([self.count, self.mean, self.std, self.min, q1, median, q3, self.max],
+                         index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                         name=self.name)
+
+    def _fine_edges(self):
+        return np.linspace(self._lo, self._hi, FINE_BINS + 1)
+
+    def histogram(self, bins=15):
+        """Histogram counts and edges with `bins` equal bins over [min, max].
+
+        Exact while the sketch still holds every value, or when the bins
+        line up with the fine internal bins; otherwise counts are spread
+        from the fine bins.
+        """
+        if self._fixed_range:
+            lo, hi = self._lo, self._hi
+        else:
+            lo, hi = self.min, self.max
+        if self.sketch.exact:
+            return np.histogram(self.sketch.levels[0], bins=bins, range=(lo, hi))
+        edges = np.linspace(lo, hi, bins + 1)
+        if not self._rebinned and FINE_BINS % bins == 0 and (lo, hi) == (self._lo, self._hi):
+            return self._fine.reshape(bins, -1).sum(axis=1), edges
+        return _rebin(self._fine, self._fine_edges(), edges), edges
+
+    def boxplot_stats(self, whis=1.5):
+        """Statistics for matplotlib's Axes.bxp (same rules as boxplot)."""
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        low, high = q1 - whis * iqr, q3 + whis * iqr
+        values, _ = self.sketch.items()
+        inside = values[(values >= low) & (values <= high)]
+        whislo = inside.min() if len(inside) else q1
+        whishi = inside.max() if len(inside) else q3
+        if self.min >= low:
+            whislo = self.min
+        if self.max <= high:
+            whishi = self.max
+        fliers = values[(values < whislo) | (values > whishi)]
+        return {'med': median, 'q1': q1, 'q3': q3, 'whislo': whislo, 'whishi': whishi,
+                'fliers': fliers, 'mean': self.mean}
+
+
+def _rebin(counts, edges, new_edges):
+    """Spread histogram counts onto new bin edges, assuming a uniform
+    distribution inside each original bin.
+
+    All counts are assumed to lie within new_edges (they are the data's
+    min and max, or a wider range), so the total is preserved exactly.
+    """
+    cumulative = np.concatenate([[0], np.cumsum(counts)])
+    at_edges = np.round(np.interp(new_edges, edges, cumulative))
+    at_edges[0], at_edges[-1] = 0, cumulative[-1]
+    return np.diff(at_edges).astype(np.int64)
+
+
+def summarize_series(values, error=DEFAULT_ERROR, hist_range=None,
+                     chunksize=DEFAULT_CHUNKSIZE):
+    """Summarize an in-memory column in one pass, `chunksize` values at a time."""
+    summary = ColumnSummary(error, hist_range, name=getattr(values, 'name', None))
+    values = np.asarray(values, dtype=np.float64)
+    for start in range(0, len(values), chunksize):
+        summary.update(values[start:start + chunksize])
+    return summary
+
+
+def summarize_csv_column(csv_path, column, error=DEFAULT_ERROR, hist_range=None,
+                         chunksize=DEFAULT_CHUNKSIZE):
+    """Summarize one column of the survey CSV, reading it in chunks."""
+    from survey_stream import iter_survey_chunks
+
+    summary = ColumnSummary(error, hist_range, name=column)
+    for chunk in iter_survey_chunks(csv_path, [column], chunksize):
+        summary.update(chunk[column].to_numpy())
+    return summary
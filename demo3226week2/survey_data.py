@@ -0,0 +1,313 @@
+"""
+Survey Data Loader - MSW Charging Scheme Data Visualization
+===========================================================
+Shared loading layer for the section scripts.
+
+The survey can be read from CSV, Parquet (.parquet/.pq) or Arrow IPC /
+Feather (.arrow/.ipc/.feather). Each script declares the columns it
+needs, and only those columns are read from a columnar input; 'prefix*'
+selects a whole one-hot block.
+
+A CSV is parsed once with an explicit dtype schema and converted to an
+uncompressed Arrow IPC sidecar next to it. The sidecar is keyed on the
+CSV's path, size and modification time, so it is rebuilt automatically
+whenever the CSV changes. Later loads memory-map the sidecar, so only
+the pages of the requested columns are read from disk. Within one Python
+process the frames are also kept in memory, so run_all_sections.py
+parses at most once.
+
+Usage:
+    from survey_data import load_survey
+    df = load_survey('GCAP3226_week2.csv')
+    df = load_survey('GCAP3226_week2.csv', columns=['Distance_artificial', 'recycling_effort'])
+    df = load_survey('survey_waves.parquet', columns=['HongKongDistrict_*'])
+"""
+
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+# Bump this whenever the schema below changes so old sidecars are ignored
+# (2: sidecars are uncompressed Arrow IPC so they can be memory-mapped;
+# 3: Distance_artificial stays float64, blank integer answers are NaN)
+SCHEMA_VERSION = 3
+
+# Likert items (1-5) and other small integer codes
+LIKERT_COLUMNS = ['support_level', 'support_after_info', 'fairness',
+                  'government_consideration', 'policy_helpfulness',
+                  'waste_severity', 'recycling_effort']
+INT8_COLUMNS = LIKERT_COLUMNS + ['LocalResidentcode']
+
+# One-hot blocks are stored as 0/1 uint8 so they can be summed and
+# multiplied as matrices without conversion
+ONEHOT_PREFIXES = ['HongKongDistrict_']
+
+CATEGORY_COLUMNS = ['food_waste_behavior']
+# Only 0/1 flags are narrowed to float32, which holds them exactly.
+# Measurements such as Distance_artificial stay float64: a float32 value
+# widened again is not the CSV's decimal (140.07 -> 140.070007), and that
+# noise would reach every printed, saved and served statistic.
+FLOAT32_COLUMNS = []
+FLOAT32_PREFIXES = ['HousingType_']
+
+CACHE_DIR = '.survey_cache'
+
+# Input formats by file extension; anything else is read as CSV
+INPUT_FORMATS = {'.parquet': 'parquet', '.pq': 'parquet',
+                 '.arrow': 'arrow', '.ipc': 'arrow', '.feather': 'arrow'}
+
+# In-process cache: {(cache key, columns or None): DataFrame}
+_frames = {}
+
+
+def survey_dtypes(columns):
+    """Return the dtype mapping for the given CSV header.
+
+    Integer codes are parsed as nullable Int8/UInt8, so a blank answer
+    does not fail the parse; settle_integers() then narrows them.
+    """
+    dtypes = {}
+    for col in columns:
+        if col in INT8_COLUMNS:
+            dtypes[col] = 'Int8'
+        elif any(col.startswith(prefix) for prefix in ONEHOT_PREFIXES):
+            dtypes[col] = 'UInt8'
+        elif col in CATEGORY_COLUMNS:
+            dtypes[col] = 'category'
+        elif col in FLOAT32_COLUMNS or any(col.startswith(prefix) for prefix in FLOAT32_PREFIXES):
+            dtypes[col] = 'float32'
+    return dtypes
+
+
+def settle_integers(df):
+    """Nullable integer columns as plain int8/uint8, or as float64 with NaN
+    (what pd.read_csv gives by default) when a column has blank answers."""
+    dtypes = {col: 'float64' if df[col].hasnans else df[col].dtype.numpy_dtype
+              for col in df.columns
+              if isinstance(df[col].dtype, pd.api.extensions.ExtensionDtype)
+              and df[col].dtype.kind in 'iu'}
+    return df.astype(dtypes) if dtypes else df
+
+
+def select_columns(header, columns):
+    """Columns of `header` named in `columns`, expanding 'prefix*' entries.
+
+    columns=None selects every column. The result follows the order of
+    `columns` (a block keeps its file order) without duplicates.
+    """
+    if columns is None:
+        return list(header)
+    selected = []
+    for col in columns:
+        if col.endswith('*'):
+            matches = [c for c in header if c.startswith(col[:-1])]
+            if not matches:
+                raise KeyError(f"No columns start with {col[:-1]!r}")
+            selected += matches
+        elif col in header:
+            selected.append(col)
+        else:
+            raise KeyError(f"Column {col!r} is not in the survey data")
+    return list(dict.fromkeys(selected))
+
+
+def input_format(path):
+    """'csv', 'parquet' or 'arrow', from the file extension."""
+    return INPUT_FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def survey_columns(path):
+    """Column names of a survey file, without reading its data."""
+    fmt = input_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    if fmt == 'arrow':
+        return list(open_arrow(path).schema.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_survey_csv(csv_path, **kwargs):
+    """Parse the survey CSV with the explicit dtype schema (no caching).
+
+    With `chunksize`, pass each chunk through settle_integers().
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    df = pd.read_csv(csv_path, dtype=survey_dtypes(header), **kwargs)
+    return df if 'chunksize' in kwargs else settle_integers(df)
+
+
+def open_arrow(path):
+    """Open an Arrow IPC file through a memory map (nothing is read yet)."""
+    import pyarrow as pa
+    return pa.ipc.open_file(pa.memory_map(path, 'r'))
+
+
+def apply_schema(df):
+    """Cast columns of a Parquet/Arrow input written by other tools to the
+    survey schema (a no-op for files written by this module)."""
+    dtypes = {}
+    for col, dtype in survey_dtypes(df.columns).items():
+        current = str(df[col].dtype)
+        # int8/uint8, or float64 for a column with blank answers, is settled
+        if current == dtype.lower() or dtype in ('Int8', 'UInt8') and current == 'float64':
+            continue
+        dtypes[col] = dtype
+    return settle_integers(df.astype(dtypes)) if dtypes else df
+
+
+def read_arrow(path, columns=None):
+    """Read `columns` of an Arrow IPC file through a memory map.
+
+    Only the buffers of the selected columns are touched; the numeric
+    ones are converted to pandas without an extra consolidation copy.
+    """
+    table = open_arrow(path).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return apply_schema(table.to_pandas(split_blocks=True))
+
+
+def read_parquet(path, columns=None):
+    """Read `columns` of a Parquet file (other column chunks are skipped)."""
+    return apply_schema(pd.read_parquet(path, columns=columns))
+
+
+def write_survey(df, path):
+    """Write a typed survey frame as Parquet or Arrow IPC (by extension).
+
+    Arrow IPC is written uncompressed so it can be memory-mapped.
+    """
+    fmt = input_format(path)
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'arrow':
+        df.to_feather(path, compression='uncompressed')
+    else:
+        raise ValueError(f"Unsupported output format: {path!r}")
+
+
+def convert_survey(csv_path, out_path):
+    """Convert the survey CSV to Parquet or Arrow IPC with the typed schema."""
+    write_survey(read_survey_csv(csv_path), out_path)
+
+
+def cache_key(csv_path):
+    """Key identifying one version of the CSV (path, size, mtime, schema)."""
+    stat = os.stat(csv_path)
+    raw = f"{os.path.abspath(csv_path)}|{stat.st_size}|{stat.st_mtime_ns}|{SCHEMA_VERSION}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _have_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def sidecar_path(csv_path, key=None):
+    """Path of the binary sidecar for the current version of the CSV."""
+    if key is None:
+        key = cache_key(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    # Feather needs pyarrow; fall back to pickle when it is not installed
+    ext = '.feather' if _have_pyarrow() else '.pkl'
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR)
+    return os.path.join(cache_dir, f"{stem}-{key}{ext}")
+
+
+def _remove_stale_sidecars(path):
+    cache_dir = os.path.dirname(path)
+    stem = os.path.basename(path).rsplit('-', 1)[0]
+    for name in os.listdir(cache_dir):
+        old = os.path.join(cache_dir, name)
+        if name.startswith(stem + '-') and old != path:
+            os.remove(old)
+
+
+def _write_sidecar(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    if path.endswith('.feather'):
+        df.to_feather(tmp_path, compression='uncompressed')
+    else:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # Rename so a crashed run never leaves a half-written sidecar behind
+    os.replace(tmp_path, path)
+    _remove_stale_sidecars(path)
+
+
+def _read_sidecar(path, columns=None):
+    if path.endswith('.feather'):
+        return read_arrow(path, columns)
+    with open(path, 'rb') as f:
+        df = pickle.load(f)
+    return df if columns is None else df[columns]
+
+
+def _read_input(path, columns):
+    fmt = input_format(path)
+    if fmt == 'parquet':
+        return read_parquet(path, columns)
+    if fmt == 'arrow':
+        return read_arrow(path, columns)
+    return read_survey_csv(path, usecols=columns)
+
+
+def load_survey(path='GCAP3226_week2.csv', columns=None, use_cache=True):
+    """Load the survey as a typed DataFrame with only the given columns.
+
+    `columns` lists the column names the caller needs ('prefix*' for a
+    one-hot block); None loads every column. A CSV is parsed at most once
+    and then read from its memory-mapped Arrow sidecar.
+
+    The returned frame is shared between callers in the same process, so
+    take a copy before adding or modifying columns.
+    """
+    if columns is not None:
+        columns = select_columns(survey_columns(path), columns)
+    if not use_cache:
+        return _read_input(path, columns)
+
+    key = cache_key(path)
+    wanted = None if columns is None else tuple(columns)
+    if (key, wanted) in _frames:
+        return _frames[key, wanted]
+    if (key, None) in _frames:
+        # Everything is in memory already; just project
+        df = _frames[key, None]
+        df = df if columns is None else df[columns]
+        _frames[key, wanted] = df
+        return df
+
+    if input_format(path) != 'csv':
+        # Columnar inputs are read directly; no sidecar needed
+        df = _read_input(path, columns)
+    else:
+        sidecar = sidecar_path(path, key)
+        if os.path.exists(sidecar):
+            df = _read_sidecar(sidecar, columns)
+        else:
+            # Convert the whole CSV once, then keep only what was asked for
+            df = read_survey_csv(path)
+            try:
+                _write_sidecar(df, sidecar)
+            except OSError as exc:
+                # A read-only data directory should not stop the analysis
+                print(f"Warning: could not write cache '{sidecar}': {exc}")
+            _frames[key, None] = df
+            if columns is not None:
+                df = df[columns]
+
+    _frames[key, wanted] = df
+    return df
+
+
+def clear_memory_cache():
+    """Forget the frames load_survey keeps in memory (sidecars stay on disk)."""
+    _frames.clear()
@@ -0,0 +1,127 @@
+"""
+Streaming Aggregation - MSW Charging Scheme Data Visualization
+==============================================================
+Computes the section 3 frequency tables and district counts by reading the
+survey in fixed-size chunks and merging the partial results, so memory use
+stays flat no matter how large the input file is. CSV, Parquet and Arrow
+IPC inputs are supported (see survey_data.py); only the needed columns
+are read.
+
+Usage:
+    from survey_stream import stream_aggregates
+    result = stream_aggregates(
+        'GCAP3226_week2.csv',
+        count_columns=['support_level', 'support_after_info'],
+        sum_prefixes=['HongKongDistrict_'],
+        crosstabs=[('HongKongDistrict_', 'food_waste_behavior')])
+    result.value_counts['support_level']
+    result.column_sums['HongKongDistrict_']
+    result.crosstabs[('HongKongDistrict_', 'food_waste_behavior')]
+    result.unassigned[('HongKongDistrict_', 'food_waste_behavior')]
+"""
+
+from collections import namedtuple
+
+import pandas as pd
+
+from onehot_crosstab import crosstab_onehot
+from survey_data import (apply_schema, input_format, open_arrow, read_survey_csv,
+                         settle_integers, survey_columns)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+StreamResult = namedtuple('StreamResult', ['value_counts', 'column_sums', 'crosstabs',
+                                           'unassigned'])
+
+
+def iter_survey_chunks(path, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield typed DataFrame chunks of the survey (only `columns` if given)."""
+    fmt = input_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize,
+                                                        columns=columns):
+            yield apply_schema(batch.to_pandas())
+    elif fmt == 'arrow':
+        # Record batches of a memory-mapped file; re-sliced to `chunksize`
+        table = open_arrow(path).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        for start in range(0, table.num_rows, chunksize):
+            yield apply_schema(table.slice(start, chunksize).to_pandas(split_blocks=True))
+    else:
+        reader = read_survey_csv(path, usecols=columns, chunksize=chunksize)
+        with reader:
+            for chunk in reader:
+                yield settle_integers(chunk)
+
+
+def merge_counts(total, partial):
+    """Add one partial count Series/DataFrame into a running total."""
+    if total is None:
+        return partial.astype('int64')
+    return total.add(partial, fill_value=0).astype('int64')
+
+
+def stream_aggregates(csv_path, count_columns=(), sum_prefixes=(), crosstabs=(),
+                      chunksize=DEFAULT_CHUNKSIZE, multiple='drop'):
+    """Compute value counts, one-hot sums and cross tables in one chunked pass.
+
+    Returns a StreamResult with:
+      value_counts: {column: Series of counts indexed by value, sorted}
+      column_sums:  {prefix: Series of column totals indexed by the column
+                     name with the prefix removed, in file order}
+      crosstabs:    {(prefix, column): DataFrame of counts, one row per
+                     one-hot column (prefix removed), one column per value;
+                     `multiple` is passed to onehot_crosstab.crosstab_onehot}
+      unassigned:   {(prefix, column): Series with the number of respondents
+                     with no flag and with multiple flags, as
+                     crosstab_onehot reports them}
+    """
+    header = survey_columns(csv_path)
+    prefixes = list(sum_prefixes) + [prefix for prefix, _ in crosstabs]
+    prefix_columns = {prefix: [col for col in header if col.startswith(prefix)]
+                      for prefix in prefixes}
+    columns = list(count_columns) + [column for _, column in crosstabs]
+    for cols in prefix_columns.values():
+        columns += cols
+    columns = list(dict.fromkeys(columns))
+
+    counts = {col: None for col in count_columns}
+    sums = {prefix: None for prefix in sum_prefixes}
+    tables = {key: None for key in crosstabs}
+    unassigned = {key: pd.Series({'no flag': 0, 'multiple flags': 0}) for key in crosstabs}
+
+    for chunk in iter_survey_chunks(csv_path, columns, chunksize):
+        for col in count_columns:
+            counts[col] = merge_counts(counts[col], chunk[col].value_counts())
+        for prefix in sum_prefixes:
+            partial = chunk[prefix_columns[prefix]].sum().astype('int64')
+            sums[prefix] = partial if sums[prefix] is None else sums[prefix] + partial
+        for prefix, column in crosstabs:
+            partial = crosstab_onehot(chunk, prefix, column, multiple)
+            tables[(prefix, column)] = merge_counts(tables[(prefix, column)], partial.counts)
+            unassigned[(prefix, column)] += partial.unassigned
+
+    value_counts = {}
+    for col, total in counts.items():
+        if total is None:
+            total = pd.Series(dtype='int64')
+        value_counts[col] = total.sort_index()
+
+    column_sums = {}
+    for prefix, total in sums.items():
+        if total is None:
+            total = pd.Series(0, index=prefix_columns[prefix], dtype='int64')
+        total.index = [col.replace(prefix, '', 1) for col in total.index]
+        column_sums[prefix] = total
+
+    cross_tables = {}
+    for (prefix, column), total in tables.items():
+        names = [col.replace(prefix, '', 1) for col in prefix_columns[prefix]]
+        if total is None:
+            total = pd.DataFrame(index=names, dtype='int64')
+        total = total.reindex(names, fill_value=0)
+        cross_tables[(prefix, column)] = total.sort_index(axis=1)
+
+    return StreamResult(value_counts, column_sums, cross_tables, unassigned)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Update Aggregates - MSW Charging Scheme Data Visualization
+==========================================================
+Adds new survey responses to the aggregate store (see aggregate_store.py)
+and regenerates the tables and charts from the store alone, so a daily
+batch of responses is processed without re-reading the earlier ones.
+
+Files already in the store are skipped, so re-running the same command
+is safe. The store and its charts are kept in an 'aggregates' folder
+next to this script unless --store / --plots-dir say otherwise.
+
+Charts drawn from the store: the support level bar, pie and comparison
+charts, the district distribution and the distance box plot/histogram.
+The distance vs recycling scatter plot needs the individual responses;
+use run_all_sections.py for it.
+
+Usage:
+    python update_aggregates.py GCAP3226_week2.csv            # first run: creates the store
+    python update_aggregates.py responses_2026-10-18.csv      # add a daily batch
+    python update_aggregates.py 'responses/*.csv' --stats     # tables only
+    python update_aggregates.py --rebuild GCAP3226_week2.csv 'responses/*.csv'
+"""
+
+import argparse
+import os
+import time
+
+from aggregate_store import AggregateStore
+from charts import LIKERT_LABELS, SUMMARY_JOBS, shared_from_store
+from figure_jobs import render_jobs, with_profile
+from output_profiles import DEFAULT_PROFILE, PROFILES
+from run_batch import expand_inputs
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def update_store(store_path, paths, rebuild=False):
+    """Append `paths` to the store at `store_path` (created if missing).
+
+    Returns (store, appended paths, skipped paths).
+    """
+    if rebuild or not os.path.exists(store_path):
+        store = AggregateStore()
+    else:
+        store = AggregateStore.load(store_path)
+    appended, skipped = [], []
+    for path in paths:
+        (appended if store.append_file(path) else skipped).append(path)
+    # An empty store is never written, so it cannot replace a filled one
+    if (appended or rebuild) and store.batches:
+        store.save(store_path)
+    return store, appended, skipped
+
+
+def print_tables(store):
+    if not store.batches:
+        print("\nThe store is empty: no survey files have been appended yet.")
+        return
+
+    print("\nFrequency Table - support_level:")
+    for level, count in store.frequency_table('support_level').items():
+        print(f"  {level} ({LIKERT_LABELS[level]}): {count}")
+
+    print("\nDistrict Distribution of Respondents:")
+    print(store.district_counts.sort_values(ascending=False).to_string())
+
+    print("\nFood Waste Behavior by District (row percentages):")
+    print(store.crosstab_percentages().round(1).to_string())
+
+    five = store.five_number()
+    print("\nFive-Number Summary - Distance_artificial:")
+    for stat, value in five.items():
+        print(f"  {stat}: {value:.2f}")
+
+    slope, intercept = store.trend_line()
+    print(f"\nCorrelation (distance vs recycling effort): {store.correlation():.4f}")
+    print(f"Trend line: recycling_effort = {slope:.5f} * distance + {intercept:.3f}")
+
+
+def render_charts(store, plots_dir, profile=DEFAULT_PROFILE):
+    """Draw the SUMMARY_JOBS charts from the store; returns JobResults
+    (none when the store is empty)."""
+    if not store.batches:
+        print("\nThe store is empty: no charts to draw.")
+        return []
+    os.makedirs(plots_dir, exist_ok=True)
+    jobs = [with_profile(job, profile) for job in SUMMARY_JOBS]
+    paths = {job.name: os.path.join(plots_dir, job.filename) for job in jobs}
+    # No DataFrame: every prepare step reads the summaries in `shared`
+    return render_jobs(jobs, None, paths, processes=1, shared=shared_from_store(store))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add survey responses to the aggregate store')
+    parser.add_argument('inputs', nargs='*',
+                        help="new survey files or glob patterns (quote them, e.g. 'responses/*.csv')")
+    parser.add_argument('--store',
+                        default=os.path.relpath(os.path.join(HERE, 'aggregates', 'survey_store.pkl')),
+                        help="aggregate store file (default: 'aggregates/survey_store.pkl' next to this script)")
+    parser.add_argument('--plots-dir', default=os.path.relpath(os.path.join(HERE, 'aggregates', 'plots')),
+                        help="where to save the charts (default: 'aggregates/plots' next to this script)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help='start a new store from the given inputs')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the tables only (no charts, no matplotlib)')
+    parser.add_argument('--output-profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help='chart formats and quality (default: %(default)s PNG)')
+    args = parser.parse_args()
+
+    paths = expand_inputs(args.inputs)
+    if args.rebuild and not paths:
+        parser.error("--rebuild needs the survey files to rebuild the store from")
+    if not paths and not os.path.exists(args.store):
+        parser.error(f"no inputs given and no store at {args.store}")
+
+    start = time.perf_counter()
+    store, appended, skipped = update_store(args.store, paths, args.rebuild)
+    update_seconds = time.perf_counter() - start
+    for path in appended:
+        print(f"Appended: {path}")
+    for path in skipped:
+        print(f"Skipped (already in the store): {path}")
+    print(f"Store: {store.rows} responses from {len(store.batches)} file(s) "
+          f"(updated in {update_seconds * 1000:.1f} ms)")
+
+    print_tables(store)
+
+    if not args.stats:
+        start = time.perf_counter()
+        results = render_charts(store, args.plots_dir, args.output_profile)
+        if results:
+            print()
+            for result in results:
+                print(f"Saved: {result.path}")
+            print(f"Charts rendered in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Put the week 2 and week 3 modules on sys.path, as their scripts expect."""
+
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEEK2_DIR = os.path.join(ROOT, 'demo3226week2')
+WEEK3_DIR = os.path.join(ROOT, 'GCAP3226_week3')
+
+for path in (WEEK2_DIR, WEEK3_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+WEEK3_CSV = os.path.join(WEEK3_DIR, 'GCAP3226_week3.csv')
+
+# Survey columns the week 3 notebook centers (as <column>_c)
+CENTERED_COLUMNS = ['fairness', 'government_consideration', 'policy_helpfulness',
+                    'waste_severity', 'recycling_effort', 'recycle_frequency', 'household_size',
+                    'total_score']
+
+# The notebook's forward-selection candidates that need no recoding
+WEEK3_FEATURES = [f'{col}_c' for col in CENTERED_COLUMNS] + [
+    'LocalResidentcode', 'DailyWasteBags_More than 1 bag', 'DailyWasteBags_Exactly 1 bag',
+    'HousingType_Other', 'HousingType_Private housing', 'HousingType_Subsidized housing']
+
+
+def week3_frame():
+    """The week 3 survey with the notebook's responses and centered columns.
+
+    Support_binary (1-2 -> 0, 4-5 -> 1) and Support_ordinal (1-2, 3, 4-5)
+    are derived from support_info.
+    """
+    df = pd.read_csv(WEEK3_CSV)
+    df['Support_binary'] = df['support_info'].map({1: 0.0, 2: 0.0, 4: 1.0, 5: 1.0})
+    df['Support_ordinal'] = df['support_info'].map({1: 1.0, 2: 1.0, 3: 2.0, 4: 3.0, 5: 3.0})
+    for col in CENTERED_COLUMNS:
+        df[f'{col}_c'] = df[col] - df[col].mean()
+    return df
+
+
+def week3_design(features, response):
+    """(X, y) of a week 3 model as the notebook builds them, without a constant
+    (rows with a missing value are dropped)."""
+    df = week3_frame()
+    rows = df[features + [response]].dropna().index
+    return df.loc[rows, features], df.loc[rows, response]
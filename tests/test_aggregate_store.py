@@ -0,0 +1,102 @@
+"""AggregateStore built from batches vs the same results on the whole survey."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregate_store
+from aggregate_store import AggregateStore
+from conftest import WEEK2_DIR
+from onehot_crosstab import crosstab_onehot
+from stream_summary import summarize_series
+from survey_data import LIKERT_COLUMNS, load_survey
+from update_aggregates import update_store
+
+SURVEY_CSV = os.path.join(WEEK2_DIR, 'GCAP3226_week2.csv')
+# First row of each batch file
+BATCH_STARTS = [0, 30, 65]
+
+
+@pytest.fixture(scope='module')
+def survey():
+    return load_survey(SURVEY_CSV, use_cache=False)
+
+
+@pytest.fixture
+def batch_files(tmp_path):
+    """The survey split into three CSV files."""
+    raw = pd.read_csv(SURVEY_CSV)
+    paths = []
+    bounds = BATCH_STARTS + [len(raw)]
+    for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        part = raw.iloc[start:stop]
+        path = str(tmp_path / f'batch{i}.csv')
+        part.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def assert_matches_survey(store, survey):
+    assert store.rows == len(survey)
+    for col in LIKERT_COLUMNS:
+        expected = survey[col].value_counts().sort_index()
+        assert store.value_counts[col].to_dict() == expected.to_dict()
+    districts = survey.filter(like='HongKongDistrict_').sum()
+    assert list(store.district_counts) == list(districts)
+    cross = crosstab_onehot(survey, 'HongKongDistrict_', 'food_waste_behavior').counts
+    pd.testing.assert_frame_equal(store.crosstab, cross, check_names=False)
+    assert store.five_number() == pytest.approx(
+        summarize_series(survey['Distance_artificial']).five_number())
+    assert store.correlation() == pytest.approx(
+        survey['Distance_artificial'].corr(survey['recycling_effort']))
+    pairs = survey[['Distance_artificial', 'recycling_effort']].dropna()
+    np.testing.assert_allclose(store.trend_line(),
+                               np.polyfit(pairs['Distance_artificial'],
+                                          pairs['recycling_effort'], 1))
+
+
+def test_appended_batches_match_whole_survey(survey, batch_files):
+    store = AggregateStore()
+    for path in batch_files:
+        assert store.append_file(path)
+    assert [batch.source for batch in store.batches] == batch_files
+    assert_matches_survey(store, survey)
+
+
+def test_same_file_is_appended_once(batch_files):
+    store = AggregateStore()
+    assert store.append_file(batch_files[0])
+    assert not store.append_file(batch_files[0])
+    assert store.rows == BATCH_STARTS[1]
+    assert len(store.batches) == 1
+
+
+def test_merged_stores_match_whole_survey(survey, batch_files):
+    first, second = AggregateStore(), AggregateStore()
+    first.append_file(batch_files[0])
+    for path in batch_files[1:]:
+        second.append_file(path)
+    first.merge(second)
+    assert_matches_survey(first, survey)
+
+
+def test_save_load_and_update_store(survey, batch_files, tmp_path):
+    store_path = str(tmp_path / 'store' / 'survey_store.pkl')
+    _, appended, skipped = update_store(store_path, batch_files[:2])
+    assert (appended, skipped) == (batch_files[:2], [])
+    store, appended, skipped = update_store(store_path, batch_files)
+    assert (appended, skipped) == (batch_files[2:], batch_files[:2])
+    assert_matches_survey(AggregateStore.load(store_path), survey)
+    assert_matches_survey(store, survey)
+
+
+def test_load_rejects_other_versions(batch_files, tmp_path, monkeypatch):
+    path = str(tmp_path / 'old.pkl')
+    store = AggregateStore()
+    store.append_file(batch_files[0])
+    store.save(path)
+    monkeypatch.setattr(aggregate_store, 'STORE_VERSION', aggregate_store.STORE_VERSION + 1)
+    with pytest.raises(ValueError, match='rebuild it'):
+        AggregateStore.load(path)
@@ -0,0 +1,139 @@
+"""analysis_server's statistics and request handling, without a real client."""
+
+import asyncio
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+import analysis_server
+from analysis_server import AnalysisServer, RequestError
+from conftest import WEEK2_DIR
+from survey_data import clear_memory_cache
+
+SURVEY_CSV = os.path.join(WEEK2_DIR, 'GCAP3226_week2.csv')
+
+
+@pytest.fixture(scope='module')
+def survey():
+    return pd.read_csv(SURVEY_CSV)
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = str(tmp_path / 'survey.csv')
+    shutil.copy(SURVEY_CSV, path)
+    server = AnalysisServer(path, processes=1)
+    yield server
+    server.close()
+    clear_memory_cache()
+
+
+def get(server, target, method='GET'):
+    return asyncio.run(server.dispatch(method, target))
+
+
+def test_statistics_match_pandas_and_statsmodels(survey):
+    table = analysis_server.frequency(survey, {}, 'support_level')
+    counts = survey['support_level'].value_counts()
+    assert {level['level']: level['count'] for level in table['levels']} == \
+        {level: counts.get(level, 0) for level in range(1, 6)}
+    assert table['total'] == counts.sum()
+
+    result = analysis_server.correlation(survey, {}, 'Distance_artificial', 'recycling_effort')
+    assert result['correlation'] == pytest.approx(
+        survey['Distance_artificial'].corr(survey['recycling_effort']))
+
+    x = ['Distance_artificial', 'fairness']
+    fit = analysis_server.regression(survey, {}, 'recycling_effort', ','.join(x))
+    data = survey[['recycling_effort'] + x].dropna()
+    reference = sm.OLS(data['recycling_effort'], sm.add_constant(data[x])).fit()
+    np.testing.assert_allclose([term['coef'] for term in fit['terms']], reference.params)
+    np.testing.assert_allclose([term['std_err'] for term in fit['terms']], reference.bse)
+    np.testing.assert_allclose([term['p_value'] for term in fit['terms']], reference.pvalues)
+    assert fit['rsquared'] == pytest.approx(reference.rsquared)
+    assert fit['nobs'] == reference.nobs
+
+
+def test_five_number(server):
+    kind, body = get(server, '/five-number?column=Distance_artificial')
+    assert kind == 'json'
+    distance = pd.read_csv(SURVEY_CSV)['Distance_artificial']
+    assert body['min'] == distance.min()
+    assert body['median'] == pytest.approx(distance.median())
+    assert body['count'] == distance.count()
+
+
+@pytest.mark.parametrize('target, status', [
+    ('/five-number?column=food_waste_behavior', 400),   # not numeric
+    ('/five-number?column=no_such_column', 404),
+    ('/correlation?x=food_waste_behavior', 400),
+    ('/frequency?colum=fairness', 400),                 # unknown parameter
+    ('/regression?y=recycling_effort&x=fairness,fairness', 400),   # collinear
+    ('/charts/no_such_chart.png', 404),
+    ('/charts/distance_analysis.png?profile=none', 400),
+    ('/nowhere', 404),
+])
+def test_bad_requests(server, target, status):
+    with pytest.raises(RequestError) as info:
+        get(server, target)
+    assert info.value.status == status
+
+
+def test_methods(server):
+    with pytest.raises(RequestError) as info:
+        get(server, '/frequency', method='POST')
+    assert info.value.status == 405
+    with pytest.raises(RequestError) as info:
+        get(server, '/reload')
+    assert info.value.status == 405
+    kind, body = get(server, '/reload', method='POST')
+    assert body['rows'] == len(server.df)
+
+
+def test_results_are_cached_until_the_file_changes(server):
+    _, first = get(server, '/frequency?column=fairness')
+    _, again = get(server, '/frequency?column=fairness')
+    assert again is first
+    assert server.cache.hits == 1
+
+    df = pd.read_csv(server.path)
+    df['fairness'] = 3
+    df.to_csv(server.path, index=False)
+    os.utime(server.path, ns=(0, os.stat(server.path).st_mtime_ns + 10 ** 9))
+    _, changed = get(server, '/frequency?column=fairness')
+    assert [(level['level'], level['count']) for level in changed['levels']] == [(3, len(df))]
+
+
+def test_chart(server):
+    kind, body = get(server, '/charts/support_level_bar_chart.png')
+    assert kind == 'png'
+    assert body.startswith(b'\x89PNG')
+
+
+def test_http_round_trip(server):
+    async def request(raw):
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        return response
+
+    response = asyncio.run(request(b'GET /correlation HTTP/1.1\r\nHost: x\r\n\r\n'))
+    head, body = response.split(b'\r\n\r\n', 1)
+    assert head.startswith(b'HTTP/1.1 200 OK')
+    assert b'Content-Type: application/json' in head
+    assert json.loads(body)['x'] == 'Distance_artificial'
+
+    response = asyncio.run(request(b'GET /five-number?column=food_waste_behavior HTTP/1.1\r\n\r\n'))
+    head, body = response.split(b'\r\n\r\n', 1)
+    assert head.startswith(b'HTTP/1.1 400 Bad Request')
+    assert 'not numeric' in json.loads(body)['error']
@@ -0,0 +1,92 @@
+"""BitmapIndex subgroups against pandas boolean masks."""
+
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmap_index import BitmapIndex, pack_flags
+from conftest import WEEK2_DIR, WEEK3_DIR
+from onehot_crosstab import onehot_columns
+
+
+@pytest.fixture(scope='module', params=['week2', 'week3', 'synthetic'])
+def survey(request):
+    if request.param == 'week2':
+        return pd.read_csv(os.path.join(WEEK2_DIR, 'GCAP3226_week2.csv'))
+    if request.param == 'week3':
+        return pd.read_csv(os.path.join(WEEK3_DIR, 'GCAP3226_week3.csv'))
+    # Not a multiple of 64 rows, with missing flags
+    rng = np.random.default_rng(5)
+    n = 1_000
+    df = pd.DataFrame({f'AgeRange_{i}': (rng.integers(0, 4, n) == 0).astype(float)
+                       for i in range(4)})
+    df['HousingType_A'] = rng.integers(0, 2, n)
+    df['HousingType_B'] = 1 - df['HousingType_A']
+    return df.mask(rng.random(df.shape) < 0.02)
+
+
+def pandas_mask(df, *conditions):
+    mask = pd.Series(True, index=df.index)
+    for condition in conditions:
+        names = [condition] if isinstance(condition, str) else list(condition)
+        mask &= (df[names] == 1).any(axis=1)
+    return mask.to_numpy()
+
+
+def queries(index):
+    """Single columns, pairs across blocks and an OR within a block."""
+    prefixes = sorted({col[:col.index('_') + 1] for col in index.columns})
+    blocks = [onehot_columns(index.columns, prefix) for prefix in prefixes]
+    yield ()
+    for col in index.columns:
+        yield (col,)
+    for a, b in itertools.combinations(blocks, 2):
+        yield a[0], b[-1]
+    for block in blocks:
+        if len(block) > 1:
+            yield (block[:2],)
+            yield (block[:2], blocks[0][0])
+
+
+def test_subgroups_match_pandas(survey):
+    index = BitmapIndex.from_frame(survey)
+    for conditions in queries(index):
+        expected = pandas_mask(survey, *conditions)
+        np.testing.assert_array_equal(index.mask(*conditions), expected)
+        assert index.count(*conditions) == expected.sum()
+        np.testing.assert_array_equal(index.rows(*conditions), np.flatnonzero(expected))
+
+
+def test_block_counts_match_pandas(survey):
+    index = BitmapIndex.from_frame(survey)
+    prefix = index.columns[0][:index.columns[0].index('_') + 1]
+    columns = onehot_columns(survey.columns, prefix)
+    for conditions in [(), (index.columns[-1],)]:
+        mask = pandas_mask(survey, *conditions)
+        expected = (survey.loc[mask, columns] == 1).sum()
+        expected.index = [col.replace(prefix, '', 1) for col in columns]
+        pd.testing.assert_series_equal(index.block_counts(prefix, *conditions), expected,
+                                       check_dtype=False)
+
+
+@pytest.mark.parametrize('n_rows', [1, 63, 64, 65, 200])
+def test_pack_flags_round_trip(n_rows):
+    flags = np.random.default_rng(n_rows).random((n_rows, 3)) < 0.5
+    words = pack_flags(flags)
+    assert words.dtype == np.uint64 and words.shape == (3, -(-n_rows // 64))
+    unpacked = np.unpackbits(words.view(np.uint8), axis=1, count=n_rows, bitorder='little')
+    np.testing.assert_array_equal(unpacked.T.astype(bool), flags)
+
+
+def test_errors():
+    df = pd.DataFrame({'HousingType_A': [1, 0], 'HousingType_B': [0, 1]})
+    index = BitmapIndex.from_frame(df)
+    with pytest.raises(KeyError):
+        index.count('HousingType_C')
+    with pytest.raises(KeyError):
+        index.block_counts('AgeRange_')
+    with pytest.raises(ValueError):
+        BitmapIndex.from_frame(df[[]])
@@ -0,0 +1,39 @@
+"""job_fingerprint: which changes rebuild a chart."""
+
+import pandas as pd
+import pytest
+
+import build_cache
+from charts import FIGURE_JOBS
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'support_level': [1, 2, 5], 'support_after_info': [3, 4, 5]})
+
+
+@pytest.fixture
+def job():
+    return next(job for job in FIGURE_JOBS if job.name == 'support_level_bar_chart')
+
+
+def test_same_inputs_same_fingerprint(df, job):
+    assert build_cache.job_fingerprint(job, df) == build_cache.job_fingerprint(job, df.copy())
+
+
+def test_data_and_params_change_fingerprint(df, job):
+    fingerprint = build_cache.job_fingerprint(job, df)
+    changed = df.assign(support_level=[1, 2, 4])
+    assert build_cache.job_fingerprint(job, changed) != fingerprint
+    # support_after_info is not one of the job's columns
+    assert build_cache.job_fingerprint(job, df.assign(support_after_info=0)) == fingerprint
+    recolored = job._replace(params=dict(job.params, color='coral'))
+    assert build_cache.job_fingerprint(recolored, df) != fingerprint
+
+
+def test_helper_source_changes_fingerprint(df, job, monkeypatch):
+    fingerprint = build_cache.job_fingerprint(job, df)
+    monkeypatch.setattr(build_cache, '_helper_digest', {})
+    monkeypatch.setattr(build_cache, 'HELPER_SOURCES',
+                        build_cache.HELPER_SOURCES + ['likert_summary'])
+    assert build_cache.job_fingerprint(job, df) != fingerprint
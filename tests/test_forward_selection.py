@@ -0,0 +1,121 @@
+"""forward_selection's OLS scorer and Newton logit against statsmodels."""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from conftest import WEEK3_FEATURES, week3_design
+from forward_selection import (OLSCandidateScorer, best_candidate, fit_logit,
+                               forward_selection, logistic_forward_selection)
+
+
+@pytest.fixture(scope='module')
+def linear():
+    return week3_design(WEEK3_FEATURES, 'support_info')
+
+
+@pytest.fixture(scope='module')
+def logistic():
+    return week3_design(WEEK3_FEATURES, 'Support_binary')
+
+
+def refit_pvalue(X, y, selected, candidate, model):
+    """p-value of `candidate` from a statsmodels fit with the selected columns."""
+    design = sm.add_constant(X[selected + [candidate]], has_constant='add')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if model is sm.OLS:
+            result = sm.OLS(y, design).fit()
+        else:
+            result = sm.Logit(y, design).fit(method='newton', disp=False)
+    return result.pvalues[candidate]
+
+
+def refit_selection(X, y, model, significance_level=0.05):
+    """Forward selection that refits every candidate, as the notebook did."""
+    selected = []
+    while len(selected) < X.shape[1]:
+        remaining = [f for f in X.columns if f not in selected]
+        pvalues = pd.Series({f: refit_pvalue(X, y, selected, f, model) for f in remaining})
+        if pvalues.min() >= significance_level:
+            break
+        selected.append(pvalues.idxmin())
+    return selected
+
+
+def test_scorer_pvalues_match_ols(linear):
+    X, y = linear
+    scorer = OLSCandidateScorer(X, y)
+    selected = []
+    for step in range(3):
+        pvalues = scorer.pvalues()
+        # Collinear one-hot levels give NaN; statsmodels gives a pinv fit
+        usable = ~np.isnan(pvalues)
+        expected = [refit_pvalue(X, y, selected, f, sm.OLS) if usable[j] else np.nan
+                    for j, f in enumerate(X.columns)]
+        np.testing.assert_allclose(pvalues[usable], np.array(expected)[usable], rtol=1e-6,
+                                   atol=1e-300)
+        best = best_candidate(pvalues)
+        scorer.add(best)
+        selected.append(X.columns[best])
+        reference = sm.OLS(y, sm.add_constant(X[selected])).fit()
+        assert scorer.rsquared == pytest.approx(reference.rsquared, rel=1e-9)
+
+
+def test_scorer_skips_aliased_columns():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=50), 'b': rng.normal(size=50)})
+    X['twice_a'] = 2 * X['a']
+    y = X['a'] + rng.normal(size=50)
+    scorer = OLSCandidateScorer(X, y)
+    scorer.add(0)
+    pvalues = scorer.pvalues()
+    assert np.isnan(pvalues[0]) and np.isnan(pvalues[2])
+    assert pvalues[1] == pytest.approx(refit_pvalue(X, y, ['a'], 'b', sm.OLS), rel=1e-9)
+
+
+def test_forward_selection_matches_refits(linear, capsys):
+    X, y = linear
+    selected, model = forward_selection(X, y)
+    assert selected == refit_selection(X, y, sm.OLS)
+    assert model.model.exog_names == ['const'] + selected
+
+
+def logit_synthetic(n=800, seed=2):
+    rng = np.random.default_rng(seed)
+    Z = np.column_stack([np.ones(n), rng.normal(size=(n, 3))])
+    y = (rng.random(n) < 1 / (1 + np.exp(-Z @ [0.3, 1.0, -0.5, 0.0]))).astype(np.float64)
+    return Z, y
+
+
+@pytest.mark.parametrize('data', ['synthetic', 'week3'])
+def test_fit_logit_matches_statsmodels(data, logistic):
+    if data == 'synthetic':
+        Z, y = logit_synthetic()
+    else:
+        X, y = logistic
+        X = X[['fairness_c', 'policy_helpfulness_c', 'household_size_c', 'LocalResidentcode']]
+        Z, y = sm.add_constant(X).to_numpy(), y.to_numpy()
+    params, covariance, llf = fit_logit(Z, y)
+    reference = sm.Logit(y, Z).fit(method='newton', disp=False)
+    np.testing.assert_allclose(params, reference.params, rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(np.sqrt(np.diag(covariance)), reference.bse, rtol=1e-8)
+    assert llf == pytest.approx(reference.llf, rel=1e-12)
+
+
+def test_fit_logit_warm_start():
+    Z, y = logit_synthetic()
+    cold, _, _ = fit_logit(Z, y)
+    small, _, _ = fit_logit(Z[:, :3], y)
+    warm, _, _ = fit_logit(Z, y, start=np.append(small, 0.0), maxiter=6)
+    np.testing.assert_allclose(warm, cold, rtol=1e-9)
+
+
+def test_logistic_forward_selection_matches_refits(logistic, capsys):
+    X, y = logistic
+    selected, model = logistic_forward_selection(X, y, n_jobs=2)
+    assert selected == refit_selection(X, y, sm.Logit)
+    assert model.model.exog_names == ['const'] + selected
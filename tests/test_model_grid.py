@@ -0,0 +1,68 @@
+"""fit_model_grid() against one statsmodels fit per model."""
+
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from statsmodels.miscmodels.ordinal_model import OrderedModel
+
+from conftest import week3_frame
+from model_grid import TABLE_COLUMNS, fit_model_grid
+
+RESPONSES = ['support_info', 'Support_binary', 'Support_ordinal']
+PREDICTORS = ['fairness_c', 'Distance_artificial', 'recycling_effort_c']
+
+
+@pytest.fixture(scope='module')
+def survey():
+    df = week3_frame()
+    # Different missing rows per predictor: each model keeps its own rows
+    df.loc[df.index[:5], 'Distance_artificial'] = np.nan
+    df.loc[df.index[-3:], 'fairness_c'] = np.nan
+    return df
+
+
+@pytest.fixture(scope='module')
+def table(survey):
+    return fit_model_grid(survey, RESPONSES, PREDICTORS, processes=1)
+
+
+def statsmodels_fit(df, response, predictor):
+    data = df[[response, predictor]].dropna()
+    if response == 'support_info':
+        return sm.OLS(data[response], sm.add_constant(data[[predictor]])).fit()
+    if response == 'Support_binary':
+        return sm.Logit(data[response], sm.add_constant(data[[predictor]])).fit(disp=False)
+    return OrderedModel(data[response], data[[predictor]], distr='logit').fit(
+        method='newton', maxiter=100, disp=False)
+
+
+@pytest.mark.parametrize('response', RESPONSES)
+@pytest.mark.parametrize('predictor', PREDICTORS)
+def test_matches_statsmodels(survey, table, response, predictor):
+    rows = table[(table['response'] == response) & (table['predictor'] == predictor)]
+    reference = statsmodels_fit(survey, response, predictor)
+    assert list(rows['term']) == list(reference.params.index)
+    np.testing.assert_allclose(rows['coef'], reference.params, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(rows['std_err'], reference.bse, rtol=1e-4)
+    np.testing.assert_allclose(rows['stat'], reference.tvalues, rtol=1e-4)
+    np.testing.assert_allclose(rows['p_value'], reference.pvalues, rtol=1e-3, atol=1e-12)
+    np.testing.assert_allclose(rows[['ci_low', 'ci_high']], reference.conf_int(),
+                               rtol=1e-4, atol=1e-8)
+    assert (rows['nobs'] == reference.nobs).all()
+    rsquared = reference.rsquared if response == 'support_info' else reference.prsquared
+    np.testing.assert_allclose(rows['rsquared'], rsquared, rtol=1e-6)
+
+
+def test_worker_processes_give_the_same_table(survey, table):
+    parallel = fit_model_grid(survey, RESPONSES, PREDICTORS, processes=2)
+    assert list(parallel.columns) == TABLE_COLUMNS
+    np.testing.assert_allclose(parallel.select_dtypes('number'),
+                               table.select_dtypes('number'), rtol=1e-12)
+
+
+def test_unknown_response_needs_a_kind(survey):
+    with pytest.raises(ValueError, match="No model kind for response 'fairness'"):
+        fit_model_grid(survey, ['fairness'], PREDICTORS)
+    table = fit_model_grid(survey, ['fairness'], ['recycling_effort_c'],
+                           kinds={'fairness': 'ols'})
+    assert set(table['model']) == {'ols'}
@@ -0,0 +1,63 @@
+"""crosstab_onehot vs a per-column pandas cross table, in each `multiple` mode."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import WEEK2_DIR
+from onehot_crosstab import crosstab_onehot
+
+PREFIX, COLUMN = 'HongKongDistrict_', 'food_waste_behavior'
+
+
+@pytest.fixture(scope='module')
+def survey():
+    df = pd.read_csv(os.path.join(WEEK2_DIR, 'GCAP3226_week2.csv'))
+    districts = [col for col in df.columns if col.startswith(PREFIX)]
+    # Row 0 lives in two districts and row 1 in none
+    df.loc[0, districts[:2]] = 1
+    df.loc[1, districts] = 0
+    return df
+
+
+def filtered_counts(df, multiple):
+    """The table the section 3 script used to build: one filter per district."""
+    n_flags = df.filter(like=PREFIX).sum(axis=1)
+    keep = n_flags == 1 if multiple == 'drop' else n_flags >= 1
+    rows = {}
+    for col in df.filter(like=PREFIX).columns:
+        values = df.loc[keep & (df[col] == 1), COLUMN]
+        rows[col.replace(PREFIX, '', 1)] = values.value_counts()
+    categories = sorted(df[COLUMN].dropna().unique())
+    return pd.DataFrame(rows).T.reindex(columns=categories).fillna(0).astype(np.int64)
+
+
+@pytest.mark.parametrize('multiple', ['drop', 'all'])
+def test_matches_filtered_counts(survey, multiple):
+    table = crosstab_onehot(survey, PREFIX, COLUMN, multiple)
+    pd.testing.assert_frame_equal(table.counts, filtered_counts(survey, multiple),
+                                  check_names=False)
+    assert table.unassigned.to_dict() == {'no flag': 1, 'multiple flags': 1}
+    totals = table.counts.sum(axis=1)
+    np.testing.assert_allclose(table.percentages.sum(axis=1), 100)
+    assert list(table.percentages.index) == list(totals[totals > 0].index)
+
+
+def test_first_assigns_to_first_flagged_column(survey):
+    dropped = crosstab_onehot(survey, PREFIX, COLUMN, 'drop').counts
+    first = crosstab_onehot(survey, PREFIX, COLUMN, 'first').counts
+    difference = first - dropped
+    district = [col for col in survey.columns if col.startswith(PREFIX)][0]
+    assert difference.to_numpy().sum() == 1
+    assert difference.loc[district.replace(PREFIX, '', 1), survey.loc[0, COLUMN]] == 1
+
+
+def test_error_rejects_multiple_flags(survey):
+    with pytest.raises(ValueError, match=f'1 rows have more than one {PREFIX}\\* flag'):
+        crosstab_onehot(survey, PREFIX, COLUMN, 'error')
+    clean = survey.drop(index=0)
+    pd.testing.assert_frame_equal(crosstab_onehot(clean, PREFIX, COLUMN, 'error').counts,
+                                  crosstab_onehot(clean, PREFIX, COLUMN, 'drop').counts)
+
@@ -0,0 +1,90 @@
+"""fit_ordinal() against statsmodels' OrderedModel(distr='logit')."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.miscmodels.ordinal_model import OrderedModel
+from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+from conftest import WEEK3_FEATURES, week3_design
+from ordinal_logit import aggregate_patterns, fit_ordinal
+
+
+def ordered_model(X, y):
+    # Newton with numerical derivatives converges tighter than the default BFGS
+    return OrderedModel(y, X, distr='logit').fit(method='newton', maxiter=100, disp=False)
+
+
+def assert_same_fit(result, reference):
+    np.testing.assert_allclose(result.params.values, reference.params.values,
+                               rtol=1e-6, atol=1e-7)
+    np.testing.assert_allclose(result.bse.values, reference.bse.values, rtol=1e-4)
+    assert result.llf == pytest.approx(reference.llf, rel=1e-8)
+    assert list(result.params.index) == list(reference.params.index)
+
+
+@pytest.mark.parametrize('features', [['fairness_c'], WEEK3_FEATURES])
+def test_week3_models(features):
+    X, y = week3_design(features, 'Support_ordinal')
+    result = fit_ordinal(X, y)
+    assert result.converged
+    reference = ordered_model(X, y)
+    assert_same_fit(result, reference)
+    np.testing.assert_allclose(result.tvalues, reference.tvalues, rtol=1e-4)
+    np.testing.assert_allclose(result.pvalues, reference.pvalues, rtol=1e-3, atol=1e-12)
+    assert result.prsquared == pytest.approx(reference.prsquared, rel=1e-8)
+
+
+def synthetic(n=600, seed=3):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({'likert': rng.integers(1, 6, n) - 3.0,
+                      'binary': rng.integers(0, 2, n).astype(np.float64),
+                      'continuous': rng.normal(size=n)})
+    latent = 0.6 * X['likert'] - 0.8 * X['binary'] + 0.4 * X['continuous'] + rng.logistic(size=n)
+    y = pd.Series(np.digitize(latent, [-1.0, 0.0, 1.5]).astype(np.float64), name='y')
+    return X, y
+
+
+def test_synthetic_four_levels():
+    X, y = synthetic()
+    assert_same_fit(fit_ordinal(X, y), ordered_model(X, y))
+
+
+def test_aggregate_matches_rows():
+    X, y = synthetic()
+    X = X[['likert', 'binary']]
+    rows, patterns = fit_ordinal(X, y, aggregate=False), fit_ordinal(X, y, aggregate=True)
+    np.testing.assert_allclose(patterns.params, rows.params, rtol=1e-8)
+    np.testing.assert_allclose(patterns.bse, rows.bse, rtol=1e-8)
+    assert patterns.llf == pytest.approx(rows.llf)
+
+
+def test_weights_are_summed_per_pattern():
+    X, y = synthetic(n=300)
+    X = X[['likert', 'binary']]
+    weights = np.random.default_rng(0).integers(1, 4, len(y))
+    _, _, counts = aggregate_patterns(X.values, y.values.astype(np.int64), weights)
+    assert counts.sum() == weights.sum()
+
+    expanded = fit_ordinal(X.loc[X.index.repeat(weights)], y.loc[y.index.repeat(weights)],
+                           aggregate=False)
+    for aggregate in (True, False, 'auto'):
+        weighted = fit_ordinal(X, y, weights=weights, aggregate=aggregate)
+        np.testing.assert_allclose(weighted.params, expanded.params, rtol=1e-8)
+        np.testing.assert_allclose(weighted.bse, expanded.bse, rtol=1e-8)
+        assert weighted.nobs == weights.sum()
+
+
+def test_maxiter_zero_returns_start():
+    X, y = synthetic()
+    with pytest.warns(ConvergenceWarning, match='did not converge after 0 iterations'):
+        result = fit_ordinal(X, y, maxiter=0)
+    assert result.iterations == 0
+    assert not result.converged
+    assert (result.params[list(X.columns)] == 0).all()
+
+
+def test_no_warning_when_converged(recwarn):
+    X, y = synthetic()
+    assert fit_ordinal(X, y).converged
+    assert not [w for w in recwarn if issubclass(w.category, ConvergenceWarning)]
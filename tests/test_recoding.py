@@ -0,0 +1,60 @@
+"""recode_onehot vs the notebook's np.select recodes, and its flag checks."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import WEEK3_CSV
+from recoding import WEEK3_RECODES, recode_onehot
+
+
+@pytest.fixture(scope='module')
+def survey():
+    return pd.read_csv(WEEK3_CSV)
+
+
+def select_recode(df, prefix, mapping):
+    conditions = [df[prefix + col] == 1 for col in mapping]
+    return np.select(conditions, list(mapping.values()), default=np.nan)
+
+
+def test_matches_np_select(survey):
+    recoded = recode_onehot(survey, WEEK3_RECODES)
+    assert list(recoded.columns) == list(WEEK3_RECODES)
+    assert recoded.index.equals(survey.index)
+    for name, (prefix, mapping) in WEEK3_RECODES.items():
+        np.testing.assert_array_equal(recoded[name], select_recode(survey, prefix, mapping))
+
+
+def test_rows_with_no_flag(survey):
+    df = survey.copy()
+    df.loc[[3, 5], [col for col in df.columns if col.startswith('AgeRange_')]] = 0
+    with pytest.raises(ValueError, match="2 rows have no flag .*'age'"):
+        recode_onehot(df, WEEK3_RECODES)
+
+    recoded = recode_onehot(df, WEEK3_RECODES, missing='nan')
+    assert recoded['age'].isna().sum() == 2
+    assert recoded.loc[[3, 5], 'age'].isna().all()
+    assert recoded[['income', 'education']].notna().all().all()
+
+
+def test_rows_with_several_flags(survey):
+    df = survey.copy()
+    df.loc[4, 'HighestEducationLevel_Secondary'] = 1
+    df.loc[4, 'HighestEducationLevel_Masterorabove'] = 1
+    with pytest.raises(ValueError, match="1 rows have more than one flag .*'education'"):
+        recode_onehot(df, WEEK3_RECODES)
+    assert np.isnan(recode_onehot(df, WEEK3_RECODES, multiple='nan').loc[4, 'education'])
+    first = recode_onehot(df, WEEK3_RECODES, multiple='first').loc[4, 'education']
+    flagged = [value for col, value in WEEK3_RECODES['education'][1].items()
+               if df.loc[4, 'HighestEducationLevel_' + col] == 1]
+    assert first == flagged[0]
+
+
+def test_rejects_unknown_modes_and_columns(survey):
+    with pytest.raises(ValueError, match='missing must be one of'):
+        recode_onehot(survey, WEEK3_RECODES, missing='drop')
+    with pytest.raises(ValueError, match='multiple must be one of'):
+        recode_onehot(survey, WEEK3_RECODES, multiple='all')
+    with pytest.raises(ValueError, match='no columns named'):
+        recode_onehot(survey, {'age': ('AgeRange_', {'90+': 95})})
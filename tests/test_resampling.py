@@ -0,0 +1,107 @@
+"""resampling's batched statistics, bootstrap and permutation tests vs scipy."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from resampling import (bootstrap_ci, mean_difference, ols_coefficients, pearson_r,
+                        permutation_test, regression_slope, resample, signed_rank_sum)
+
+
+def scipy_pearson_r(x, y, axis=-1):
+    return stats.pearsonr(x, y, axis=axis).statistic
+
+
+@pytest.fixture(scope='module')
+def pair():
+    rng = np.random.default_rng(7)
+    x = rng.normal(size=60)
+    return x, 0.3 * x + rng.normal(size=60)
+
+
+@pytest.fixture(scope='module')
+def differences():
+    # Likert-style paired differences: ties and zeros
+    return np.random.default_rng(8).integers(-2, 4, size=40).astype(np.float64)
+
+
+def test_batched_statistics_match_scipy(pair):
+    x, y = pair
+    batch_x = np.stack([x, x[::-1], x ** 2])
+    batch_y = np.stack([y, y, y])
+    np.testing.assert_allclose(pearson_r(batch_x, batch_y),
+                               [stats.pearsonr(bx, by)[0] for bx, by in zip(batch_x, batch_y)])
+    np.testing.assert_allclose(regression_slope(batch_x, batch_y),
+                               [stats.linregress(bx, by).slope
+                                for bx, by in zip(batch_x, batch_y)])
+    coefficients = ols_coefficients(batch_x, batch_x ** 3, batch_y)
+    for row, bx, by in zip(coefficients, batch_x, batch_y):
+        design = np.column_stack([np.ones_like(bx), bx, bx ** 3])
+        np.testing.assert_allclose(row, np.linalg.lstsq(design, by, rcond=None)[0])
+
+
+def test_signed_rank_sum_matches_wilcoxon(differences):
+    kept = differences[differences != 0]
+    total = len(kept) * (len(kept) + 1) / 2
+    w_plus = stats.wilcoxon(differences, zero_method='wilcox', alternative='greater',
+                            method='approx').statistic
+    assert signed_rank_sum(differences[None, :])[0] == pytest.approx(2 * w_plus - total)
+
+
+def test_bootstrap_matches_scipy(pair):
+    x, y = pair
+    ci = bootstrap_ci(pearson_r, (x, y), n_resamples=20_000, processes=1)
+    reference = stats.bootstrap((x, y), scipy_pearson_r, paired=True, vectorized=True, n_resamples=20_000, method='percentile',
+                                random_state=np.random.default_rng(0))
+    assert ci.statistic == pytest.approx(stats.pearsonr(x, y)[0])
+    assert ci.ci_low == pytest.approx(reference.confidence_interval.low, abs=0.02)
+    assert ci.ci_high == pytest.approx(reference.confidence_interval.high, abs=0.02)
+    assert ci.std_error == pytest.approx(reference.standard_error, rel=0.05)
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'greater', 'less'])
+def test_permutation_matches_scipy(pair, alternative):
+    x, y = pair
+    test = permutation_test(pearson_r, (x, y), n_resamples=20_000, alternative=alternative,
+                            processes=1)
+    reference = stats.permutation_test((x, y), scipy_pearson_r,
+                                       permutation_type='pairings', vectorized=True,
+                                       n_resamples=20_000, alternative=alternative,
+                                       random_state=np.random.default_rng(0))
+    assert test.p_value == pytest.approx(reference.pvalue, abs=0.015)
+    assert test.p_value > 0
+
+
+def test_sign_flip_matches_exact_wilcoxon():
+    # No ties or zeros, so scipy's exact distribution applies
+    differences = np.random.default_rng(9).permutation(np.arange(1, 16)) * np.where(
+        np.random.default_rng(10).random(15) < 0.7, 1.0, -1.0)
+    test = permutation_test(signed_rank_sum, (differences,), scheme='sign_flip',
+                            n_resamples=40_000, processes=1)
+    exact = stats.wilcoxon(differences, method='exact').pvalue
+    assert test.p_value == pytest.approx(exact, abs=0.01)
+
+
+def test_sign_flip_mean_difference_matches_scipy(differences):
+    test = permutation_test(mean_difference, (differences,), scheme='sign_flip',
+                            n_resamples=20_000, processes=1)
+    reference = stats.permutation_test((differences,), np.mean, permutation_type='samples',
+                                       n_resamples=20_000,
+                                       random_state=np.random.default_rng(0))
+    assert test.p_value == pytest.approx(reference.pvalue, abs=0.01)
+
+
+def test_results_do_not_depend_on_processes(pair):
+    serial = resample(pearson_r, pair, n_resamples=4_000, batch_size=500, processes=1)
+    parallel = resample(pearson_r, pair, n_resamples=4_000, batch_size=500, processes=2)
+    np.testing.assert_array_equal(serial, parallel)
+    assert serial.shape == (4_000,)
+
+
+def test_invalid_arguments(pair):
+    with pytest.raises(ValueError):
+        resample(pearson_r, pair, scheme='jackknife')
+    with pytest.raises(ValueError):
+        permutation_test(pearson_r, pair, scheme='bootstrap')
+    with pytest.raises(ValueError):
+        permutation_test(pearson_r, pair, alternative='both')
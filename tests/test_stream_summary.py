@@ -0,0 +1,121 @@
+"""stream_summary's ColumnSummary and KLL sketch against numpy/pandas."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import cbook
+
+from conftest import WEEK2_DIR
+from stream_summary import ColumnSummary, KLLSketch, summarize_csv_column, summarize_series
+
+SURVEY_CSV = os.path.join(WEEK2_DIR, 'GCAP3226_week2.csv')
+
+
+@pytest.fixture(scope='module')
+def large():
+    return np.random.default_rng(1).lognormal(size=300_000)
+
+
+def rank_errors(values, estimates, qs):
+    """|rank of each estimate - q| in the sorted values."""
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+    return np.abs(ranks - qs)
+
+
+def test_small_input_is_exact():
+    distance = pd.read_csv(SURVEY_CSV)['Distance_artificial']
+    summary = summarize_series(distance, chunksize=97)
+    assert summary.sketch.exact
+    pd.testing.assert_series_equal(summary.describe(), distance.describe())
+
+    counts, edges = summary.histogram(15)
+    expected_counts, expected_edges = np.histogram(distance.dropna(), bins=15)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_allclose(edges, expected_edges)
+
+
+def test_csv_column_matches_series():
+    distance = pd.read_csv(SURVEY_CSV)['Distance_artificial']
+    pd.testing.assert_series_equal(summarize_csv_column(SURVEY_CSV, 'Distance_artificial',
+                                                        chunksize=50).describe(),
+                                   distance.describe())
+
+
+def test_boxplot_stats_match_matplotlib():
+    distance = pd.read_csv(SURVEY_CSV)['Distance_artificial'].dropna()
+    stats = summarize_series(distance).boxplot_stats()
+    expected = cbook.boxplot_stats(distance.to_numpy())[0]
+    for key in ('med', 'q1', 'q3', 'whislo', 'whishi', 'mean'):
+        assert stats[key] == pytest.approx(expected[key])
+    np.testing.assert_array_equal(np.sort(stats['fliers']), np.sort(expected['fliers']))
+
+
+def test_large_input_moments_are_exact(large):
+    summary = summarize_series(large, chunksize=7_000)
+    assert not summary.sketch.exact
+    assert summary.count == len(large)
+    assert summary.mean == pytest.approx(large.mean(), rel=1e-12)
+    assert summary.std == pytest.approx(large.std(ddof=1), rel=1e-9)
+    assert (summary.min, summary.max) == (large.min(), large.max())
+
+
+@pytest.mark.parametrize('error', [0.01, 0.005])
+def test_quantile_rank_error(large, error):
+    qs = np.linspace(0.01, 0.99, 99)
+    summary = summarize_series(large, error=error, chunksize=7_000)
+    assert rank_errors(large, summary.quantile(qs), qs).max() <= 2 * error
+    # Memory stays O(1/error), not O(n)
+    assert sum(len(items) for items in summary.sketch.levels) < 20 / error
+
+
+def test_merged_sketches(large):
+    qs = np.linspace(0.05, 0.95, 19)
+    parts = np.array_split(large, 7)
+    merged = ColumnSummary()
+    for part in parts:
+        merged.merge(summarize_series(part))
+    assert merged.count == len(large)
+    assert merged.mean == pytest.approx(large.mean(), rel=1e-12)
+    assert merged.std == pytest.approx(large.std(ddof=1), rel=1e-9)
+    assert rank_errors(large, merged.quantile(qs), qs).max() <= 2 * 0.005
+
+
+def test_histogram_after_compaction(large):
+    summary = summarize_series(large, chunksize=7_000)
+    counts, edges = summary.histogram(15)
+    expected, _ = np.histogram(large, bins=edges)
+    assert counts.sum() == len(large)
+    assert np.abs(counts - expected).max() <= 0.001 * len(large)
+
+
+def test_sketch_keeps_total_weight():
+    sketch = KLLSketch(error=0.05)
+    for seed in range(20):
+        sketch.update(np.random.default_rng(seed).normal(size=1_013))
+    _, weights = sketch.items()
+    assert weights.sum() == sketch.n == 20 * 1_013
+
+
+def test_missing_values_are_skipped():
+    values = pd.Series([3.0, np.nan, 1.0, 2.0, np.nan])
+    summary = summarize_series(values)
+    pd.testing.assert_series_equal(summary.describe(), values.describe(), check_names=False)
+
+
+def test_infinite_values_are_skipped_and_counted():
+    finite = pd.Series([3.0, 1.0, 2.0, 5.0])
+    values = pd.Series([3.0, np.inf, 1.0, np.nan, 2.0, -np.inf, 5.0])
+    with np.errstate(all='raise'):
+        summary = summarize_series(values, chunksize=3)
+        counts, _ = summary.histogram(4)
+    assert summary.infinite == 2
+    pd.testing.assert_series_equal(summary.describe(), finite.describe(), check_names=False)
+    np.testing.assert_array_equal(counts, np.histogram(finite, bins=4)[0])
+
+    merged = ColumnSummary()
+    merged.merge(summarize_series([np.inf, -np.inf]))
+    merged.merge(summary)
+    assert merged.infinite == 4
+    assert merged.count == 4
@@ -0,0 +1,115 @@
+"""OLSAccumulator fits against sm.OLS on the full data."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from conftest import WEEK3_DIR
+from sufficient_ols import OLSAccumulator, accumulate_csv
+
+SURVEY_CSV = os.path.join(WEEK3_DIR, 'GCAP3226_week3.csv')
+COLUMNS = ['fairness', 'government_consideration', 'policy_helpfulness', 'recycle_frequency',
+           'LocalResidentcode']
+
+
+def assert_same_as_ols(result, reference):
+    for name in ('params', 'bse', 'tvalues', 'pvalues'):
+        np.testing.assert_allclose(getattr(result, name), getattr(reference, name),
+                                   rtol=1e-8, err_msg=name)
+    np.testing.assert_allclose(result.conf_int(), reference.conf_int(), rtol=1e-8)
+    for name in ('nobs', 'df_model', 'df_resid', 'ssr', 'centered_tss', 'rsquared',
+                 'rsquared_adj', 'fvalue', 'f_pvalue'):
+        assert getattr(result, name) == pytest.approx(getattr(reference, name), rel=1e-8), name
+    assert list(result.params.index) == list(reference.params.index)
+
+
+def ols(df, columns, response):
+    data = df[columns + [response]].dropna()
+    return sm.OLS(data[response], sm.add_constant(data[columns])).fit()
+
+
+def split(df, parts):
+    bounds = np.linspace(0, len(df), parts + 1).astype(int)
+    return [df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def accumulate(df, columns, response, chunksize):
+    acc = OLSAccumulator(columns, response)
+    for start in range(0, len(df), chunksize):
+        acc.update(df.iloc[start:start + chunksize])
+    return acc
+
+
+@pytest.fixture(scope='module')
+def survey():
+    return pd.read_csv(SURVEY_CSV)
+
+
+@pytest.fixture(scope='module')
+def with_missing():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame(rng.normal(size=(5_000, 3)), columns=['a', 'b', 'c'])
+    df['y'] = 1.5 + df @ [0.5, -1.0, 0.0] + rng.normal(size=len(df))
+    df = df.mask(rng.random(df.shape) < 0.05)
+    return df
+
+
+def test_week3_matches_ols(survey):
+    result = accumulate(survey, COLUMNS, 'support_info', chunksize=13).fit()
+    assert_same_as_ols(result, ols(survey, COLUMNS, 'support_info'))
+
+
+def test_missing_rows_are_dropped(with_missing):
+    acc = accumulate(with_missing, ['a', 'b', 'c'], 'y', chunksize=700)
+    assert acc.n == len(with_missing.dropna())
+    assert_same_as_ols(acc.fit(), ols(with_missing, ['a', 'b', 'c'], 'y'))
+
+
+def test_centering_matches_centered_columns(survey):
+    acc = accumulate(survey, COLUMNS, 'support_info', chunksize=20)
+    centered = survey.copy()
+    for col in ('fairness', 'recycle_frequency'):
+        centered[col] = survey[col] - survey[col].mean()
+    assert_same_as_ols(acc.fit(center=['fairness', 'recycle_frequency']),
+                       ols(centered, COLUMNS, 'support_info'))
+
+
+def test_merged_accumulators(with_missing):
+    parts = split(with_missing, 5)
+    total = OLSAccumulator(['a', 'b'], 'y')
+    for part in parts:
+        total.merge(accumulate(part, ['a', 'b'], 'y', chunksize=333))
+    assert_same_as_ols(total.fit(), ols(with_missing, ['a', 'b'], 'y'))
+
+
+@pytest.mark.filterwarnings('ignore::statsmodels.tools.sm_exceptions.SingularMatrixWarning')
+def test_rank_deficient_design_matches_pinv(survey):
+    df = survey.assign(fairness_twice=2 * survey['fairness'])
+    columns = ['fairness', 'fairness_twice', 'waste_severity']
+    result = accumulate(df, columns, 'support_info', chunksize=50).fit()
+    reference = ols(df, columns, 'support_info')
+    np.testing.assert_allclose(result.params, reference.params, rtol=1e-6)
+    assert result.df_model == reference.df_model == 2
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_accumulate_csv_files(with_missing, tmp_path, processes):
+    paths = []
+    for i, part in enumerate(split(with_missing, 3)):
+        paths.append(str(tmp_path / f'wave{i}.csv'))
+        part.to_csv(paths[-1], index=False)
+    acc = accumulate_csv(paths, ['a', 'b', 'c'], 'y', chunksize=400, processes=processes)
+    assert_same_as_ols(acc.fit(center=['a']),
+                       ols(with_missing.assign(a=with_missing['a']
+                                               - with_missing.dropna()['a'].mean()),
+                           ['a', 'b', 'c'], 'y'))
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        OLSAccumulator(['a'], 'y').fit()
+    with pytest.raises(ValueError):
+        OLSAccumulator(['a'], 'y').merge(OLSAccumulator(['b'], 'y'))
@@ -0,0 +1,91 @@
+"""load_survey(): typed schema, blank answers and the sidecar cache."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import WEEK2_DIR
+from survey_data import (CACHE_DIR, clear_memory_cache, load_survey, read_parquet,
+                         sidecar_path, write_survey)
+
+SURVEY_CSV = os.path.join(WEEK2_DIR, 'GCAP3226_week2.csv')
+
+
+@pytest.fixture
+def survey_csv(tmp_path):
+    path = tmp_path / 'survey.csv'
+    path.write_bytes(open(SURVEY_CSV, 'rb').read())
+    clear_memory_cache()
+    yield str(path)
+    clear_memory_cache()
+
+
+def test_same_values_as_read_csv(survey_csv):
+    df = load_survey(survey_csv)
+    expected = pd.read_csv(survey_csv)
+    assert list(df.columns) == list(expected.columns)
+    assert df['support_level'].dtype == np.int8
+    assert df['HongKongDistrict_CW'].dtype == np.uint8
+    assert df['food_waste_behavior'].dtype == 'category'
+    for col in expected.columns:
+        np.testing.assert_array_equal(df[col].astype(expected[col].dtype), expected[col],
+                                      err_msg=col)
+    # Measurements keep the CSV's decimals exactly
+    assert df['Distance_artificial'].dtype == np.float64
+    assert df['Distance_artificial'].quantile(0.25) == expected['Distance_artificial'].quantile(0.25)
+
+
+def test_blank_answers_are_nan(tmp_path):
+    path = str(tmp_path / 'blank.csv')
+    pd.read_csv(SURVEY_CSV).head(2).assign(support_level=[np.nan, 3]).to_csv(path, index=False)
+    clear_memory_cache()
+    for _ in range(2):  # parsed, then from the sidecar
+        df = load_survey(path)
+        assert df['support_level'].dtype == np.float64
+        assert df['support_level'].isna().tolist() == [True, False]
+        assert df['fairness'].dtype == np.int8
+        clear_memory_cache()
+
+
+def test_sidecar_is_rebuilt_when_the_csv_changes(survey_csv):
+    load_survey(survey_csv)
+    first = sidecar_path(survey_csv)
+    assert os.path.exists(first)
+
+    df = pd.read_csv(survey_csv)
+    df.loc[0, 'support_level'] = 1 if df.loc[0, 'support_level'] != 1 else 2
+    df.to_csv(survey_csv, index=False)
+    os.utime(survey_csv, ns=(0, os.stat(survey_csv).st_mtime_ns + 10**9))
+    second = sidecar_path(survey_csv)
+    assert second != first
+
+    assert load_survey(survey_csv)['support_level'].iloc[0] == df.loc[0, 'support_level']
+    assert os.listdir(os.path.dirname(second)) == [os.path.basename(second)]
+
+
+def test_sidecar_reads_match_parse(survey_csv):
+    parsed = load_survey(survey_csv)
+    clear_memory_cache()
+    assert os.path.isdir(os.path.join(os.path.dirname(survey_csv), CACHE_DIR))
+    pd.testing.assert_frame_equal(load_survey(survey_csv), parsed)
+
+
+def test_column_projection(survey_csv):
+    df = load_survey(survey_csv, columns=['recycling_effort', 'HongKongDistrict_*'])
+    assert df.columns[0] == 'recycling_effort'
+    assert all(col.startswith('HongKongDistrict_') for col in df.columns[1:])
+    with pytest.raises(KeyError):
+        load_survey(survey_csv, columns=['no_such_column'])
+
+
+def test_columnar_round_trip(survey_csv, tmp_path):
+    df = load_survey(survey_csv)
+    for name in ('survey.parquet', 'survey.arrow'):
+        path = str(tmp_path / name)
+        write_survey(df, path)
+        pd.testing.assert_frame_equal(load_survey(path, use_cache=False), df)
+    foreign = pd.read_csv(survey_csv)
+    foreign.to_parquet(tmp_path / 'foreign.parquet', index=False)
+    pd.testing.assert_frame_equal(read_parquet(str(tmp_path / 'foreign.parquet')), df)
@@ -0,0 +1,40 @@
+"""stream_aggregates over chunks vs the in-memory tables."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import WEEK2_DIR
+from onehot_crosstab import crosstab_onehot
+from survey_stream import stream_aggregates
+
+PREFIX, COLUMN = 'HongKongDistrict_', 'food_waste_behavior'
+
+
+@pytest.fixture(scope='module')
+def survey():
+    df = pd.read_csv(os.path.join(WEEK2_DIR, 'GCAP3226_week2.csv'))
+    districts = [col for col in df.columns if col.startswith(PREFIX)]
+    # Row 0 lives in two districts and row 1 in none
+    df.loc[0, districts[:2]] = 1
+    df.loc[1, districts] = 0
+    return df
+
+
+@pytest.mark.parametrize('multiple', ['drop', 'first', 'all'])
+def test_stream_matches_in_memory(survey, tmp_path, multiple):
+    path = tmp_path / 'survey.csv'
+    survey.to_csv(path, index=False)
+    table = crosstab_onehot(survey, PREFIX, COLUMN, multiple)
+    result = stream_aggregates(str(path), count_columns=['support_level'],
+                               sum_prefixes=[PREFIX], crosstabs=[(PREFIX, COLUMN)],
+                               chunksize=7, multiple=multiple)
+    pd.testing.assert_frame_equal(result.crosstabs[(PREFIX, COLUMN)], table.counts,
+                                  check_names=False)
+    pd.testing.assert_series_equal(result.unassigned[(PREFIX, COLUMN)], table.unassigned)
+    assert result.unassigned[(PREFIX, COLUMN)].to_dict() == {'no flag': 1, 'multiple flags': 1}
+    sums = survey.filter(like=PREFIX).sum()
+    assert list(result.column_sums[PREFIX]) == list(sums)
+    assert result.value_counts['support_level'].to_dict() == \
+        survey['support_level'].value_counts().sort_index().to_dict()